@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+CLI başlangıç süresi ölçümü
+
+Her komut için yeni bir Python süreci başlatılır ve komutun ilk ağ
+isteğine kadar geçen süre (içe aktarma + istemci kurulumu) ölçülür.
+Ağ isteği atan komutlar çalıştırılmaz, yalnızca ihtiyaç duydukları
+nesneler oluşturulur.
+
+Kullanım: python benchmark_startup.py [tekrar_sayısı]
+"""
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Komut -> ilk ağ isteğine kadar çalışan kod
+COMMANDS = {
+    '(python)': "pass",
+    '(main)': (
+        "import main\n"
+        "from src.bot.hair_bot import hair_bot\n"
+        "from src.content_creator.weekly_planner import weekly_planner\n"
+        "weekly_planner.get_today_theme(); hair_bot.authenticate_twitter()"
+    ),
+    '--help': "import main; main.show_help()",
+    '--schedule': "import main; main.show_weekly_schedule()",
+    '--ai-tweet': (
+        "import main\n"
+        "from src.utils.lazy import resolve\n"
+        "from src.bot.hair_bot import hair_bot\n"
+        "from src.ai.gemini_client import gemini_client\n"
+        "resolve(hair_bot); resolve(gemini_client)"
+    ),
+    '--batch': (
+        "import main\n"
+        "from src.utils.lazy import resolve\n"
+        "from src.bot.hair_bot import hair_bot\n"
+        "from src.ai.gemini_client import gemini_client\n"
+        "resolve(hair_bot); resolve(gemini_client)"
+    ),
+    '--send-tweet': (
+        "import main\n"
+        "from src.utils.lazy import resolve\n"
+        "from src.bot.hair_bot import hair_bot\n"
+        "from src.ai.gemini_client import gemini_client\n"
+        "from src.image_generator.real_photo_client import real_photo_client\n"
+        "hair_bot.authenticate_twitter(); resolve(gemini_client); resolve(real_photo_client)"
+    ),
+}
+
+
+def measure(code: str, repeat: int):
+    """Kodu her seferinde yeni bir süreçte çalıştır, süreleri (ms) döndür"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        elapsed = (time.perf_counter() - start) * 1000
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.decode(errors='replace'))
+        timings.append(elapsed)
+    return timings
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"⏱️ CLI başlangıç süreleri ({repeat} tekrar, ms)")
+    print("-" * 50)
+    print(f"{'komut':<14}{'medyan':>10}{'min':>10}{'max':>10}")
+
+    for command, code in COMMANDS.items():
+        try:
+            timings = measure(code, repeat)
+        except RuntimeError as e:
+            print(f"{command:<14} hata: {str(e).strip().splitlines()[-1]}")
+            continue
+        print(f"{command:<14}{statistics.median(timings):>10.0f}{min(timings):>10.0f}{max(timings):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
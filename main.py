@@ -11,13 +11,15 @@ from datetime import datetime
 # Proje kök dizinini Python path'ine ekle
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.bot.hair_bot import hair_bot
-from src.bot.weekly_scheduler import weekly_scheduler
-from src.content_creator.weekly_planner import weekly_planner
 from src.config.settings import settings
 
+# Ağır modüller (tweepy, Gemini SDK, görsel işleme) yalnızca ihtiyaç duyan komutta yüklenir
+
 def main():
     """Ana fonksiyon"""
+    from src.bot.hair_bot import hair_bot
+    from src.content_creator.weekly_planner import weekly_planner
+    
     print(f"🤖 {settings.BOT_NAME} başlatılıyor...")
     print(f"📅 Tarih: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"👤 Kullanıcı: @{settings.TWITTER_USERNAME}")
@@ -42,12 +44,14 @@ def main():
             user = status['user_info']
             print(f"👥 Takipçi: {user.get('followers_count', 0)}")
             print(f"📝 Tweet: {user.get('tweet_count', 0)}")
+            print(f"🕒 Profil bilgisi {status.get('user_info_age_seconds') or 0:.0f} sn önce alındı")
         
         print("\n🚀 Bot hazır! Komutlar:")
         print("1. AI tweet test: python main.py --ai-tweet")
         print("2. Gerçek tweet gönder: python main.py --send-tweet")
         print("3. Haftalık program: python main.py --schedule")
-        print("4. Yardım: python main.py --help")
+        print("4. Haftalık içerik üret: python main.py --batch")
+        print("5. Yardım: python main.py --help")
         
     else:
         print("❌ Bot testi başarısız!")
@@ -55,6 +59,9 @@ def main():
 
 def test_ai_tweet():
     """AI ile tweet içeriği test et"""
+    from src.bot.hair_bot import hair_bot
+    from src.content_creator.weekly_planner import weekly_planner
+    
     print("🤖 AI ile tweet içeriği üretiliyor...")
     
     # Bugünün temasını göster
@@ -63,12 +70,17 @@ def test_ai_tweet():
     
     # AI ile içerik üret
     content = hair_bot.generate_hair_content(use_ai=True)
+    if not content:
+        print("❌ İçerik üretilemedi (yedek içeriklerin hepsi daha önce paylaşıldı)")
+        return
     print(f"📝 Üretilen İçerik: {content['text']}")
     print(f"🎯 Stil: {content['style']}")
     print(f"🤖 Üretici: {content['generated_by']}")
 
 def send_real_tweet():
     """Gerçek tweet gönder"""
+    from src.bot.hair_bot import hair_bot
+    
     print("📤 Gerçek tweet gönderiliyor...")
     
     # Twitter kimlik doğrulama
@@ -84,8 +96,23 @@ def send_real_tweet():
     else:
         print("❌ Tweet gönderilemedi!")
 
+def batch_generate():
+    """Haftanın tüm tweet'lerini tek istekte üret ve depoya ekle"""
+    from src.bot.hair_bot import hair_bot
+    
+    print("📦 Haftalık içerikler toplu üretiliyor...")
+    
+    added = hair_bot.batch_generate_content(whole_week=True)
+    
+    if added:
+        print(f"✅ {added} tweet adayı depoya eklendi!")
+    else:
+        print("❌ Toplu içerik üretilemedi!")
+
 def show_weekly_schedule():
     """Haftalık programı göster"""
+    from src.content_creator.weekly_planner import weekly_planner
+    
     print("📅 Bu Haftanın Saç Stili Programı:")
     print("=" * 50)
     
@@ -108,6 +135,7 @@ def show_help():
     print("  python main.py --ai-tweet    - AI ile tweet test et")
     print("  python main.py --send-tweet  - Gerçek tweet gönder")
     print("  python main.py --schedule    - Haftalık program")
+    print("  python main.py --batch       - Haftalık içerikleri toplu üret")
     print("  python main.py --help        - Yardım")
 
 if __name__ == "__main__":
@@ -120,6 +148,8 @@ if __name__ == "__main__":
             send_real_tweet()
         elif command == "--schedule":
             show_weekly_schedule()
+        elif command == "--batch":
+            batch_generate()
         elif command == "--help":
             show_help()
         else:
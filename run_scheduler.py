@@ -8,16 +8,23 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-import schedule
-import time
 import logging
-from datetime import datetime
 from src.bot.hair_bot import hair_bot
-from src.image_generator.real_photo_client import real_photo_client
 from src.content_creator.weekly_planner import weekly_planner
-import uuid
+from src.bot.heap_scheduler import HeapScheduler
+from src.bot.slot_stager import slot_stager
+from src.bot.connection_warmer import connection_warmer
+from src.bot.account_registry import account_registry
+from src.bot.posting_engine import posting_engine
+from src.bot.outbox import outbox
+from src.api.trends_client import trends_client
+from src.content_creator.content_buffer import content_buffer
+from src.image_generator.photo_cache import photo_cache
+from src.utils.lazy import is_initialized
+from src.config.settings import settings
 
 # Logging ayarları
+settings.create_directories()
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -29,8 +36,16 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def send_scheduled_tweet():
-    """Zamanlanmış tweet gönder"""
+# Tweet zamanları ve kuyruk taraması için zamanlayıcı
+scheduler = HeapScheduler()
+
+def send_scheduled_tweet(slot_time: str = None):
+    """
+    Zamanlanmış tweet gönder
+    
+    Args:
+        slot_time: Tweet zamanı ('HH:MM'); verilirse önceden hazırlanan tweet kullanılır
+    """
     try:
         logger.info("🤖 Zamanlanmış tweet gönderimi başlıyor...")
         
@@ -38,35 +53,36 @@ def send_scheduled_tweet():
         today_theme = weekly_planner.get_today_theme()
         logger.info(f"🎨 Tema: {today_theme['name']} {today_theme['emoji']}")
         
-        # AI ile içerik üret
-        content = hair_bot.generate_hair_content(use_ai=True)
-        logger.info(f"📝 İçerik üretildi: {content['text'][:50]}...")
-        
-        # Gerçek saç fotoğrafı al
-        image_path = real_photo_client.get_random_hair_photo(
-            style_focus=content['style'],
-            theme=content['theme']
-        )
+        # Önceden hazırlanmış tweet'i gönder (süreç yeniden başladıysa kuyruktaki, eskimemişse)
+        prepared = slot_stager.take(slot_time) if slot_time else None
+        if prepared:
+            logger.info("📦 Önceden hazırlanmış tweet kullanılıyor")
+        state = outbox.post(prepared, slot_time=slot_time) if prepared or slot_time else 'missing'
         
-        if image_path:
-            logger.info(f"🖼️ Görsel oluşturuldu: {os.path.basename(image_path)}")
-            
-            # Unique tweet metni
-            unique_id = str(uuid.uuid4())[:8]
-            unique_text = f"{content['text']} #{unique_id}"
-            
-            # Tweet gönder
-            success = hair_bot.twitter_client.post_tweet(
-                text=unique_text,
-                image_path=image_path
+        if state in ('missing', 'stale'):
+            # AI ile içerik üret + gerçek saç fotoğrafı al
+            prepared = hair_bot.prepare_hair_tweet(
+                use_ai=True, slot_at=slot_stager.slot_datetime(slot_time) if slot_time else None
             )
+            if not prepared:
+                logger.error("❌ Tweet hazırlanamadı!")
+                return
             
-            if success:
-                logger.info("✅ Zamanlanmış tweet başarıyla gönderildi!")
-            else:
-                logger.error("❌ Zamanlanmış tweet gönderilemedi!")
+            logger.info(f"📝 İçerik üretildi: {prepared['text'][:50]}...")
+            if not prepared.get('image_path'):
+                logger.error("❌ Görsel oluşturulamadı!")
+                return
+            logger.info(f"🖼️ Görsel oluşturuldu: {os.path.basename(prepared['image_path'])}")
+            
+            # Tweet'i kuyruğa yaz ve gönder; başarısızsa kuyruk taramasında tekrar denenir
+            state = outbox.post(prepared, slot_time=slot_time)
+        
+        if state == 'posted':
+            logger.info("✅ Zamanlanmış tweet başarıyla gönderildi!")
+        elif state == 'pending':
+            logger.warning("⏳ Zamanlanmış tweet kuyrukta, tekrar denenecek")
         else:
-            logger.error("❌ Görsel oluşturulamadı!")
+            logger.error(f"❌ Zamanlanmış tweet gönderilemedi! ({state})")
             
     except Exception as e:
         logger.error(f"❌ Zamanlanmış tweet hatası: {e}")
@@ -89,10 +105,39 @@ def main():
     
     logger.info("✅ Twitter bağlantısı başarılı!")
     
-    # Zamanlamaları ayarla
-    schedule.every().day.at("09:00").do(send_scheduled_tweet)
-    schedule.every().day.at("15:00").do(send_scheduled_tweet)
-    schedule.every().day.at("21:00").do(send_scheduled_tweet)
+    # Trend hashtag'leri arka planda yenile, üretim sadece önbelleği okur
+    trends_client.start_background_refresh()
+    
+    # Önceki çalışmada yarım kalan gönderimleri kurtar, bekleyenleri düzenli tekrar dene
+    outbox.recover()
+    scheduler.every(settings.OUTBOX_POLL_SECONDS, outbox.deliver_due, name="outbox")
+    
+    # Zamanlamaları ayarla (ek hesaplar gönderim motorunda paralel çalışır)
+    extra_accounts = account_registry.names(include_default=False)
+    for tweet_time in ["09:00", "15:00", "21:00"]:
+        # Hazırlık ve gönderimden önce bağlantıları ısıt (DNS, TLS, OAuth)
+        staging_time = slot_stager.staging_time(tweet_time)
+        scheduler.every_day_at(connection_warmer.warmup_time(staging_time),
+                               connection_warmer.warm_up,
+                               name=f"warmup_stage@{tweet_time}")
+        scheduler.every_day_at(connection_warmer.warmup_time(tweet_time),
+                               connection_warmer.warm_up_for_publish,
+                               name=f"warmup_tweet@{tweet_time}")
+        
+        # İçerik, görsel ve medya yüklemesini birkaç dakika önceden hazırla
+        scheduler.every_day_at(staging_time,
+                               lambda t=tweet_time: slot_stager.stage(t),
+                               name=f"stage@{tweet_time}")
+        if extra_accounts:
+            scheduler.every_day_at(staging_time,
+                                   lambda t=tweet_time: posting_engine.stage_slot(extra_accounts, t),
+                                   name=f"stage_accounts@{tweet_time}")
+            scheduler.every_day_at(tweet_time,
+                                   lambda t=tweet_time: posting_engine.submit_slot(extra_accounts, t),
+                                   name=f"accounts@{tweet_time}")
+        scheduler.every_day_at(tweet_time,
+                               lambda t=tweet_time: send_scheduled_tweet(t),
+                               name=f"tweet@{tweet_time}")
     
     logger.info("⏰ Zamanlayıcı aktif! Tweet'ler otomatik gönderilecek...")
     
@@ -102,13 +147,15 @@ def main():
     
     print("\n🔄 Zamanlayıcı çalışıyor... (Ctrl+C ile durdurun)")
     
-    # Sonsuz döngü - zamanlamaları kontrol et
+    # Bir sonraki tweet zamanına kadar uyu
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Her dakika kontrol et
+        scheduler.run_forever()
             
     except KeyboardInterrupt:
+        scheduler.stop()
+        content_buffer.flush()
+        if is_initialized(photo_cache):
+            photo_cache.flush()
         logger.info("⏹️ Zamanlayıcı durduruldu!")
         print("\n👋 AutoHairTweets zamanlayıcısı kapatıldı!")
 
@@ -1,8 +1,25 @@
-import google.generativeai as genai
+import json
 import logging
-from typing import Optional, Dict, List, Any
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from datetime import datetime
+from typing import Callable, Optional, Dict, List, Any
 from src.config.settings import settings
-from src.api.trends_client import trends_client
+from src.utils.lazy import LazyProxy
+from src.content_creator.hashtag_selector import hashtag_selector
+from src.ai.tweet_history import tweet_history
+from src.utils.resilience import resilience
+
+
+def is_transient_gemini_error(error: BaseException) -> bool:
+    """Gemini hatası geçici mi (bağlantı hatası, 5xx veya 429)"""
+    from google.api_core import exceptions as google_exceptions
+    
+    if isinstance(error, (google_exceptions.ServerError, google_exceptions.TooManyRequests)):
+        return True
+    # Diğer API hataları (geçersiz istek, yetki) kalıcıdır
+    return not isinstance(error, google_exceptions.GoogleAPICallError)
 
 class GeminiClient:
     """Google Gemini AI istemcisi"""
@@ -10,6 +27,17 @@ class GeminiClient:
     def __init__(self):
         self.api_key = settings.GEMINI_API_KEY
         self.model = None
+        # Gemini çağrılarını süre sınırıyla beklemek için
+        self.executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='gemini')
+        self.stats = {
+            'calls': 0,
+            'timeouts': 0,
+            'hedges_launched': 0,
+            'hedge_wins': 0,
+            'hedge_losses': 0,
+            'deadline_fallbacks': 0,
+            'fallback_duplicates': 0
+        }
         self._setup_logging()
         self._configure_gemini()
     
@@ -20,47 +48,164 @@ class GeminiClient:
     def _configure_gemini(self):
         """Gemini yapılandırması"""
         try:
+            # SDK ağır bir içe aktarma, yalnızca istemci oluşturulurken yüklenir
+            import google.generativeai as genai
+            
             genai.configure(api_key=self.api_key)
             self.model = genai.GenerativeModel('gemini-1.5-flash')
             self.logger.info("Gemini AI başarıyla yapılandırıldı")
         except Exception as e:
             self.logger.error(f"Gemini yapılandırma hatası: {e}")
     
-    def generate_hair_content(self, theme: Dict[str, Any], style_focus: Optional[str] = None) -> Dict[str, Any]:
+    def generate_hair_content(self, theme: Dict[str, Any], style_focus: Optional[str] = None,
+                              deadline: Optional[float] = None,
+                              hedge_fn: Optional[Callable[[], Optional[Dict[str, Any]]]] = None,
+                              slot_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Saç stili içeriği üret
         
+        Gemini çağrısı en fazla `deadline` saniye beklenir, sonra yedek içerik
+        döner (yedeklerin hepsi daha önce paylaşıldıysa None). hedge_fn verilirse (ve hedging açıksa) Gemini
+        GEMINI_HEDGE_AFTER_SECONDS içinde yanıt vermediğinde veya hata
+        verdiğinde hedge_fn çağrılır; aday dönerse hemen kullanılır.
+        
         Args:
             theme: Haftalık tema bilgisi
             style_focus: Odaklanılacak stil (opsiyonel)
+            deadline: Süre sınırı (saniye, verilmezse GEMINI_DEADLINE_SECONDS)
+            hedge_fn: Alternatif içerik kaynağı, örn. depodaki hazır aday (opsiyonel)
+            slot_key: Hashtag seti için zaman dilimi anahtarı (verilmezse içinde bulunulan saat)
             
         Returns:
             Dict: Üretilen içerik
         """
+        deadline = deadline or settings.GEMINI_DEADLINE_SECONDS
+        deadline_at = time.monotonic() + deadline
+        
         try:
-            # Prompt oluştur
-            prompt = self._create_content_prompt(theme, style_focus)
+            self.stats['calls'] += 1
+            primary = self.executor.submit(self._generate_unique_content, theme, style_focus, deadline_at, slot_key)
             
-            # Gemini'den içerik üret
-            response = self.model.generate_content(prompt)
+            if hedge_fn and settings.GEMINI_HEDGE_ENABLED:
+                content = self._wait_hedged(primary, hedge_fn, deadline_at)
+            else:
+                content = primary.result(timeout=deadline)
             
-            if response.text:
-                # İçeriği işle
-                content = self._process_generated_content(response.text, theme)
+            if content:
                 return content
-            else:
-                self.logger.error("Gemini'den boş yanıt alındı")
-                return self._get_fallback_content(theme)
-                
+            
+            self.stats['deadline_fallbacks'] += 1
+            return self._get_fallback_content(theme, slot_key)
+            
+        except FutureTimeoutError:
+            self.stats['timeouts'] += 1
+            self.stats['deadline_fallbacks'] += 1
+            self.logger.error(f"Gemini {deadline:.1f} sn içinde yanıt vermedi, yedek içerik kullanılıyor")
+            return self._get_fallback_content(theme, slot_key)
         except Exception as e:
             self.logger.error(f"İçerik üretme hatası: {e}")
-            return self._get_fallback_content(theme)
+            return self._get_fallback_content(theme, slot_key)
+    
+    def _wait_hedged(self, primary, hedge_fn: Callable[[], Optional[Dict[str, Any]]],
+                     deadline_at: float) -> Optional[Dict[str, Any]]:
+        """
+        Gemini yanıtını bekle, gecikir veya hata verirse alternatif kaynağa başvur
+        
+        hedge_fn ucuz bir depo okumasıdır; Gemini havuzunda gecikmiş çağrıların
+        arkasında sıraya girmemesi için bu iş parçacığında çalıştırılır. Aday
+        bulunursa hemen kullanılır, bulunmazsa Gemini süre sonuna kadar beklenir.
+        Böylece depodan alınan aday hiçbir zaman kullanılmadan atılmaz.
+        
+        Returns:
+            Dict: Geçerli içerik (süre dolarsa veya iki kaynak da boşsa None)
+        """
+        hedge_after = min(settings.GEMINI_HEDGE_AFTER_SECONDS, max(deadline_at - time.monotonic(), 0))
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            error = primary.exception()
+            if error is None and primary.result():
+                return primary.result()
+            if error is not None:
+                # Hızlı hata (yetki, kota): yavaş yanıt gibi alternatife geç
+                self.logger.error(f"İçerik üretme hatası: {error}")
+        
+        self.stats['hedges_launched'] += 1
+        self.logger.info("⏳ Gemini gecikti veya başarısız, depodaki içerik deneniyor")
+        try:
+            hedged = hedge_fn()
+        except Exception as e:
+            self.logger.error(f"Alternatif içerik hatası: {e}")
+            hedged = None
+        
+        if hedged:
+            self.stats['hedge_wins'] += 1
+            self.logger.info("🏁 Alternatif içerik Gemini'den önce hazır oldu")
+            return hedged
+        
+        if done:
+            return None
+        
+        try:
+            result = primary.result(timeout=max(deadline_at - time.monotonic(), 0))
+        except FutureTimeoutError:
+            self.stats['timeouts'] += 1
+            return None
+        except Exception as e:
+            self.logger.error(f"İçerik üretme hatası: {e}")
+            return None
+        
+        if result:
+            self.stats['hedge_losses'] += 1
+        return result
+    
+    def _generate_unique_content(self, theme: Dict[str, Any], style_focus: Optional[str],
+                                 deadline_at: float, slot_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Gemini'den geçmişin yakın kopyası olmayan içerik üret
+        
+        Returns:
+            Dict: Üretilen içerik (boş yanıt, süre aşımı veya tekrar durumunda None)
+        """
+        # Prompt oluştur
+        prompt = self._create_content_prompt(theme, style_focus, slot_key)
+        
+        for attempt in range(1, settings.CONTENT_DEDUP_ATTEMPTS + 1):
+            if time.monotonic() >= deadline_at:
+                return None
+            
+            # Gemini'den içerik üret
+            response = resilience.call('gemini:generate', self.model.generate_content, prompt,
+                                       retries=1, is_transient=is_transient_gemini_error)
+            
+            if not response.text:
+                self.logger.error("Gemini'den boş yanıt alındı")
+                return None
+            
+            # İçeriği işle
+            content = self._process_generated_content(response.text, theme)
+            
+            # Geçmiş tweet'lerin yakın kopyasıysa yeniden üret
+            similar = tweet_history.find_similar(content['text'])
+            if not similar:
+                return content
+            
+            self.logger.warning(f"Yakın kopya içerik (deneme {attempt}, mesafe {similar['distance']}): "
+                                f"{similar['text'][:40]}...")
+            prompt += f"\nDo NOT repeat or paraphrase this earlier tweet: \"{content['text']}\"\n"
+        
+        self.logger.error("Benzersiz içerik üretilemedi, yedek içerik kullanılıyor")
+        return None
     
-    def _create_content_prompt(self, theme: Dict[str, Any], style_focus: Optional[str] = None) -> str:
+    def get_stats(self) -> Dict[str, Any]:
+        """Gemini çağrı istatistiklerini al"""
+        return dict(self.stats)
+    
+    def _create_content_prompt(self, theme: Dict[str, Any], style_focus: Optional[str] = None,
+                               slot_key: Optional[str] = None) -> str:
         """İçerik üretimi için prompt oluştur"""
         
-        # Dinamik hashtag'leri al
-        mixed_hashtags = trends_client.get_mixed_hashtags(base_count=3, trend_count=2)
+        # Zaman diliminin hashtag seti (yedek içerikle aynı)
+        mixed_hashtags = hashtag_selector.select(theme, base_count=3, trend_count=2, slot_key=slot_key)
         hashtag_list = ', '.join(mixed_hashtags)
         
         base_prompt = f"""
@@ -98,6 +243,124 @@ class GeminiClient:
         
         return base_prompt
     
+    def generate_batch_content(self, themes: List[Dict[str, Any]], tweets_per_theme: int = None) -> List[Dict[str, Any]]:
+        """
+        Birden çok tema ve stil için tweet'leri tek istekte üret
+        
+        Her tema için stiller sırayla dağıtılır ve Gemini'den numaralı bir JSON
+        listesi istenir. Geçersiz, uzun veya geçmişin yakın kopyası olan
+        adaylar ayıklanır.
+        
+        Args:
+            themes: Tema listesi (örn. WeeklyContentPlanner.weekly_themes değerleri)
+            tweets_per_theme: Tema başına tweet sayısı (verilmezse günlük tweet sayısı)
+            
+        Returns:
+            List[Dict]: Tema ve stil bilgili aday içerikler
+        """
+        tweets_per_theme = tweets_per_theme or settings.TWEETS_PER_DAY
+        
+        # Numaralı üretim listesini oluştur
+        slots = []
+        for theme in themes:
+            styles = theme['styles'] or [None]
+            for i in range(tweets_per_theme):
+                slots.append((theme, styles[i % len(styles)]))
+        
+        if not slots:
+            return []
+        
+        try:
+            prompt = self._create_batch_prompt(slots)
+            response = resilience.call('gemini:generate', self.model.generate_content, prompt,
+                                       retries=2, is_transient=is_transient_gemini_error)
+            
+            if not response.text:
+                self.logger.error("Gemini'den boş toplu yanıt alındı")
+                return []
+            
+            items = self._parse_batch_response(response.text)
+            
+            candidates = []
+            seen_texts = set()
+            for item in items:
+                try:
+                    index = int(item.get('index', 0)) - 1
+                    text = str(item.get('text', '')).strip()
+                except (TypeError, ValueError):
+                    continue
+                if not 0 <= index < len(slots) or not text or text in seen_texts:
+                    continue
+                
+                theme, style = slots[index]
+                content = self._process_generated_content(text, theme)
+                if tweet_history.is_near_duplicate(content['text']):
+                    continue
+                
+                seen_texts.add(text)
+                content.update({
+                    'style': style,
+                    'generated_by': 'gemini_batch',
+                    'created_at': datetime.now().isoformat()
+                })
+                candidates.append(content)
+            
+            self.logger.info(f"Toplu üretim: {len(slots)} istendi, {len(candidates)} aday hazır")
+            return candidates
+            
+        except Exception as e:
+            self.logger.error(f"Toplu içerik üretme hatası: {e}")
+            return []
+    
+    def _create_batch_prompt(self, slots: List) -> str:
+        """Toplu üretim için prompt oluştur"""
+        
+        # Ortak hashtag havuzu (her tweet buradan ve tema hashtag'lerinden seçer)
+        mixed_hashtags = hashtag_selector.select(base_count=8, trend_count=4)
+        hashtag_list = ', '.join(mixed_hashtags)
+        
+        lines = []
+        for i, (theme, style) in enumerate(slots, start=1):
+            line = f"{i}. Theme: {theme['name']} {theme['emoji']} | Concept: {theme['concept']}"
+            if style:
+                line += f" | Focus style: {style}"
+            if 'poll' in theme['content_types']:
+                line += " | Include a question or comparison"
+            if 'tips' in theme['content_types']:
+                line += " | Provide a practical tip"
+            lines.append(line)
+        
+        return f"""
+        You are a professional hairstylist and social media influencer.
+        
+        Write {len(slots)} different Twitter tweets, one for each numbered item below.
+        
+        Rules for every tweet:
+        1. Must not exceed 280 characters
+        2. Must be in ENGLISH only
+        3. Engaging, natural, and authentic (like a real person), informative about hairstyles
+        4. Appropriate emojis (but not too many)
+        5. Include 3-5 hashtags from these (mix of hair-related and trending): {hashtag_list}
+        6. Avoid mentioning any bot names or automated systems
+        7. Every tweet must be clearly different from the others
+        
+        Items:
+        {chr(10).join(lines)}
+        
+        Return ONLY a JSON array, no explanations, in this format:
+        [{{"index": 1, "text": "tweet text"}}, {{"index": 2, "text": "tweet text"}}]
+        """
+    
+    @staticmethod
+    def _parse_batch_response(response_text: str) -> List[Dict[str, Any]]:
+        """Toplu yanıttan JSON listesini çıkar (kod bloğu işaretlerini yok say)"""
+        text = re.sub(r'^```(?:json)?|```$', '', response_text.strip(), flags=re.MULTILINE)
+        start, end = text.find('['), text.rfind(']')
+        if start == -1 or end <= start:
+            return []
+        items = json.loads(text[start:end + 1])
+        return [item for item in items if isinstance(item, dict)]
+    
     def _process_generated_content(self, generated_text: str, theme: Dict[str, Any]) -> Dict[str, Any]:
         """Üretilen içeriği işle"""
         # Metni temizle
@@ -117,33 +380,71 @@ class GeminiClient:
             'timestamp': None
         }
     
-    def _get_fallback_content(self, theme: Dict[str, Any]) -> Dict[str, Any]:
-        """Hata durumunda yedek içerik - İngilizce"""
+    def _get_fallback_content(self, theme: Dict[str, Any], slot_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Hata durumunda yedek içerik - İngilizce
+
+        Şablonlar sırayla denenir, geçmiş tweet'lerin yakın kopyası olan
+        atlanır. Hepsi daha önce paylaşıldıysa None döner (tweet atılmaz).
+        """
+        emoji = theme['emoji']
         fallback_texts = {
-            'Short Hair Monday': f"Short hair takes courage! {theme['emoji']} Start the new week with a fresh new style!",
-            'Tutorial Tuesday': f"Today's tip {theme['emoji']} Stay tuned for quick and stylish hair tutorials!",
-            'Trend Alert': f"Everyone's talking about this! {theme['emoji']} Don't miss the trending hairstyles!",
-            'Throwback Hair': f"Timeless elegance from the past {theme['emoji']} The magic of vintage hairstyles!",
-            'Hair Care Friday': f"Best care for your hair {theme['emoji']} The secret to healthy hair!",
-            'Weekend Glow': f"Weekend vibes {theme['emoji']} Time for fun hairstyles!",
-            'Sunday Inspiration': f"Start the new week with inspiration {theme['emoji']} The power of hair transformations!"
+            'Short Hair Monday': [
+                f"Short hair takes courage! {emoji} Start the new week with a fresh new style!",
+                f"Monday mood: shorter, lighter, bolder {emoji} Would you make the cut?"
+            ],
+            'Tutorial Tuesday': [
+                f"Today's tip {emoji} Stay tuned for quick and stylish hair tutorials!",
+                f"Five minutes, one mirror, a brand new look {emoji} Tutorial time!"
+            ],
+            'Trend Alert': [
+                f"Everyone's talking about this! {emoji} Don't miss the trending hairstyles!",
+                f"The looks taking over your feed this week {emoji} Which one is yours?"
+            ],
+            'Throwback Hair': [
+                f"Timeless elegance from the past {emoji} The magic of vintage hairstyles!",
+                f"Some styles never go out of fashion {emoji} Bringing the classics back!"
+            ],
+            'Hair Care Friday': [
+                f"Best care for your hair {emoji} The secret to healthy hair!",
+                f"Healthy hair starts with small habits {emoji} Treat your strands well this weekend!"
+            ],
+            'Weekend Glow': [
+                f"Weekend vibes {emoji} Time for fun hairstyles!",
+                f"No plans, just good hair days {emoji} Try something playful this weekend!"
+            ],
+            'Sunday Inspiration': [
+                f"Start the new week with inspiration {emoji} The power of hair transformations!",
+                f"One change can feel like a fresh start {emoji} Get inspired for the week ahead!"
+            ]
         }
+        texts = fallback_texts.get(theme['name']) or [f"{theme['concept']} {emoji}"]
+        texts += [
+            f"{theme['name']} {emoji} Which look would you try next?",
+            f"Your hair, your rules {emoji} Share your favorite look with us!"
+        ]
         
-        text = fallback_texts.get(theme['name'], f"{theme['concept']} {theme['emoji']}")
-        
-        # Dinamik hashtag'leri al
-        mixed_hashtags = trends_client.get_mixed_hashtags(base_count=3, trend_count=2)
+        # Zaman diliminin hashtag seti (prompt'takiyle aynı)
+        mixed_hashtags = hashtag_selector.select(theme, base_count=3, trend_count=2, slot_key=slot_key)
         hashtags = ' '.join(mixed_hashtags)
         
-        return {
-            'text': f"{text} {hashtags}",
-            'theme': theme['name'],
-            'concept': theme['concept'],
-            'emoji': theme['emoji'],
-            'hashtags': mixed_hashtags,
-            'generated_by': 'fallback',
-            'timestamp': None
-        }
+        for text in texts:
+            # Gönderilen metin publish_prepared'da geçmişe eklenir
+            if tweet_history.is_near_duplicate(f"{text} {hashtags}"):
+                continue
+            return {
+                'text': f"{text} {hashtags}",
+                'theme': theme['name'],
+                'concept': theme['concept'],
+                'emoji': emoji,
+                'hashtags': mixed_hashtags,
+                'generated_by': 'fallback',
+                'timestamp': None
+            }
+        
+        self.stats['fallback_duplicates'] += 1
+        self.logger.error(f"Tüm yedek içerikler daha önce paylaşıldı, tweet atlanıyor ({theme['name']})")
+        return None
     
     def generate_image_prompt(self, theme: Dict[str, Any], style: str) -> str:
         """Görsel üretimi için prompt oluştur"""
@@ -160,7 +461,8 @@ class GeminiClient:
             Return only the English prompt, no explanations.
             """
             
-            response = self.model.generate_content(prompt)
+            response = resilience.call('gemini:generate', self.model.generate_content, prompt,
+                                       retries=1, is_transient=is_transient_gemini_error)
             return response.text.strip() if response.text else f"Professional {style} hairstyle, studio lighting, high quality"
             
         except Exception as e:
@@ -168,4 +470,4 @@ class GeminiClient:
             return f"Professional {style} hairstyle, studio lighting, high quality"
 
 # Global Gemini client instance
-gemini_client = GeminiClient()
\ No newline at end of file
+gemini_client = LazyProxy(GeminiClient)
\ No newline at end of file
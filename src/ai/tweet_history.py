@@ -0,0 +1,121 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.utils.hamming_index import HammingIndex
+
+# Hashtag, mention ve linkler benzerlik hesabına katılmaz
+_IGNORED_TOKENS = re.compile(r'(#\w+|@\w+|https?://\S+)')
+_WORDS = re.compile(r'\w+', re.UNICODE)
+
+
+def _features(text: str, shingle_size: int = 3) -> List[str]:
+    """Metni kelime shingle'larına ayır"""
+    words = _WORDS.findall(_IGNORED_TOKENS.sub(' ', text.lower()))
+    if len(words) < shingle_size:
+        return words
+    return [' '.join(words[i:i + shingle_size]) for i in range(len(words) - shingle_size + 1)]
+
+
+def simhash(text: str) -> int:
+    """
+    Metnin 64 bitlik SimHash parmak izi
+
+    Benzer metinler birbirine küçük Hamming mesafesinde hash üretir.
+    """
+    weights = [0] * 64
+    for feature in _features(text):
+        digest = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(64):
+            weights[bit] += 1 if digest >> bit & 1 else -1
+
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+class TweetHistoryIndex:
+    """
+    Gönderilmiş tweet'lerin yakın kopya indeksi
+
+    Her tweet'in SimHash'i data/tweet_history.jsonl dosyasına eklenir ve
+    çoklu indeks hash'leme yapısında tutulur. Kontrol, geçmişin boyutundan
+    bağımsız sabit sayıda sözlük araması ile yapılır.
+    """
+
+    def __init__(self, history_path: str = None, threshold: int = None):
+        self.logger = logging.getLogger(__name__)
+        settings.create_directories()
+        self.history_path = history_path or os.path.join(settings.DATA_DIR, 'tweet_history.jsonl')
+        self.threshold = threshold if threshold is not None else settings.TEXT_SIMHASH_THRESHOLD
+        self._index = HammingIndex(bits=64, chunks=4, max_distance=self.threshold)
+        self._lock = threading.Lock()
+        self.stats = {
+            'checks': 0,
+            'duplicates': 0
+        }
+        self._load()
+
+    def _load(self):
+        """Geçmişi diskten yükle"""
+        try:
+            if not os.path.exists(self.history_path):
+                return
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._index.add(int(record['simhash'], 16), record)
+            self.logger.info(f"Tweet geçmişi yüklendi: {len(self._index)} tweet")
+        except Exception as e:
+            self.logger.error(f"Tweet geçmişi yükleme hatası: {e}")
+
+    def find_similar(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Eşik içindeki en benzer geçmiş tweet'i bul
+
+        Returns:
+            Dict: Geçmiş kayıt ve mesafe (benzer yoksa None)
+        """
+        self.stats['checks'] += 1
+        match = self._index.nearest(simhash(text))
+        if not match:
+            return None
+        self.stats['duplicates'] += 1
+        record, distance = match
+        return {**record, 'distance': distance}
+
+    def is_near_duplicate(self, text: str) -> bool:
+        """Metin geçmişteki bir tweet'in yakın kopyası mı"""
+        return self.find_similar(text) is not None
+
+    def add(self, text: str):
+        """Gönderilen tweet'i geçmişe ekle"""
+        record = {
+            'simhash': f"{simhash(text):016x}",
+            'text': text[:80],
+            'posted_at': datetime.now().isoformat()
+        }
+        try:
+            with self._lock:
+                with open(self.history_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self._index.add(int(record['simhash'], 16), record)
+        except Exception as e:
+            self.logger.error(f"Tweet geçmişi kaydetme hatası: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """İndeks istatistiklerini al"""
+        return {'tweets': len(self._index), 'threshold': self.threshold, **self.stats}
+
+
+# Global tweet history instance
+tweet_history = LazyProxy(TweetHistoryIndex)
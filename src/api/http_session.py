@@ -0,0 +1,127 @@
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """Zaman aşımı verilmeyen isteklere varsayılan zaman aşımı uygulayan adaptör"""
+
+    def __init__(self, *args, timeout=None, **kwargs):
+        self.default_timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        return super().send(request, **kwargs)
+
+
+class HttpSessionPool:
+    """
+    Ortak, keep-alive HTTP oturumu
+
+    Tüm HTTP istemcileri aynı requests.Session'ı kullanır. Her host için
+    ayrı bir urllib3 bağlantı havuzu tutulur, böylece art arda yapılan
+    istekler TCP+TLS el sıkışmasını tekrarlamaz. Bağlantı kurulamadığında
+    adaptör isteği tekrar dener; 5xx/429 tekrarları devre kesiciye bırakılır.
+    """
+
+    def __init__(self, pool_size: int = None, connect_timeout: float = None,
+                 read_timeout: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.pool_size = pool_size or settings.HTTP_POOL_SIZE
+        self.timeout = (connect_timeout or settings.HTTP_CONNECT_TIMEOUT,
+                        read_timeout or settings.HTTP_READ_TIMEOUT)
+        self._lock = threading.Lock()
+        # Havuzdan düşen hostların sayaçları kaybolmasın
+        self._retired: Dict[str, Dict[str, int]] = {}
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        """Bağlantı havuzlu oturumu oluştur"""
+        session = requests.Session()
+        retry = Retry(
+            total=2,
+            connect=2,
+            read=0,
+            status=0,
+            backoff_factor=0.2,
+            allowed_methods=frozenset(['GET', 'HEAD'])
+        )
+        adapter = TimeoutHTTPAdapter(
+            timeout=self.timeout,
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        # Havuzdan çıkarılan host havuzlarının sayaçlarını sakla
+        adapter.poolmanager.pools.dispose_func = self._retire_pool
+        return session
+
+    def _retire_pool(self, pool):
+        with self._lock:
+            counts = self._retired.setdefault(pool.host, {'connections': 0, 'requests': 0})
+            counts['connections'] += pool.num_connections
+            counts['requests'] += pool.num_requests
+        pool.close()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Ortak oturum üzerinden GET isteği"""
+        return self.session.get(url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        """Ortak oturum üzerinden HEAD isteği"""
+        return self.session.head(url, **kwargs)
+
+    def host_stats(self, url: str) -> Optional[Dict[str, Any]]:
+        """URL'nin hostu için bağlantı sayaçlarını al"""
+        return self.get_stats()['hosts'].get(urlsplit(url).hostname)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Host başına bağlantı yeniden kullanım istatistikleri
+
+        reuse_ratio = 1 - yeni bağlantı / istek; 1'e yakın değerler
+        isteklerin çoğunun açık bir bağlantıdan geçtiğini gösterir.
+        """
+        with self._lock:
+            hosts = {host: dict(counts) for host, counts in self._retired.items()}
+
+        pools = self.session.get_adapter('https://').poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            counts = hosts.setdefault(pool.host, {'connections': 0, 'requests': 0})
+            counts['connections'] += pool.num_connections
+            counts['requests'] += pool.num_requests
+
+        total_connections = total_requests = 0
+        for counts in hosts.values():
+            counts['reuse_ratio'] = (1 - counts['connections'] / counts['requests']
+                                     if counts['requests'] else None)
+            total_connections += counts['connections']
+            total_requests += counts['requests']
+
+        return {
+            'hosts': hosts,
+            'connections': total_connections,
+            'requests': total_requests,
+            'reuse_ratio': 1 - total_connections / total_requests if total_requests else None
+        }
+
+    def close(self):
+        """Açık bağlantıları kapat"""
+        self.session.close()
+
+
+# Global HTTP session pool instance
+http_pool = LazyProxy(HttpSessionPool)
@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Any, Tuple
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+
+
+class MediaRegistry:
+    """
+    Yüklenen medyaların kalıcı kaydı
+
+    Twitter'a yüklenen her dosyanın media_id'si (içerik SHA-256, hesap)
+    anahtarıyla ve son geçerlilik zamanıyla saklanır. Aynı fotoğraf aynı
+    hesaba tekrar gönderilirken (yeniden deneme, önbellekten tekrar seçilen
+    fotoğraf) geçerli media_id yeniden kullanılır, yükleme atlanır.
+    media_id başka hesapta kullanılamaz.
+    """
+
+    def __init__(self, registry_path: str = None, ttl_seconds: int = None):
+        self.logger = logging.getLogger(__name__)
+        settings.create_directories()
+        self.registry_path = registry_path or os.path.join(settings.DATA_DIR, 'media_registry.json')
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.MEDIA_REUSE_TTL_MINUTES * 60
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        # Dosya yolu -> (boyut, değişiklik zamanı, özet); aynı dosya tekrar okunmasın
+        self._digests: Dict[str, Tuple[int, float, str]] = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'expired': 0,
+            'invalidated': 0,
+            'bytes_saved': 0
+        }
+        self._load()
+
+    def _load(self):
+        """Kaydı diskten yükle (süresi dolanlar atılır)"""
+        try:
+            if os.path.exists(self.registry_path):
+                with open(self.registry_path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+                now = time.time()
+                self._entries = {key: entry for key, entry in entries.items() if entry['expires_at'] > now}
+                self.logger.info(f"Medya kaydı yüklendi: {len(self._entries)} geçerli media_id")
+        except Exception as e:
+            self.logger.error(f"Medya kaydı yükleme hatası: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """Kaydı atomik olarak diske yaz (kilit altında çağrılır)"""
+        try:
+            tmp_path = self.registry_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.registry_path)
+        except Exception as e:
+            self.logger.error(f"Medya kaydı kaydetme hatası: {e}")
+
+    def digest(self, file_path: str) -> str:
+        """Dosya içeriğinin SHA-256 özeti (boyut ve değişiklik zamanı aynıysa tekrar hesaplanmaz)"""
+        stat = os.stat(file_path)
+        cached = self._digests.get(file_path)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            return cached[2]
+
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        self._digests[file_path] = (stat.st_size, stat.st_mtime, digest)
+        return digest
+
+    @staticmethod
+    def make_key(digest: str, account: str) -> str:
+        return f"{account}|{digest}"
+
+    def get(self, file_path: str, account: str = 'default') -> Optional[int]:
+        """
+        Dosya için hâlâ geçerli media_id'yi al
+
+        Returns:
+            int: Yeniden kullanılabilir media_id, yoksa None
+        """
+        try:
+            key = self.make_key(self.digest(file_path), account)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry['expires_at'] <= time.time():
+                del self._entries[key]
+                self._save()
+                self.stats['expired'] += 1
+                entry = None
+
+            if not entry:
+                self.stats['misses'] += 1
+                return None
+
+            self.stats['hits'] += 1
+            self.stats['bytes_saved'] += entry.get('bytes', 0)
+            return entry['media_id']
+
+    def put(self, file_path: str, media_id: int, account: str = 'default',
+            expires_after_secs: Optional[int] = None):
+        """
+        Yüklenen medyayı kaydet
+
+        Args:
+            file_path: Yüklenen dosya
+            media_id: Twitter'ın döndürdüğü kimlik
+            account: Hesap adı
+            expires_after_secs: Twitter'ın bildirdiği geçerlilik süresi (varsa TTL'den kısa olanı kullanılır)
+        """
+        try:
+            key = self.make_key(self.digest(file_path), account)
+            size = os.path.getsize(file_path)
+        except OSError as e:
+            self.logger.warning(f"Medya kaydı atlandı: {e}")
+            return
+
+        ttl = self.ttl_seconds
+        if expires_after_secs:
+            # Sunucu süresinin sonuna yakın kullanılmasın
+            ttl = min(ttl, expires_after_secs * 0.9)
+
+        now = time.time()
+        with self._lock:
+            # Süresi dolan kayıtları temizle
+            self._entries = {k: e for k, e in self._entries.items() if e['expires_at'] > now}
+            self._entries[key] = {
+                'media_id': media_id,
+                'bytes': size,
+                'uploaded_at': now,
+                'expires_at': now + ttl
+            }
+            self._save()
+
+    def invalidate(self, media_ids, account: str = 'default'):
+        """Twitter'ın reddettiği media_id'leri kayıttan sil"""
+        media_ids = {str(media_id) for media_id in media_ids or []}
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if key.startswith(f"{account}|") and str(entry['media_id']) in media_ids]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self.stats['invalidated'] += len(stale)
+                self._save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Yeniden kullanım oranı ve sayaçlar"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'entries': len(self._entries),
+                'hit_ratio': round(self.stats['hits'] / lookups, 3) if lookups else None,
+                **self.stats
+            }
+
+
+# Global media registry instance
+media_registry = LazyProxy(MediaRegistry)
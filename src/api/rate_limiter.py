@@ -0,0 +1,251 @@
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+
+
+class RateLimitExceeded(Exception):
+    """Uç noktanın istek hakkı dolduğunda fırlatılır (reject modu)"""
+
+    def __init__(self, endpoint: str, account: str, retry_after: float):
+        super().__init__(f"{account}/{endpoint} istek sınırı doldu, {retry_after:.0f} sn sonra tekrar denenebilir")
+        self.endpoint = endpoint
+        self.account = account
+        self.retry_after = retry_after
+        # Ertelenen işin yeniden çalıştırılması için taşınan veri (örn. hazırlanmış tweet)
+        self.payload = None
+
+
+class RateLimitDeferred(RateLimitExceeded):
+    """İstek hakkı dolduğunda işin yeniden zamanlanması gerektiğini bildirir (defer modu)"""
+
+
+class TokenBucket:
+    """
+    Tek uç nokta için jeton kovası
+
+    Sunucudan bilgi gelene kadar kova pencere boyunca sürekli dolar
+    (capacity / window jeton/sn). x-rate-limit-* başlıkları geldiğinde kalan
+    hak sunucudaki değere eşitlenir ve kova sıfırlanma anında tamamen dolar.
+    """
+
+    def __init__(self, capacity: int, window_seconds: float):
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        # Sunucunun bildirdiği pencere sonu (monotonic), bilinmiyorsa None
+        self.reset_at = None
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.window_seconds
+
+    def _refill(self, now: float):
+        if self.reset_at is not None:
+            # Sunucu penceresi: sıfırlanmaya kadar yalnızca bildirilen hak kullanılır
+            if now >= self.reset_at:
+                self.tokens = float(self.capacity)
+                self.reset_at = None
+        else:
+            elapsed = now - self.updated_at
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Bir jeton için beklenmesi gereken süre (0 ise hemen alınabilir)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        if self.reset_at is not None:
+            return self.reset_at - now
+        return (1 - self.tokens) / self.refill_rate
+
+    def try_take(self) -> float:
+        """Jeton almayı dene; alınırsa 0, alınamazsa beklenmesi gereken süre"""
+        wait = self.wait_time(time.monotonic())
+        if wait <= 0:
+            self.tokens -= 1
+        return wait
+
+    def sync(self, limit: int, remaining: int, reset_epoch: Optional[float]):
+        """Sunucunun bildirdiği sınıra göre kovayı güncelle"""
+        now = time.monotonic()
+        if limit:
+            self.capacity = limit
+        self.tokens = float(min(remaining, self.capacity))
+        self.updated_at = now
+        if reset_epoch:
+            self.reset_at = now + max(reset_epoch - time.time(), 0)
+
+
+class RateLimiter:
+    """
+    Hesap ve uç nokta başına istemci taraflı istek sınırlayıcı
+
+    Her (hesap, uç nokta) çifti için bir jeton kovası tutulur. Kovalar tweepy
+    oturumlarına eklenen yanıt kancası ile x-rate-limit-* başlıklarından
+    beslenir. Hak dolduğunda çağıran üç davranıştan birini seçer:
+    wait (sınırlı süre bekle), defer (işi yeniden zamanla), reject (hemen vazgeç).
+    """
+
+    # Uç nokta -> (istek sayısı, pencere saniye); başlıklar gelince güncellenir
+    DEFAULT_LIMITS = {
+        'create_tweet': (100, 24 * 3600),
+        'media_upload': (415, 15 * 60),
+        'get_me': (75, 15 * 60),
+        'user_tweets': (5, 15 * 60),
+        'trends': (75, 15 * 60)
+    }
+
+    # (HTTP metodu, yol) -> uç nokta
+    ROUTES = {
+        ('POST', '/2/tweets'): 'create_tweet',
+        ('POST', '/1.1/media/upload.json'): 'media_upload',
+        ('GET', '/2/users/me'): 'get_me',
+        ('GET', '/2/users/:id/tweets'): 'user_tweets',
+        ('GET', '/1.1/trends/place.json'): 'trends'
+    }
+
+    MODES = ('wait', 'defer', 'reject')
+
+    def __init__(self, default_mode: str = 'reject', max_wait_seconds: float = None):
+        self.logger = logging.getLogger(__name__)
+        self.default_mode = default_mode
+        self.max_wait_seconds = (max_wait_seconds if max_wait_seconds is not None
+                                 else settings.RATE_LIMIT_MAX_WAIT_SECONDS)
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'acquired': 0,
+            'waited': 0,
+            'deferred': 0,
+            'rejected': 0,
+            'header_updates': 0,
+            'server_429': 0
+        }
+
+    def _bucket(self, account: str, endpoint: str) -> TokenBucket:
+        key = (account, endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            capacity, window = self.DEFAULT_LIMITS.get(endpoint, (15, 15 * 60))
+            bucket = self._buckets[key] = TokenBucket(capacity, window)
+        return bucket
+
+    def acquire(self, endpoint: str, account: str = 'default', mode: str = None):
+        """
+        Uç nokta için istek hakkı al
+
+        Args:
+            endpoint: Uç nokta adı (örn. 'create_tweet')
+            account: Hesap adı
+            mode: 'wait', 'defer' veya 'reject' (None ise varsayılan)
+
+        Raises:
+            RateLimitDeferred: defer modunda hak yoksa
+            RateLimitExceeded: reject modunda veya bekleme süresi üst sınırı aşıyorsa
+        """
+        mode = mode or self.default_mode
+        if mode not in self.MODES:
+            raise ValueError(f"Geçersiz istek sınırı modu: {mode}")
+        while True:
+            with self._lock:
+                wait = self._bucket(account, endpoint).try_take()
+                if wait <= 0:
+                    self.stats['acquired'] += 1
+                    return
+
+                if mode == 'wait' and wait <= self.max_wait_seconds:
+                    self.stats['waited'] += 1
+                elif mode == 'defer':
+                    self.stats['deferred'] += 1
+                    raise RateLimitDeferred(endpoint, account, wait)
+                else:
+                    self.stats['rejected'] += 1
+                    raise RateLimitExceeded(endpoint, account, wait)
+
+            self.logger.info(f"⏳ {account}/{endpoint} istek sınırı: {wait:.1f} sn bekleniyor")
+            time.sleep(wait)
+
+    def retry_after(self, endpoint: str, account: str = 'default') -> float:
+        """Hak dolduysa yeniden denemeye kalan süre (jeton harcamaz)"""
+        with self._lock:
+            return self._bucket(account, endpoint).wait_time(time.monotonic())
+
+    def update_from_headers(self, endpoint: str, account: str, headers, status_code: int = None):
+        """x-rate-limit-* başlıklarıyla kovayı eşitle"""
+        remaining = headers.get('x-rate-limit-remaining')
+        if remaining is None:
+            return
+        try:
+            limit = int(headers.get('x-rate-limit-limit') or 0)
+            remaining = int(remaining)
+            reset = headers.get('x-rate-limit-reset')
+            reset_epoch = float(reset) if reset else None
+        except ValueError:
+            return
+
+        if status_code == 429:
+            remaining = 0
+            self.stats['server_429'] += 1
+
+        with self._lock:
+            self._bucket(account, endpoint).sync(limit, remaining, reset_epoch)
+            self.stats['header_updates'] += 1
+
+    def endpoint_for(self, method: str, url: str) -> Optional[str]:
+        """İstek metodu ve URL'den uç nokta adını bul"""
+        method, path = method.upper(), urlsplit(url).path
+        endpoint = self.ROUTES.get((method, path))
+        if endpoint is None:
+            # Yoldaki kullanıcı kimliği ':id' olarak eşlenir
+            endpoint = self.ROUTES.get((method, re.sub(r'(?<=/users/)\d+', ':id', path)))
+        return endpoint
+
+    @staticmethod
+    def is_rate_limit_error(error: BaseException) -> bool:
+        """Hata sunucunun 429 yanıtından mı kaynaklanıyor"""
+        return getattr(getattr(error, 'response', None), 'status_code', None) == 429
+
+    def response_hook(self, account: str = 'default'):
+        """requests oturumuna eklenecek yanıt kancası"""
+        def hook(response, *args, **kwargs):
+            try:
+                endpoint = self.endpoint_for(response.request.method, response.url)
+                if endpoint:
+                    self.update_from_headers(endpoint, account, response.headers, response.status_code)
+            except Exception as e:
+                self.logger.warning(f"Rate limit başlığı okunamadı: {e}")
+            return response
+        return hook
+
+    def attach(self, session, account: str = 'default'):
+        """tweepy oturumunun yanıtlarını sınırlayıcıya bağla"""
+        session.hooks.setdefault('response', []).append(self.response_hook(account))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Kova durumları ve sayaçlar"""
+        with self._lock:
+            now = time.monotonic()
+            buckets = {}
+            for (account, endpoint), bucket in self._buckets.items():
+                buckets[f"{account}/{endpoint}"] = {
+                    'capacity': bucket.capacity,
+                    'wait_seconds': round(bucket.wait_time(now), 1),
+                    'tokens': round(bucket.tokens, 2),
+                    'resets_in_seconds': round(bucket.reset_at - now, 1) if bucket.reset_at is not None else None
+                }
+            return {
+                'mode': self.default_mode,
+                'buckets': buckets,
+                **self.stats
+            }
+
+
+# Global rate limiter instance
+rate_limiter = LazyProxy(RateLimiter)
@@ -1,11 +1,33 @@
-import tweepy
+import re
+import time
 import logging
 import random
-from typing import List, Dict, Optional
+import threading
+from typing import Any, List, Dict, Optional
 from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.utils.resilience import resilience
+from src.api.twitter_client import is_transient_twitter_error
+from src.api.rate_limiter import rate_limiter
 
 class TrendsClient:
-    """Twitter Trends API istemcisi"""
+    """
+    Twitter Trends API istemcisi
+    
+    Trendler arka plandaki bir iş parçacığında TREND_WOEIDS için
+    TREND_REFRESH_MINUTES aralıkla alınır ve WOEID başına zaman damgasıyla
+    önbelleğe yazılır. Saç/güzellik anahtar kelimeleriyle eşleşenler hashtag'e
+    çevrilir; içerik üretimi yalnızca önbelleği okur, ağ isteği yapmaz.
+    """
+    
+    # Lokasyon WOEID'leri
+    LOCATION_WOEIDS = {
+        "worldwide": 1,
+        "turkey": 23424969,
+        "usa": 23424977,
+        "uk": 23424975,
+        "canada": 23424775
+    }
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
@@ -13,6 +35,18 @@ class TrendsClient:
         self.api = None
         self._setup_client()
         
+        # WOEID -> {'fetched_at', 'trends', 'hashtags'}
+        self._cache: Dict[int, Dict[str, Any]] = {}
+        self._cache_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresher = None
+        self.stats = {
+            'refreshes': 0,
+            'errors': 0,
+            'cache_hits': 0,
+            'fallbacks': 0
+        }
+        
         # Saç/güzellik ile ilgili trend filtreleri
         self.beauty_keywords = [
             'hair', 'beauty', 'style', 'fashion', 'makeup', 'skincare',
@@ -31,6 +65,8 @@ class TrendsClient:
     def _setup_client(self):
         """Twitter API istemcisini ayarla"""
         try:
+            import tweepy
+            
             # OAuth 1.0a (v1.1 API için)
             auth = tweepy.OAuth1UserHandler(
                 settings.TWITTER_API_KEY,
@@ -39,7 +75,8 @@ class TrendsClient:
                 settings.TWITTER_ACCESS_TOKEN_SECRET
             )
             
-            self.api = tweepy.API(auth, wait_on_rate_limit=True)
+            self.api = tweepy.API(auth, wait_on_rate_limit=False)
+            rate_limiter.attach(self.api.session)
             
             # OAuth 2.0 (v2 API için)
             self.client = tweepy.Client(
@@ -48,34 +85,58 @@ class TrendsClient:
                 consumer_secret=settings.TWITTER_API_SECRET,
                 access_token=settings.TWITTER_ACCESS_TOKEN,
                 access_token_secret=settings.TWITTER_ACCESS_TOKEN_SECRET,
-                wait_on_rate_limit=True
+                wait_on_rate_limit=False
             )
+            rate_limiter.attach(self.client.session)
             
             self.logger.info("Trends API istemcisi başarıyla ayarlandı")
             
         except Exception as e:
             self.logger.error(f"Trends API ayarlama hatası: {e}")
     
-    def get_trending_hashtags(self, woeid: int = 1, count: int = 10) -> List[str]:
+    def get_trending_hashtags(self, woeid: Optional[int] = None, count: int = 10) -> List[str]:
         """
-        Trend olan hashtag'leri al
+        Trend olan hashtag'leri al (yalnızca önbellekten, ağ isteği yapmaz)
         
         Args:
-            woeid: Where On Earth ID (1 = Worldwide, 23424969 = Turkey)
+            woeid: Where On Earth ID (None ise TREND_WOEIDS'in hepsi; 1 = Worldwide, 23424969 = Turkey)
             count: Kaç hashtag alınacağı
             
         Returns:
-            List[str]: Trend hashtag'ler listesi
+            List[str]: Hacme göre sıralı güncel trend hashtag'ler, eksik kalanlar popüler hashtag'lerden
         """
-        # Twitter API Basic planında Trends API erişimi yok
-        # Direkt fallback hashtag'leri kullan
-        self.logger.info(f"Popüler hashtag'ler kullanılıyor ({count} adet)")
-        return random.sample(self.fallback_trends, min(count, len(self.fallback_trends)))
+        woeids = [woeid] if woeid is not None else settings.TREND_WOEIDS
+        max_age = settings.TREND_MAX_AGE_MINUTES * 60
+        now = time.time()
+        
+        ranked = []
+        with self._cache_lock:
+            for entry in (self._cache.get(w) for w in woeids):
+                if entry and now - entry['fetched_at'] <= max_age:
+                    ranked.extend(entry['hashtags'])
+        
+        hashtags = []
+        for tag, _ in sorted(ranked, key=lambda item: item[1], reverse=True):
+            if tag.lower() not in (h.lower() for h in hashtags):
+                hashtags.append(tag)
+        hashtags = hashtags[:count]
+        
+        if hashtags:
+            self.stats['cache_hits'] += 1
+        
+        # Twitter API Basic planında Trends API erişimi yok, eksikler popüler hashtag'lerle tamamlanır
+        if len(hashtags) < count:
+            self.stats['fallbacks'] += 1
+            fill = [tag for tag in self.fallback_trends if tag not in hashtags]
+            hashtags += random.sample(fill, min(count - len(hashtags), len(fill)))
+        return hashtags
     
     def get_mixed_hashtags(self, base_count: int = 3, trend_count: int = 2) -> List[str]:
         """
         Sabit hashtag'ler + trend hashtag'ler karışımı
         
+        Seçim hashtag_selector üzerinden yapılır, aynı zaman diliminde aynı set döner.
+        
         Args:
             base_count: Sabit hashtag sayısı
             trend_count: Trend hashtag sayısı
@@ -83,19 +144,10 @@ class TrendsClient:
         Returns:
             List[str]: Karışık hashtag listesi
         """
+        from src.content_creator.hashtag_selector import hashtag_selector
+        
         try:
-            # Sabit saç hashtag'lerinden seç
-            base_hashtags = random.sample(settings.HASHTAGS, min(base_count, len(settings.HASHTAGS)))
-            
-            # Trend hashtag'leri al
-            trend_hashtags = self.get_trending_hashtags(count=trend_count)
-            
-            # Karıştır ve döndür
-            mixed_hashtags = base_hashtags + trend_hashtags
-            
-            self.logger.info(f"Karışık hashtag'ler: {len(base_hashtags)} sabit + {len(trend_hashtags)} trend")
-            return mixed_hashtags
-            
+            return hashtag_selector.select(base_count=base_count, trend_count=trend_count)
         except Exception as e:
             self.logger.info(f"Trend API erişimi sınırlı, sabit hashtag'ler kullanılıyor")
             # Hata durumunda sadece sabit hashtag'ler
@@ -105,43 +157,131 @@ class TrendsClient:
         """
         Belirli lokasyon için trend'leri al
         
+        Önbellekteki veri TREND_MAX_AGE_MINUTES'tan yeniyse istek atılmaz.
+        
         Args:
             location: Lokasyon ("worldwide", "turkey", "usa", etc.)
             
         Returns:
             List[Dict]: Trend bilgileri
         """
-        try:
-            # Lokasyon WOEID'leri
-            location_woeids = {
-                "worldwide": 1,
-                "turkey": 23424969,
-                "usa": 23424977,
-                "uk": 23424975,
-                "canada": 23424775
-            }
-            
-            woeid = location_woeids.get(location.lower(), 1)
-            
-            if not self.api:
-                return []
-            
-            trends = self.api.get_place_trends(woeid)[0]['trends']
-            
-            trend_list = []
-            for trend in trends[:20]:  # İlk 20 trend
-                trend_list.append({
-                    'name': trend['name'],
-                    'url': trend['url'],
-                    'tweet_volume': trend.get('tweet_volume', 0)
-                })
-            
+        woeid = self.LOCATION_WOEIDS.get(location.lower(), 1)
+        
+        with self._cache_lock:
+            entry = self._cache.get(woeid)
+        if entry and time.time() - entry['fetched_at'] <= settings.TREND_MAX_AGE_MINUTES * 60:
+            return list(entry['trends'])
+        
+        if self.refresh_woeid(woeid):
+            with self._cache_lock:
+                trend_list = list(self._cache[woeid]['trends'])
             self.logger.info(f"{location} için {len(trend_list)} trend alındı")
             return trend_list
-            
+        return []
+    
+    def _fetch_place_trends(self, woeid: int) -> List[Dict]:
+        """WOEID için trendleri API'den al"""
+        if not self.api:
+            raise RuntimeError("Trends API istemcisi yok")
+        
+        # Sınır doluysa beklemeden vazgeç, önceki önbellek kullanılmaya devam eder
+        rate_limiter.acquire('trends', mode='reject')
+        trends = resilience.call('twitter:trends', self.api.get_place_trends, woeid,
+                                 retries=1, is_transient=is_transient_twitter_error)[0]['trends']
+        
+        return [{
+            'name': trend['name'],
+            'url': trend['url'],
+            'tweet_volume': trend.get('tweet_volume') or 0
+        } for trend in trends[:50]]
+    
+    def _beauty_hashtags(self, trends: List[Dict]) -> List[tuple]:
+        """Saç/güzellikle ilgili trendleri (hashtag, hacim) çiftlerine çevir"""
+        hashtags = []
+        for trend in trends:
+            name = trend['name']
+            if not any(keyword in name.lower() for keyword in self.beauty_keywords):
+                continue
+            tag = name if name.startswith('#') else '#' + re.sub(r'\W', '', name)
+            if len(tag) > 1:
+                hashtags.append((tag, trend['tweet_volume']))
+        return hashtags
+    
+    def refresh_woeid(self, woeid: int) -> bool:
+        """
+        Tek WOEID için trendleri yenile ve önbelleğe yaz
+        
+        Returns:
+            bool: Yenileme başarılı mı (başarısızsa eski kayıt korunur)
+        """
+        try:
+            trends = self._fetch_place_trends(woeid)
         except Exception as e:
-            self.logger.info(f"Trend API erişimi sınırlı")
-            return []
+            self.stats['errors'] += 1
+            self.logger.info(f"Trend API erişimi sınırlı (WOEID {woeid}): {e}")
+            return False
+        
+        hashtags = self._beauty_hashtags(trends)
+        with self._cache_lock:
+            self._cache[woeid] = {
+                'fetched_at': time.time(),
+                'trends': trends[:20],  # İlk 20 trend
+                'hashtags': hashtags
+            }
+        self.stats['refreshes'] += 1
+        self.logger.info(f"WOEID {woeid}: {len(trends)} trend, {len(hashtags)} saç/güzellik hashtag'i")
+        return True
+    
+    def refresh_trends(self) -> int:
+        """Yapılandırılan tüm WOEID'leri yenile, başarılı olanların sayısını döndür"""
+        return sum(self.refresh_woeid(woeid) for woeid in settings.TREND_WOEIDS)
+    
+    def start_background_refresh(self) -> bool:
+        """
+        Trendleri arka planda düzenli yenileyen iş parçacığını başlat
+        
+        TREND_REFRESH_MINUTES 0 ise başlatılmaz. Birden fazla çağrı tek
+        iş parçacığı başlatır.
+        
+        Returns:
+            bool: Yenileyici çalışıyor mu
+        """
+        interval = settings.TREND_REFRESH_MINUTES * 60
+        if interval <= 0:
+            return False
+        if self._refresher and self._refresher.is_alive():
+            return True
+        
+        self._stop_event.clear()
+        
+        def loop():
+            while not self._stop_event.is_set():
+                self.refresh_trends()
+                self._stop_event.wait(interval)
+        
+        self._refresher = threading.Thread(target=loop, name="trend-refresh", daemon=True)
+        self._refresher.start()
+        self.logger.info(f"Trend yenileyici başladı: {settings.TREND_WOEIDS} her {settings.TREND_REFRESH_MINUTES} dk")
+        return True
+    
+    def stop_background_refresh(self):
+        """Arka plan yenileyicisini durdur"""
+        self._stop_event.set()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """WOEID başına önbellek yaşı ve sayaçlar"""
+        now = time.time()
+        with self._cache_lock:
+            woeids = {woeid: {
+                'age_seconds': round(now - entry['fetched_at'], 1),
+                'trends': len(entry['trends']),
+                'hashtags': [tag for tag, _ in entry['hashtags']]
+            } for woeid, entry in self._cache.items()}
+        return {
+            'refresher_running': bool(self._refresher and self._refresher.is_alive()),
+            'woeids': woeids,
+            **self.stats
+        }
 
 # Global trends client instance
-trends_client = TrendsClient()
\ No newline at end of file
+trends_client = LazyProxy(TrendsClient)
\ No newline at end of file
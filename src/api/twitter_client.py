@@ -1,23 +1,119 @@
-import tweepy
+import os
+import re
+import html
+import time
 import logging
-from typing import Optional, List
+import mimetypes
+import threading
+from typing import Optional, List, Dict, Any
 from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.utils.resilience import resilience
+from src.api.rate_limiter import rate_limiter, RateLimitDeferred
+from src.api.media_registry import media_registry
+
+
+def is_transient_twitter_error(error: BaseException) -> bool:
+    """Twitter hatası geçici mi (bağlantı hatası veya 5xx)"""
+    import tweepy
+    
+    if isinstance(error, tweepy.errors.TwitterServerError):
+        return True
+    # 429 istek sınırlayıcıya bırakılır, diğer HTTP hataları (400/401/403/404) kalıcıdır
+    return not isinstance(error, tweepy.errors.HTTPException)
+
+
+class ChunkedUpload:
+    """
+    Parçalı (INIT/APPEND/FINALIZE) medya yüklemesinin durumu
+
+    Yükleme yarıda kalırsa durum istemcide saklanır; aynı dosya tekrar
+    yüklenirken INIT atlanır ve gönderim kalan parçadan devam eder.
+    """
+
+    # INIT ile alınan media_id 24 saat geçerlidir, sınıra yakın yeniden kullanılmaz
+    MAX_AGE_SECONDS = 23 * 3600
+
+    def __init__(self, file_path: str, total_bytes: int, chunk_size: int, media_type: str):
+        self.file_path = file_path
+        self.total_bytes = total_bytes
+        self.chunk_size = chunk_size
+        self.media_type = media_type
+        self.segments = max(1, -(-total_bytes // chunk_size))
+        self.media_id = None
+        self.initialized_at = None
+        self.next_segment = 0
+        self.bytes_sent = 0
+        self.seconds = 0.0
+        self.chunk_ms: List[float] = []
+        self.attempts = 0
+
+    @property
+    def expired(self) -> bool:
+        return self.initialized_at is not None and time.time() - self.initialized_at > self.MAX_AGE_SECONDS
+
+    def matches(self, total_bytes: int) -> bool:
+        """Dosya değişmemiş ve media_id hâlâ kullanılabilir mi"""
+        return self.total_bytes == total_bytes and not self.expired
+
+    def record_chunk(self, size: int, seconds: float):
+        self.next_segment += 1
+        self.bytes_sent += size
+        self.seconds += seconds
+        self.chunk_ms.append(seconds * 1000)
+
+    @property
+    def throughput_kbps(self) -> Optional[float]:
+        """Gönderilen parçaların ortalama hızı (KB/sn)"""
+        return self.bytes_sent / 1024 / self.seconds if self.seconds else None
+
 
 class TwitterClient:
     """X.com (Twitter) API istemcisi"""
     
-    def __init__(self):
-        self.api_key = settings.TWITTER_API_KEY
-        self.api_secret = settings.TWITTER_API_SECRET
-        self.client_id = settings.TWITTER_CLIENT_ID
-        self.client_secret = settings.TWITTER_CLIENT_SECRET
-        self.username = settings.TWITTER_USERNAME
+    def __init__(self, account: str = 'default', credentials: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            account: Hesap adı (istek sınırı ve devre kesici anahtarı)
+            credentials: Hesaba özel anahtarlar (verilmeyenler settings'den alınır)
+        """
+        credentials = credentials or {}
+        self.account = account
+        self.api_key = credentials.get('api_key') or settings.TWITTER_API_KEY
+        self.api_secret = credentials.get('api_secret') or settings.TWITTER_API_SECRET
+        self.access_token = credentials.get('access_token') or settings.TWITTER_ACCESS_TOKEN
+        self.access_token_secret = credentials.get('access_token_secret') or settings.TWITTER_ACCESS_TOKEN_SECRET
+        self.client_id = credentials.get('client_id') or settings.TWITTER_CLIENT_ID
+        self.client_secret = credentials.get('client_secret') or settings.TWITTER_CLIENT_SECRET
+        self.username = credentials.get('username') or settings.TWITTER_USERNAME
         self.client = None
         self.api = None
+        self._user_id = None
+        # Profil önbelleği (get_user_info), gönderimden sonra eskimiş sayılır
+        self._profile = None
+        self._profile_at = None
+        self._profile_stale = False
+        self._profile_refreshing = False
+        self._profile_lock = threading.Lock()
+        # Yarıda kalan parçalı yüklemeler (dosya yolu -> durum), tekrar denemede devam edilir
+        self._chunked_uploads: Dict[str, ChunkedUpload] = {}
+        self._upload_lock = threading.Lock()
+        self.upload_stats = {
+            'uploads': 0,
+            'chunked_uploads': 0,
+            'resumed': 0,
+            'interrupted': 0,
+            'chunks': 0,
+            'bytes': 0,
+            'seconds': 0.0,
+            'last_kbps': None,
+            'last_max_chunk_ms': None
+        }
         self._setup_logging()
         
     def _setup_logging(self):
         """Logging ayarları"""
+        settings.create_directories()
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -34,10 +130,12 @@ class TwitterClient:
         OAuth 2.0 Bearer Token veya OAuth 1.0a kullanabilir
         """
         try:
-            # Eğer access token verilmemişse, settings'den al
+            import tweepy
+            
+            # Eğer access token verilmemişse, hesabın kendi token'ını kullan
             if not access_token:
-                access_token = settings.TWITTER_ACCESS_TOKEN
-                access_token_secret = settings.TWITTER_ACCESS_TOKEN_SECRET
+                access_token = self.access_token
+                access_token_secret = self.access_token_secret
             
             # OAuth 1.0a ile (okuma ve yazma için)
             auth = tweepy.OAuth1UserHandler(
@@ -47,7 +145,10 @@ class TwitterClient:
                 access_token_secret
             )
             
-            self.api = tweepy.API(auth, wait_on_rate_limit=True)
+            # İstek sınırına gelindiğinde tweepy'nin çağrı içinde uyumasını engelle,
+            # sınırlar x-rate-limit-* başlıklarından rate_limiter'a aktarılır
+            self.api = tweepy.API(auth, wait_on_rate_limit=False)
+            rate_limiter.attach(self.api.session, self.account)
             
             # OAuth 2.0 Client ile de dene
             try:
@@ -56,7 +157,7 @@ class TwitterClient:
                     consumer_secret=self.api_secret,
                     access_token=access_token,
                     access_token_secret=access_token_secret,
-                    wait_on_rate_limit=True
+                    wait_on_rate_limit=False
                 )
             except Exception as oauth1_error:
                 self.logger.warning(f"OAuth 1.0a hatası: {oauth1_error}")
@@ -64,8 +165,9 @@ class TwitterClient:
                 self.client = tweepy.Client(
                     client_id=self.client_id,
                     client_secret=self.client_secret,
-                    wait_on_rate_limit=True
+                    wait_on_rate_limit=False
                 )
+            rate_limiter.attach(self.client.session, self.account)
             
             # Bağlantıyı test et
             if self.client:
@@ -79,68 +181,365 @@ class TwitterClient:
             self.logger.error(f"Twitter kimlik doğrulama hatası: {e}")
             return False
     
-    def post_tweet(self, text: str, image_path: Optional[str] = None) -> bool:
+    def _endpoint(self, name: str) -> str:
+        """Devre kesici uç nokta adı (hesapların hataları birbirini etkilemesin)"""
+        if self.account == 'default':
+            return f"twitter:{name}"
+        return f"twitter[{self.account}]:{name}"
+    
+    def _deferred(self, endpoint: str, error: Exception, rate_limit_mode: Optional[str]) -> Optional[RateLimitDeferred]:
+        """Sunucu 429 döndürdüyse ve defer modundaysa ertelenme hatası oluştur"""
+        if rate_limit_mode == 'defer' and rate_limiter.is_rate_limit_error(error):
+            return RateLimitDeferred(endpoint, self.account, rate_limiter.retry_after(endpoint, self.account))
+        return None
+    
+    def upload_media(self, image_path: str, rate_limit_mode: Optional[str] = None) -> Optional[int]:
+        """
+        Görseli yükle ve media_id döndür
+        
+        Tweet gönderiminden önce (ön hazırlık aşamasında) çağrılabilir. Aynı
+        dosyanın bu hesaba ait geçerli bir media_id'si varsa yükleme atlanır.
+        
+        Args:
+            image_path: Görsel dosya yolu
+            rate_limit_mode: İstek sınırı dolunca davranış ('wait', 'defer', 'reject')
+            
+        Returns:
+            int: Yüklenen medyanın kimliği
+        """
+        try:
+            if not self.api:
+                self.logger.error("Twitter API başlatılmamış!")
+                return None
+            
+            # Aynı dosya bu hesaba yakın zamanda yüklendiyse media_id'yi yeniden kullan
+            media_id = media_registry.get(image_path, self.account)
+            if media_id:
+                self.logger.info(f"Görsel yeniden kullanıldı! Media ID: {media_id}")
+                return media_id
+            
+            if settings.MEDIA_CHUNKED_UPLOAD and os.path.getsize(image_path) > settings.MEDIA_CHUNK_SIZE_KB * 1024:
+                media = self.upload_media_chunked(image_path, rate_limit_mode)
+            else:
+                rate_limiter.acquire('media_upload', self.account, rate_limit_mode)
+                media = resilience.call(self._endpoint('media_upload'), self.api.media_upload, image_path,
+                                        retries=2, is_transient=is_transient_twitter_error)
+                with self._upload_lock:
+                    self.upload_stats['uploads'] += 1
+            media_registry.put(image_path, media.media_id, self.account,
+                               getattr(media, 'expires_after_secs', None))
+            self.logger.info(f"Görsel yüklendi! Media ID: {media.media_id}")
+            return media.media_id
+            
+        except RateLimitDeferred:
+            raise
+        except Exception as e:
+            deferred = self._deferred('media_upload', e, rate_limit_mode)
+            if deferred:
+                raise deferred
+            self.logger.error(f"Görsel yükleme hatası: {e}")
+            return None
+    
+    def upload_media_chunked(self, image_path: str, rate_limit_mode: Optional[str] = None):
+        """
+        Görseli parçalar halinde yükle (INIT/APPEND/FINALIZE)
+        
+        Her parça kendi tekrar deneme hakkıyla gönderilir, bağlantı kopması
+        yalnızca o parçanın yeniden gönderilmesine mal olur. Parçalardan biri
+        tüm denemelere rağmen gönderilemezse durum saklanır ve aynı dosya
+        tekrar yüklenirken kalan parçadan devam edilir.
+        
+        Args:
+            image_path: Görsel dosya yolu
+            rate_limit_mode: İstek sınırı dolunca davranış ('wait', 'defer', 'reject')
+            
+        Returns:
+            tweepy.models.Media: FINALIZE yanıtı (media_id, expires_after_secs)
+        """
+        endpoint = self._endpoint('media_upload')
+        total_bytes = os.path.getsize(image_path)
+        
+        with self._upload_lock:
+            upload = self._chunked_uploads.pop(image_path, None)
+            resumed = bool(upload) and upload.matches(total_bytes)
+            if resumed:
+                self.upload_stats['resumed'] += 1
+        if resumed:
+            self.logger.info(f"Parçalı yükleme kaldığı yerden sürüyor: "
+                             f"{upload.next_segment}/{upload.segments} parça (Media ID: {upload.media_id})")
+        else:
+            # APPEND parçası en fazla 5 MB olabilir
+            chunk_size = min(settings.MEDIA_CHUNK_SIZE_KB, 5 * 1024) * 1024
+            upload = ChunkedUpload(image_path, total_bytes, chunk_size,
+                                   mimetypes.guess_type(image_path)[0] or 'image/jpeg')
+        upload.attempts += 1
+        
+        try:
+            if upload.media_id is None:
+                rate_limiter.acquire('media_upload', self.account, rate_limit_mode)
+                init = resilience.call(endpoint, self.api.chunked_upload_init, total_bytes, upload.media_type,
+                                       media_category='tweet_image', retries=settings.MEDIA_CHUNK_RETRIES,
+                                       is_transient=is_transient_twitter_error)
+                upload.media_id = init.media_id
+                upload.initialized_at = time.time()
+            
+            with open(image_path, 'rb') as f:
+                f.seek(upload.next_segment * upload.chunk_size)
+                while upload.next_segment < upload.segments:
+                    chunk = f.read(upload.chunk_size)
+                    rate_limiter.acquire('media_upload', self.account, rate_limit_mode)
+                    started = time.perf_counter()
+                    # APPEND aynı segment numarasıyla tekrarlanabilir, parça başına tekrar denenir
+                    resilience.call(endpoint, self.api.chunked_upload_append, upload.media_id,
+                                    (os.path.basename(image_path), chunk), upload.next_segment,
+                                    retries=settings.MEDIA_CHUNK_RETRIES, is_transient=is_transient_twitter_error)
+                    upload.record_chunk(len(chunk), time.perf_counter() - started)
+            
+            rate_limiter.acquire('media_upload', self.account, rate_limit_mode)
+            media = resilience.call(endpoint, self.api.chunked_upload_finalize, upload.media_id,
+                                    retries=settings.MEDIA_CHUNK_RETRIES, is_transient=is_transient_twitter_error)
+            
+            # Sunucu tarafında işlem sürüyorsa bitmesini bekle
+            processing = getattr(media, 'processing_info', None)
+            while processing and processing.get('state') in ('pending', 'in_progress'):
+                time.sleep(processing.get('check_after_secs', 1))
+                media = self.api.get_media_upload_status(upload.media_id)
+                processing = getattr(media, 'processing_info', None)
+            if processing and processing.get('state') == 'failed':
+                raise RuntimeError(f"Medya işlenemedi: {processing.get('error')}")
+        
+        except Exception:
+            # Yüklenen parçalar kaybolmasın, sonraki denemede devam edilir
+            if upload.media_id is not None:
+                with self._upload_lock:
+                    self._chunked_uploads[image_path] = upload
+                    self.upload_stats['interrupted'] += 1
+                self.logger.warning(f"Parçalı yükleme yarıda kaldı: {upload.next_segment}/{upload.segments} parça")
+            raise
+        
+        self._record_chunked(upload)
+        return media
+    
+    def _record_chunked(self, upload: ChunkedUpload):
+        """Tamamlanan parçalı yüklemenin hız istatistiklerini kaydet"""
+        kbps = upload.throughput_kbps
+        max_chunk_ms = max(upload.chunk_ms) if upload.chunk_ms else None
+        with self._upload_lock:
+            stats = self.upload_stats
+            stats['uploads'] += 1
+            stats['chunked_uploads'] += 1
+            stats['chunks'] += len(upload.chunk_ms)
+            stats['bytes'] += upload.bytes_sent
+            stats['seconds'] += upload.seconds
+            stats['last_kbps'] = round(kbps, 1) if kbps else None
+            stats['last_max_chunk_ms'] = round(max_chunk_ms, 1) if max_chunk_ms else None
+        self.logger.info(f"Parçalı yükleme tamamlandı: {upload.total_bytes} bayt, {upload.segments} parça, "
+                         f"{kbps or 0:.0f} KB/sn, en yavaş parça {max_chunk_ms or 0:.0f} ms")
+    
+    def get_upload_stats(self) -> Dict[str, Any]:
+        """Medya yükleme hızı ve parçalı yükleme sayaçları"""
+        with self._upload_lock:
+            stats = dict(self.upload_stats)
+            pending = len(self._chunked_uploads)
+        stats['avg_kbps'] = round(stats['bytes'] / 1024 / stats['seconds'], 1) if stats['seconds'] else None
+        stats['avg_chunk_ms'] = round(stats['seconds'] * 1000 / stats['chunks'], 1) if stats['chunks'] else None
+        stats['seconds'] = round(stats['seconds'], 2)
+        stats['pending_resumes'] = pending
+        return stats
+    
+    def post_tweet(self, text: str, image_path: Optional[str] = None,
+                   media_ids: Optional[List[int]] = None,
+                   rate_limit_mode: Optional[str] = None) -> bool:
         """
         Tweet gönder
         
         Args:
             text: Tweet metni
             image_path: Görsel dosya yolu (opsiyonel)
+            media_ids: Önceden yüklenmiş medya kimlikleri (opsiyonel)
+            rate_limit_mode: İstek sınırı dolunca davranış ('wait', 'defer', 'reject');
+                defer modunda RateLimitDeferred fırlatılır, çağıran işi yeniden zamanlar
             
         Returns:
             bool: Başarı durumu
         """
+        return self.send_tweet(text, image_path, media_ids, rate_limit_mode) is not None
+    
+    def send_tweet(self, text: str, image_path: Optional[str] = None,
+                   media_ids: Optional[List[int]] = None,
+                   rate_limit_mode: Optional[str] = None) -> Optional[str]:
+        """
+        Tweet gönder ve tweet kimliğini döndür
+        
+        Argümanlar post_tweet ile aynıdır.
+        
+        Returns:
+            str: Gönderilen tweet'in kimliği, başarısızsa None
+        """
         try:
             if not self.client:
                 self.logger.error("Twitter client başlatılmamış!")
-                return False
+                return None
             
-            # Görsel varsa yükle
-            media_id = None
-            if image_path and self.api:
-                media = self.api.media_upload(image_path)
-                media_id = [media.media_id]
+            # Önceden yüklenmiş medya yoksa görseli şimdi yükle
+            if not media_ids and image_path and self.api:
+                media_id = self.upload_media(image_path, rate_limit_mode)
+                if not media_id:
+                    return None
+                media_ids = [media_id]
             
-            # Tweet gönder
-            if media_id:
-                response = self.client.create_tweet(text=text, media_ids=media_id)
-            else:
-                response = self.client.create_tweet(text=text)
+            # Tweet gönder (idempotent değil, tekrar denenmez)
+            rate_limiter.acquire('create_tweet', self.account, rate_limit_mode)
+            tweet_kwargs = {'text': text}
+            if media_ids:
+                tweet_kwargs['media_ids'] = media_ids
+            response = resilience.call(self._endpoint('create_tweet'), self.client.create_tweet,
+                                       retries=0, is_transient=is_transient_twitter_error, **tweet_kwargs)
             
             if response.data:
-                tweet_id = response.data['id']
+                tweet_id = str(response.data['id'])
+                self.invalidate_profile()
                 self.logger.info(f"Tweet başarıyla gönderildi! ID: {tweet_id}")
-                return True
+                return tweet_id
             else:
                 self.logger.error("Tweet gönderilemedi!")
-                return False
+                return None
                 
+        except RateLimitDeferred:
+            raise
         except Exception as e:
+            deferred = self._deferred('create_tweet', e, rate_limit_mode)
+            if deferred:
+                raise deferred
+            if media_ids and getattr(getattr(e, 'response', None), 'status_code', None) == 400:
+                # Süresi dolmuş veya geçersiz media_id tekrar kullanılmasın
+                media_registry.invalidate(media_ids, self.account)
             self.logger.error(f"Tweet gönderme hatası: {e}")
-            return False
+            return None
+    
+    @staticmethod
+    def _normalize_text(text: str) -> str:
+        """Karşılaştırma için tweet metnini sadeleştir (t.co linkleri, HTML kaçışları, boşluklar)"""
+        text = html.unescape(text or '')
+        text = re.sub(r'https?://\S+', '', text)
+        return ' '.join(text.split())
+    
+    def find_recent_tweet(self, text: str, limit: int = 20) -> Optional[str]:
+        """
+        Hesabın son tweet'lerinde aynı metni ara
+        
+        Gönderim sonucu bilinmeyen (zaman aşımı, süreç çökmesi) tweet'lerin
+        tekrar gönderilmeden önce kontrolü için kullanılır.
+        
+        Args:
+            text: Aranacak tweet metni
+            limit: Bakılacak son tweet sayısı (5-100)
+            
+        Returns:
+            str: Bulunan tweet'in kimliği, yoksa None
+            
+        Raises:
+            Exception: Zaman çizelgesi okunamazsa (sonuç bilinmiyor)
+        """
+        if not self.client and not self.authenticate():
+            raise RuntimeError("Twitter kimlik doğrulaması yapılamadı")
+        
+        if not self._user_id and not self.get_user_info():
+            raise RuntimeError("Kullanıcı kimliği alınamadı")
+        
+        rate_limiter.acquire('user_tweets', self.account, 'reject')
+        response = resilience.call(self._endpoint('user_tweets'), self.client.get_users_tweets,
+                                   self._user_id, max_results=max(5, min(limit, 100)), user_auth=True,
+                                   retries=1, is_transient=is_transient_twitter_error)
+        
+        wanted = self._normalize_text(text)
+        for tweet in response.data or []:
+            if self._normalize_text(tweet.text) == wanted:
+                return str(tweet.id)
+        return None
+    
+    def get_user_info(self, refresh: bool = False) -> Optional[dict]:
+        """
+        Kullanıcı bilgilerini al (TTL önbellekli)
+        
+        Profil ve metrikler bellekte tutulur. TTL içinde ağ isteği yapılmaz;
+        süresi dolmuşsa eski bilgi hemen döner ve arka planda yenilenir.
+        Önbellek boşsa veya refresh=True ise istek senkron yapılır.
+        
+        Args:
+            refresh: Önbelleği atla ve profili hemen yenile
+        """
+        with self._profile_lock:
+            profile = self._profile
+            stale = self._profile_stale
+            age = self.profile_age()
+        
+        if profile is None or refresh:
+            return self._fetch_user_info()
+        
+        if stale or age > settings.PROFILE_CACHE_TTL_SECONDS:
+            self._refresh_profile_in_background()
+        return dict(profile)
     
-    def get_user_info(self) -> Optional[dict]:
-        """Kullanıcı bilgilerini al"""
+    def _fetch_user_info(self) -> Optional[dict]:
+        """Profili API'den al ve önbelleğe yaz"""
         try:
             if not self.client:
                 return None
                 
-            user = self.client.get_me()
+            rate_limiter.acquire('get_me', self.account, 'reject')
+            user = resilience.call(self._endpoint('get_me'), self.client.get_me,
+                                   user_fields=['public_metrics'],
+                                   retries=1, is_transient=is_transient_twitter_error)
             if user.data:
-                return {
+                metrics = user.data.public_metrics or {}
+                profile = {
                     'id': user.data.id,
                     'username': user.data.username,
                     'name': user.data.name,
-                    'followers_count': user.data.public_metrics.get('followers_count', 0),
-                    'following_count': user.data.public_metrics.get('following_count', 0),
-                    'tweet_count': user.data.public_metrics.get('tweet_count', 0)
+                    'followers_count': metrics.get('followers_count', 0),
+                    'following_count': metrics.get('following_count', 0),
+                    'tweet_count': metrics.get('tweet_count', 0)
                 }
+                with self._profile_lock:
+                    self._profile = profile
+                    self._profile_at = time.time()
+                    self._profile_stale = False
+                    self._user_id = profile['id']
+                return dict(profile)
             return None
             
         except Exception as e:
             self.logger.error(f"Kullanıcı bilgisi alma hatası: {e}")
             return None
     
+    def _refresh_profile_in_background(self):
+        """Eski profili arka planda yenile (aynı anda tek istek)"""
+        with self._profile_lock:
+            if self._profile_refreshing:
+                return
+            self._profile_refreshing = True
+        
+        def refresh():
+            try:
+                self._fetch_user_info()
+            finally:
+                with self._profile_lock:
+                    self._profile_refreshing = False
+        
+        threading.Thread(target=refresh, name="profile-refresh", daemon=True).start()
+    
+    def invalidate_profile(self):
+        """Profili eskimiş say (tweet sayısı değişti), sonraki okumada yenilenir"""
+        with self._profile_lock:
+            self._profile_stale = True
+    
+    def profile_age(self) -> Optional[float]:
+        """Önbellekteki profilin yaşı (saniye), önbellek boşsa None"""
+        if self._profile_at is None:
+            return None
+        return time.time() - self._profile_at
+    
     def test_connection(self) -> bool:
         """API bağlantısını test et"""
         try:
@@ -154,4 +553,4 @@ class TwitterClient:
             return False
 
 # Global Twitter client instance
-twitter_client = TwitterClient()
\ No newline at end of file
+twitter_client = LazyProxy(TwitterClient)
\ No newline at end of file
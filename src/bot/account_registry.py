@@ -0,0 +1,103 @@
+import os
+import json
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.api.twitter_client import TwitterClient, twitter_client
+
+
+class AccountRegistry:
+    """
+    Botun tweet attığı hesapların kaydı
+
+    Varsayılan hesap .env'deki TWITTER_* anahtarlarından gelir ve global
+    twitter_client'ı kullanır. Ek hesaplar ACCOUNTS_FILE (JSON liste) dosyasından
+    okunur. Her hesap için tek bir TwitterClient ilk kullanımda oluşturulup
+    kimlik doğrulaması yapılır ve sonraki çağrılarda yeniden kullanılır.
+    """
+
+    DEFAULT_ACCOUNT = 'default'
+
+    def __init__(self, accounts_file: str = None):
+        self.logger = logging.getLogger(__name__)
+        self.accounts_file = accounts_file or settings.ACCOUNTS_FILE
+        self._accounts: Dict[str, Dict[str, Any]] = {
+            self.DEFAULT_ACCOUNT: {'name': self.DEFAULT_ACCOUNT, 'username': settings.TWITTER_USERNAME}
+        }
+        self._clients: Dict[str, TwitterClient] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Ek hesapları dosyadan yükle"""
+        if not os.path.exists(self.accounts_file):
+            return
+        try:
+            with open(self.accounts_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for entry in entries:
+                name = entry.get('name')
+                if not name or name == self.DEFAULT_ACCOUNT:
+                    self.logger.warning(f"Geçersiz hesap adı atlandı: {name}")
+                    continue
+                if entry.get('enabled', True):
+                    self._accounts[name] = entry
+            self.logger.info(f"{len(self._accounts) - 1} ek hesap yüklendi")
+        except Exception as e:
+            self.logger.error(f"Hesap dosyası okuma hatası: {e}")
+
+    def names(self, include_default: bool = True) -> List[str]:
+        """Kayıtlı hesap adları"""
+        return [name for name in self._accounts
+                if include_default or name != self.DEFAULT_ACCOUNT]
+
+    def get_account(self, name: str) -> Optional[Dict[str, Any]]:
+        """Hesap bilgilerini al"""
+        return self._accounts.get(name)
+
+    def get_client(self, name: str) -> Optional[TwitterClient]:
+        """
+        Hesabın kimliği doğrulanmış istemcisini al (yoksa oluştur)
+
+        Returns:
+            TwitterClient: Kimlik doğrulaması başarısızsa None
+        """
+        with self._lock:
+            client = self._clients.get(name)
+            if client:
+                return client
+
+            account = self._accounts.get(name)
+            if not account:
+                self.logger.error(f"Bilinmeyen hesap: {name}")
+                return None
+
+            if name == self.DEFAULT_ACCOUNT:
+                client = twitter_client
+            else:
+                client = TwitterClient(account=name, credentials=account)
+
+            if not client.client and not client.authenticate():
+                self.logger.error(f"@{account.get('username', name)} kimlik doğrulaması başarısız")
+                return None
+
+            self._clients[name] = client
+            return client
+
+    def get_status(self) -> Dict[str, Any]:
+        """Hesap listesi ve bağlı istemciler"""
+        with self._lock:
+            connected = set(self._clients)
+        return {
+            'accounts': [{
+                'name': name,
+                'username': account.get('username'),
+                'connected': name in connected
+            } for name, account in self._accounts.items()]
+        }
+
+
+# Global account registry instance
+account_registry = LazyProxy(AccountRegistry)
@@ -0,0 +1,152 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.api.twitter_client import twitter_client
+from src.api.http_session import http_pool
+from src.ai.gemini_client import gemini_client
+
+
+class ConnectionWarmer:
+    """
+    Zaman dilimlerinden önce dış servis bağlantılarını ısıtan kanca
+
+    Saatlerce boşta kalan süreçte ilk istek DNS, TCP+TLS ve OAuth kurulum
+    maliyetini öder. Zaman diliminden kısa süre önce her hosta hafif bir
+    istek atılarak bağlantı havuzları doldurulur. Her hedef iki kez
+    yoklanır: ilki soğuk, ikincisi sıcak bağlantı gecikmesini ölçer.
+    """
+
+    PUBLISH_TARGETS = ['twitter_api']
+
+    def __init__(self, lead_seconds: int = None, timeout: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.lead_seconds = lead_seconds if lead_seconds is not None else settings.WARMUP_LEAD_SECONDS
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self.last_run = None
+        # Gemini SDK'sı her sürümde istek zaman aşımı kabul etmiyor; yoklama süre sınırıyla beklenir
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='warmup')
+
+        # Hedef adı -> tek istek atan yoklama fonksiyonu
+        self.targets: Dict[str, Callable[[], Any]] = {
+            'twitter_upload': lambda: self._head_twitter('api', 'https://upload.twitter.com/1.1/media/upload.json'),
+            'twitter_api': lambda: self._head_twitter('client', 'https://api.twitter.com/2/tweets'),
+            'unsplash_api': lambda: http_pool.head('https://api.unsplash.com/', timeout=self.timeout),
+            'unsplash_images': lambda: http_pool.head('https://images.unsplash.com/', timeout=self.timeout),
+            'gemini': self._ping_gemini
+        }
+
+    def warmup_time(self, time_str: str) -> str:
+        """Verilen saatten ısıtma süresi kadar önceki saat ('HH:MM[:SS]' -> 'HH:MM:SS')"""
+        fmt = '%H:%M:%S' if time_str.count(':') == 2 else '%H:%M'
+        moment = datetime.strptime(time_str, fmt)
+        return (moment - timedelta(seconds=self.lead_seconds)).strftime('%H:%M:%S')
+
+    def _head_twitter(self, kind: str, url: str):
+        """tweepy oturumu üzerinden hosta HEAD isteği at (yanıt kodu önemsiz)"""
+        if not twitter_client.api and not twitter_client.authenticate():
+            raise RuntimeError("Twitter kimlik doğrulaması yapılamadı")
+        owner = twitter_client.api if kind == 'api' else twitter_client.client
+        return owner.session.head(url, timeout=self.timeout)
+
+    def _ping_gemini(self):
+        """Gemini kanalını açmak için token sayımı iste (içerik üretmez)"""
+        if not gemini_client.model:
+            raise RuntimeError("Gemini modeli yapılandırılmamış")
+        future = self._executor.submit(gemini_client.model.count_tokens, 'ping')
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise RuntimeError(f"Gemini {self.timeout:g} sn içinde yanıt vermedi")
+
+    def _probe(self, probe: Callable[[], Any]) -> float:
+        """Yoklamayı çalıştır, gecikmeyi (ms) döndür"""
+        start = time.perf_counter()
+        probe()
+        return (time.perf_counter() - start) * 1000
+
+    def warm_up(self, targets: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Bağlantıları ısıt ve soğuk/sıcak gecikmeyi ölç
+
+        Args:
+            targets: Isıtılacak hedefler (None ise hepsi)
+
+        Returns:
+            Dict: Hedef başına cold_ms ve warm_ms
+        """
+        if not settings.WARMUP_ENABLED:
+            return {}
+
+        results = {}
+        for name in targets or list(self.targets):
+            probe = self.targets.get(name)
+            if not probe:
+                continue
+            try:
+                cold_ms = self._probe(probe)
+                warm_ms = self._probe(probe)
+                results[name] = {'cold_ms': round(cold_ms, 1), 'warm_ms': round(warm_ms, 1)}
+                self._record(name, cold_ms, warm_ms)
+                self.logger.info(f"🔥 {name} ısıtıldı: soğuk {cold_ms:.0f} ms, sıcak {warm_ms:.0f} ms")
+            except Exception as e:
+                results[name] = {'error': str(e)}
+                self._record(name, None, None)
+                self.logger.warning(f"{name} ısıtma hatası: {e}")
+
+        self.last_run = datetime.now()
+        return results
+
+    def warm_up_for_publish(self) -> Dict[str, Dict[str, Any]]:
+        """Gönderimden hemen önce yalnızca tweet atılan hostu ısıt"""
+        return self.warm_up(self.PUBLISH_TARGETS)
+
+    def _record(self, name: str, cold_ms: Optional[float], warm_ms: Optional[float]):
+        with self._lock:
+            stats = self.stats.setdefault(name, {
+                'runs': 0,
+                'failures': 0,
+                'last_cold_ms': None,
+                'last_warm_ms': None,
+                'total_cold_ms': 0.0,
+                'total_warm_ms': 0.0
+            })
+            if cold_ms is None:
+                stats['failures'] += 1
+                return
+            stats['runs'] += 1
+            stats['last_cold_ms'] = round(cold_ms, 1)
+            stats['last_warm_ms'] = round(warm_ms, 1)
+            stats['total_cold_ms'] += cold_ms
+            stats['total_warm_ms'] += warm_ms
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hedef başına ortalama soğuk/sıcak gecikme"""
+        with self._lock:
+            targets = {}
+            for name, stats in self.stats.items():
+                runs = stats['runs']
+                targets[name] = {
+                    'runs': runs,
+                    'failures': stats['failures'],
+                    'last_cold_ms': stats['last_cold_ms'],
+                    'last_warm_ms': stats['last_warm_ms'],
+                    'avg_cold_ms': round(stats['total_cold_ms'] / runs, 1) if runs else None,
+                    'avg_warm_ms': round(stats['total_warm_ms'] / runs, 1) if runs else None
+                }
+        return {
+            'enabled': settings.WARMUP_ENABLED,
+            'lead_seconds': self.lead_seconds,
+            'last_run': self.last_run.strftime('%Y-%m-%d %H:%M:%S') if self.last_run else None,
+            'targets': targets
+        }
+
+
+# Global connection warmer instance
+connection_warmer = LazyProxy(ConnectionWarmer)
@@ -1,20 +1,42 @@
 import random
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Optional, Any
 from src.api.twitter_client import twitter_client
 from src.config.settings import settings
+from src.utils.lazy import LazyProxy, resolve
 from src.content_creator.weekly_planner import weekly_planner
+from src.content_creator.content_buffer import content_buffer
+from src.content_creator.hashtag_selector import hashtag_selector
 from src.ai.gemini_client import gemini_client
+from src.ai.tweet_history import tweet_history
 from src.image_generator.real_photo_client import real_photo_client
+from src.image_generator.image_normalizer import image_normalizer
+from src.image_generator.phash_index import phash_index
+from src.utils.resilience import resilience
+from src.api.http_session import http_pool
+from src.api.rate_limiter import rate_limiter, RateLimitDeferred
+from src.api.media_registry import media_registry
+from src.api.trends_client import trends_client
 
 class HairStyleBot:
     """Saç stili paylaşım botu ana sınıfı"""
     
     def __init__(self):
-        self.twitter_client = twitter_client
+        # Twitter istemcisi logging yapılandırmasını kurar, bot ile birlikte oluşturulur
+        self.twitter_client = resolve(twitter_client)
         self.logger = logging.getLogger(__name__)
         
+        # İçerik üretimi ve fotoğraf indirme gibi G/Ç aşamalarını paralel çalıştırmak için
+        # Çoklu hesapta her hesap aynı anda iki aşama (içerik + fotoğraf) çalıştırır
+        self.executor = ThreadPoolExecutor(max_workers=max(4, settings.ACCOUNT_PARALLELISM * 2),
+                                           thread_name_prefix='hairbot')
+        
+        # Hazır içerik deposu azalınca Gemini ile arka planda doldur
+        content_buffer.configure_refill(self._refill_theme)
+        
         # Örnek saç stili içerikleri (başlangıç için)
         self.sample_contents = [
             {
@@ -43,22 +65,89 @@ class HairStyleBot:
         """Twitter kimlik doğrulama"""
         return self.twitter_client.authenticate(access_token, access_token_secret)
     
-    def generate_hair_content(self, use_ai: bool = True) -> Dict[str, Any]:
+    def select_theme_and_style(self):
+        """Bugünün temasını ve temaya uygun bir stil seç (hazır adayı olan stiller öncelikli)"""
+        today_theme = weekly_planner.get_today_theme()
+        buffered_styles = [style for style in content_buffer.styles_with_content(today_theme['name'])
+                           if style in today_theme['styles']]
+        styles = buffered_styles or today_theme['styles']
+        style_focus = random.choice(styles) if styles else None
+        return today_theme, style_focus
+    
+    def batch_generate_content(self, whole_week: bool = True) -> int:
+        """
+        Haftanın (veya bugünün) tüm temaları için içerikleri tek Gemini isteğinde üret
+        
+        Returns:
+            int: Depoya eklenen aday sayısı
+        """
+        if whole_week:
+            themes = list(weekly_planner.weekly_themes.values())
+        else:
+            themes = [weekly_planner.get_today_theme()]
+        
+        candidates = gemini_client.generate_batch_content(themes)
+        added = content_buffer.add(candidates)
+        self.logger.info(f"📦 {added} tweet adayı depoya eklendi (toplam {content_buffer.total()})")
+        return added
+    
+    def _refill_theme(self, theme_name: str, count: int) -> List[Dict[str, Any]]:
+        """İçerik deposu için tek tema adına toplu üretim yap"""
+        themes = [theme for theme in weekly_planner.weekly_themes.values() if theme['name'] == theme_name]
+        if not themes:
+            return []
+        return gemini_client.generate_batch_content(themes, tweets_per_theme=count)
+    
+    def _take_buffered_content(self, theme: Dict[str, Any], style_focus: Optional[str],
+                               any_style: bool = False) -> Optional[Dict[str, Any]]:
+        """Depodan tema/stil için geçmişin kopyası olmayan bir aday al"""
+        while True:
+            if any_style:
+                candidate = content_buffer.take_any(theme['name'])
+            else:
+                candidate = content_buffer.take(theme['name'], style_focus)
+            if not candidate:
+                return None
+            if not tweet_history.is_near_duplicate(candidate['text']):
+                return candidate
+            self.logger.info("Depodaki aday geçmiş tweet'e benziyor, atlanıyor")
+    
+    def generate_hair_content(self, use_ai: bool = True, theme: Optional[Dict[str, Any]] = None,
+                              style_focus: Optional[str] = None, use_buffer: bool = True,
+                              slot_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Saç stili içeriği üret
         
         Args:
             use_ai: AI kullanarak içerik üret (True) veya örnek içerik kullan (False)
+            theme: Önceden seçilmiş tema (opsiyonel, verilmezse bugünün teması)
+            style_focus: Önceden seçilmiş stil (opsiyonel)
+            use_buffer: Depodaki hazır adayları kullan (False ise depo tüketilmez)
+            slot_key: Hashtag seti için zaman dilimi anahtarı (hashtag_selector.slot_key)
+            
+        Returns:
+            Dict: İçerik; Gemini yanıt vermez ve yedeklerin hepsi daha önce paylaşıldıysa None
         """
         if use_ai:
-            # Bugünün temasını al
-            today_theme = weekly_planner.get_today_theme()
-            
-            # Temaya uygun stil seç
-            style_focus = random.choice(today_theme['styles']) if today_theme['styles'] else None
+            # Tema ve stil verilmemişse bugünün temasından seç
+            if theme is None:
+                theme, style_focus = self.select_theme_and_style()
+            today_theme = theme
             
-            # Gemini ile içerik üret
-            ai_content = gemini_client.generate_hair_content(today_theme, style_focus)
+            # Önceden üretilmiş aday varsa Gemini'ye gitme
+            ai_content = self._take_buffered_content(today_theme, style_focus) if use_buffer else None
+            if ai_content:
+                self.logger.info("📦 Depodaki hazır içerik kullanılıyor")
+            else:
+                # Gemini ile içerik üret; gecikirse depoya sonradan gelen herhangi bir aday yarışır
+                ai_content = gemini_client.generate_hair_content(
+                    today_theme, style_focus,
+                    hedge_fn=(lambda: self._take_buffered_content(today_theme, None, any_style=True))
+                    if use_buffer else None,
+                    slot_key=slot_key
+                )
+            if not ai_content:
+                return None
             
             return {
                 'text': ai_content['text'],
@@ -72,8 +161,8 @@ class HairStyleBot:
             # Eski yöntem - örnek içerikler
             content = random.choice(self.sample_contents)
             
-            # Hashtag'leri ekle
-            hashtags = random.sample(settings.HASHTAGS, k=random.randint(3, 5))
+            # Hashtag'leri ekle (zaman diliminin genel seti)
+            hashtags = hashtag_selector.select(base_count=random.randint(3, 5), trend_count=0, slot_key=slot_key)
             hashtag_text = ' '.join(hashtags)
             
             # Tweet metnini oluştur
@@ -91,52 +180,198 @@ class HairStyleBot:
                 'timestamp': datetime.now().isoformat()
             }
     
-    def post_hair_tweet(self, image_path: Optional[str] = None, use_ai: bool = True) -> bool:
+    @staticmethod
+    def _timed(func, *args, **kwargs):
+        """Fonksiyonu çalıştır ve (sonuç, süre) döndür"""
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        return result, time.perf_counter() - started
+    
+    def prepare_hair_tweet(self, image_path: Optional[str] = None, use_ai: bool = True,
+                           upload_media: bool = False, client=None,
+                           slot_at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
         """
-        Saç stili tweet'i gönder
+        Tweet'i göndermeye hazırla (içerik + görsel + opsiyonel medya yükleme)
+        
+        Fotoğraf araması sadece tema ve stile ihtiyaç duyduğu için, AI modunda
+        içerik üretimi ile fotoğraf indirme paralel çalışır. Toplam süre
+        aşamaların toplamı değil en yavaş aşama kadardır.
         
         Args:
             image_path: Görsel dosya yolu (opsiyonel)
+            use_ai: AI ile içerik üret
+            upload_media: Görseli şimdiden Twitter'a yükle
+            client: Medyanın yükleneceği hesabın istemcisi (varsayılan: botun istemcisi)
+            slot_at: Tweet zaman diliminin anı; hazırlık ve gönderim anındaki
+                yeniden üretim aynı hashtag setini kullanır
             
         Returns:
-            bool: Başarı durumu
+            Dict: Hazırlanmış tweet (text, image_path, media_ids, content, timings)
         """
         try:
-            # İçerik üret
-            content = self.generate_hair_content(use_ai=use_ai)
+            started = time.perf_counter()
+            timings = {}
+            photo_info = None
+            slot_key = hashtag_selector.slot_key(slot_at) if slot_at else None
             
-            # Eğer görsel yolu verilmemişse, gerçek saç fotoğrafı al
-            if not image_path:
-                style_focus = content.get('style', 'hairstyle')
-                theme = content.get('theme', 'general')
+            if use_ai:
+                # Tema ve stili önce seç, iki aşama da bunlara bağlı
+                theme, style_focus = self.select_theme_and_style()
                 
-                image_path = real_photo_client.get_random_hair_photo(
-                    style_focus=style_focus,
-                    theme=theme
+                content_future = self.executor.submit(
+                    self._timed, self.generate_hair_content,
+                    use_ai=True, theme=theme, style_focus=style_focus, slot_key=slot_key
                 )
                 
+                # Eğer görsel yolu verilmemişse, gerçek saç fotoğrafını paralel al
+                photo_future = None
+                if not image_path:
+                    photo_future = self.executor.submit(
+                        self._timed, real_photo_client.get_random_hair_photo_info,
+                        style_focus=style_focus or theme['name'],
+                        theme=theme['name']
+                    )
+                
+                content, timings['content'] = content_future.result()
+                if photo_future:
+                    photo_info, timings['photo'] = photo_future.result()
+                if not content:
+                    self.logger.error("Paylaşılabilir içerik üretilemedi")
+                    return None
+            else:
+                content, timings['content'] = self._timed(self.generate_hair_content, use_ai=False, slot_key=slot_key)
+                
+                if not image_path:
+                    photo_info, timings['photo'] = self._timed(
+                        real_photo_client.get_random_hair_photo_info,
+                        style_focus=content.get('style', 'hairstyle'),
+                        theme=content.get('theme', 'general')
+                    )
+            
+            # İndirilen varyant ve tasarruf edilen bayt bilgisi
+            image_stats = None
+            if photo_info:
+                image_path = photo_info['file_path']
+                image_stats = {
+                    'photo_id': photo_info['photo']['id'],
+                    'variant': photo_info['variant'],
+                    'bytes': photo_info['bytes'],
+                    'bytes_saved': photo_info['bytes_saved']
+                }
+            
+            # Boyut/format/EXIF normalizasyonu (süreç havuzunda)
+            if image_path:
+                image_path, timings['normalize'] = self._timed(image_normalizer.normalize, image_path)
+            
+            if 'photo' in timings:
                 if image_path:
                     self.logger.info(f"Gerçek saç fotoğrafı alındı: {image_path}")
                 else:
                     self.logger.warning("Gerçek fotoğraf alınamadı, sadece metin gönderilecek")
             
-            # Tweet gönder
-            success = self.twitter_client.post_tweet(
-                text=content['text'],
-                image_path=image_path
+            # Medyayı önceden yükle, gönderim anında sadece create_tweet kalsın
+            media_ids = None
+            if upload_media and image_path:
+                media_id, timings['upload'] = self._timed((client or self.twitter_client).upload_media, image_path)
+                if media_id:
+                    media_ids = [media_id]
+                else:
+                    self.logger.warning("Medya önceden yüklenemedi, gönderimde yüklenecek")
+            
+            timings['total'] = time.perf_counter() - started
+            self.logger.info("⏱️ Hazırlık süreleri: " + ", ".join(
+                f"{stage}={seconds:.2f}s" for stage, seconds in timings.items()
+            ))
+            
+            return {
+                'text': content['text'],
+                'image_path': image_path,
+                'media_ids': media_ids,
+                'content': content,
+                'image_stats': image_stats,
+                'timings': timings,
+                'prepared_at': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Tweet hazırlama hatası: {e}")
+            return None
+    
+    def publish_prepared(self, prepared: Dict[str, Any], rate_limit_mode: Optional[str] = None,
+                         client=None) -> bool:
+        """
+        Hazırlanmış tweet'i gönder
+        
+        Args:
+            prepared: prepare_hair_tweet çıktısı
+            rate_limit_mode: İstek sınırı dolunca davranış ('wait', 'defer', 'reject')
+            client: Tweet'in atılacağı hesabın istemcisi (varsayılan: botun istemcisi)
+            
+        Returns:
+            bool: Başarı durumu (başarılıysa prepared['tweet_id'] doldurulur)
+            
+        Raises:
+            RateLimitDeferred: defer modunda sınır doluysa (payload = prepared)
+        """
+        try:
+            content = prepared['content']
+            
+            tweet_id = (client or self.twitter_client).send_tweet(
+                text=prepared['text'],
+                image_path=prepared.get('image_path'),
+                media_ids=prepared.get('media_ids'),
+                rate_limit_mode=rate_limit_mode
             )
             
-            if success:
+            if tweet_id:
+                # Gönderim kuyruğu tweet kimliğini kaydeder
+                prepared['tweet_id'] = tweet_id
                 self.logger.info(f"Saç stili tweet'i gönderildi: {content['style']} (Tema: {content.get('theme', 'N/A')})")
+                image_stats = prepared.get('image_stats')
+                
+                # Gönderilen metni yakın kopya indeksine ekle
+                tweet_history.add(prepared['text'])
+                
+                # Paylaşılan görseli benzer görsel indeksine ekle
+                if prepared.get('image_path'):
+                    phash_index.add_image(prepared['image_path'],
+                                          photo_id=image_stats['photo_id'] if image_stats else None)
+                
+                if image_stats:
+                    self.logger.info(f"Görsel: {image_stats['variant']}, {image_stats['bytes']} bayt "
+                                     f"(~{image_stats['bytes_saved']} bayt tasarruf)")
                 return True
             else:
                 self.logger.error("Tweet gönderilemedi!")
                 return False
                 
+        except RateLimitDeferred as e:
+            # Hazırlanan tweet ertelenen işle birlikte taşınır, yeniden üretilmez
+            e.payload = prepared
+            self.logger.warning(f"⏳ Tweet ertelendi: {e}")
+            raise
         except Exception as e:
             self.logger.error(f"Tweet gönderme hatası: {e}")
             return False
     
+    def post_hair_tweet(self, image_path: Optional[str] = None, use_ai: bool = True,
+                        rate_limit_mode: Optional[str] = None) -> bool:
+        """
+        Saç stili tweet'i gönder
+        
+        Args:
+            image_path: Görsel dosya yolu (opsiyonel)
+            rate_limit_mode: İstek sınırı dolunca davranış ('wait', 'defer', 'reject')
+            
+        Returns:
+            bool: Başarı durumu
+        """
+        prepared = self.prepare_hair_tweet(image_path=image_path, use_ai=use_ai)
+        if not prepared:
+            return False
+        
+        return self.publish_prepared(prepared, rate_limit_mode)
+    
     def get_bot_status(self) -> Dict[str, Any]:
         """Bot durumu bilgilerini al"""
         try:
@@ -146,7 +381,17 @@ class HairStyleBot:
                 'bot_name': settings.BOT_NAME,
                 'username': settings.TWITTER_USERNAME,
                 'user_info': user_info,
+                'user_info_age_seconds': self._profile_age(),
                 'tweets_per_day': settings.TWEETS_PER_DAY,
+                'content_buffer': content_buffer.get_metrics(),
+                'gemini': gemini_client.get_stats(),
+                'hashtags': hashtag_selector.get_stats(),
+                'trends': trends_client.get_stats(),
+                'resilience': resilience.snapshot(),
+                'http': http_pool.get_stats(),
+                'rate_limits': rate_limiter.get_stats(),
+                'media_reuse': media_registry.get_stats(),
+                'uploads': self.twitter_client.get_upload_stats(),
                 'status': 'active' if user_info else 'inactive',
                 'last_check': datetime.now().isoformat()
             }
@@ -158,6 +403,11 @@ class HairStyleBot:
                 'last_check': datetime.now().isoformat()
             }
     
+    def _profile_age(self) -> Optional[float]:
+        """Önbellekteki profilin yaşı (saniye, yuvarlanmış)"""
+        age = self.twitter_client.profile_age()
+        return round(age, 1) if age is not None else None
+    
     def test_bot(self) -> bool:
         """Bot fonksiyonlarını test et"""
         try:
@@ -168,8 +418,11 @@ class HairStyleBot:
                 self.logger.error("Twitter bağlantı testi başarısız!")
                 return False
             
-            # İçerik üretimini test et
-            content = self.generate_hair_content()
+            # İçerik üretimini test et (gönderilecek depodaki adaylar tüketilmez)
+            content = self.generate_hair_content(use_buffer=False)
+            if not content:
+                self.logger.error("Test içeriği üretilemedi!")
+                return False
             self.logger.info(f"Test içeriği üretildi: {content['text'][:50]}...")
             
             self.logger.info("Bot testi başarılı!")
@@ -180,4 +433,4 @@ class HairStyleBot:
             return False
 
 # Global bot instance
-hair_bot = HairStyleBot()
\ No newline at end of file
+hair_bot = LazyProxy(HairStyleBot)
\ No newline at end of file
@@ -0,0 +1,285 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Any
+
+
+class ScheduledJob:
+    """Zamanlayıcıdaki tek bir görev"""
+
+    def __init__(self, job_id: int, func: Callable, name: str,
+                 next_run: datetime, next_run_fn: Optional[Callable[[datetime], datetime]] = None):
+        self.job_id = job_id
+        self.func = func
+        self.name = name
+        self.next_run = next_run
+        # Bir sonraki çalışma zamanını hesaplayan fonksiyon (None ise tek seferlik)
+        self.next_run_fn = next_run_fn
+        self.cancelled = False
+        self.in_heap = False
+        self.run_count = 0
+        self.last_drift = None
+
+    def __repr__(self):
+        return f"<ScheduledJob {self.name} next_run={self.next_run:%Y-%m-%d %H:%M:%S}>"
+
+
+class HeapScheduler:
+    """
+    Min-heap tabanlı olay güdümlü zamanlayıcı
+
+    Sabit aralıklarla uyanmak yerine bir sonraki görevin zamanına kadar uyur.
+    Görev eklendiğinde veya iptal edildiğinde erken uyandırılır. Ekleme/iptal
+    O(log n), bir sonraki görevi bulmak O(1) maliyetlidir.
+    """
+
+    def __init__(self, max_sleep: float = 3600.0):
+        self.logger = logging.getLogger(__name__)
+        # Duvar saati kaymalarına karşı en uzun uyku süresi (saniye)
+        self.max_sleep = max_sleep
+        self._heap = []
+        self._jobs: Dict[int, ScheduledJob] = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._cancelled_in_heap = 0
+        self.is_running = False
+
+        # Gecikme (drift) istatistikleri
+        self.drift_stats = {
+            'count': 0,
+            'last': None,
+            'max': 0.0,
+            'total': 0.0
+        }
+
+    # ------------------------------------------------------------------
+    # Zaman hesaplama yardımcıları
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _parse_time(time_str: str):
+        """'HH:MM' veya 'HH:MM:SS' formatını ayrıştır"""
+        parts = [int(p) for p in time_str.split(':')]
+        while len(parts) < 3:
+            parts.append(0)
+        return parts[0], parts[1], parts[2]
+
+    @classmethod
+    def _next_daily(cls, time_str: str, after: datetime) -> datetime:
+        """Verilen zamandan sonraki günlük çalışma anı"""
+        hour, minute, second = cls._parse_time(time_str)
+        candidate = after.replace(hour=hour, minute=minute, second=second, microsecond=0)
+        if candidate <= after:
+            candidate += timedelta(days=1)
+        return candidate
+
+    @classmethod
+    def _next_weekly(cls, weekday: int, time_str: str, after: datetime) -> datetime:
+        """Verilen zamandan sonraki haftalık çalışma anı (0=Pazartesi)"""
+        hour, minute, second = cls._parse_time(time_str)
+        candidate = after.replace(hour=hour, minute=minute, second=second, microsecond=0)
+        candidate += timedelta(days=(weekday - after.weekday()) % 7)
+        if candidate <= after:
+            candidate += timedelta(days=7)
+        return candidate
+
+    # ------------------------------------------------------------------
+    # Görev ekleme / iptal
+    # ------------------------------------------------------------------
+    def _push(self, job: ScheduledJob):
+        job.in_heap = True
+        heapq.heappush(self._heap, (job.next_run.timestamp(), next(self._seq), job))
+
+    def add_job(self, func: Callable, run_at: datetime, name: str = None,
+                next_run_fn: Optional[Callable[[datetime], datetime]] = None) -> int:
+        """
+        Görev ekle
+
+        Args:
+            func: Çalıştırılacak fonksiyon
+            run_at: İlk çalışma zamanı
+            name: Görev adı (log için)
+            next_run_fn: Tekrarlayan görevler için sonraki zamanı hesaplayan fonksiyon
+
+        Returns:
+            int: Görev kimliği
+        """
+        with self._cond:
+            job = ScheduledJob(next(self._ids), func, name or getattr(func, '__name__', 'job'),
+                               run_at, next_run_fn)
+            self._jobs[job.job_id] = job
+            self._push(job)
+            # Uyuyan döngüyü uyandır, yeni görev en yakını olabilir
+            self._cond.notify_all()
+        self.logger.info(f"Görev eklendi: {job.name} -> {run_at:%Y-%m-%d %H:%M:%S}")
+        return job.job_id
+
+    def run_once_at(self, func: Callable, run_at: datetime, name: str = None) -> int:
+        """Tek seferlik görev ekle"""
+        return self.add_job(func, run_at, name)
+
+    def every_day_at(self, time_str: str, func: Callable, name: str = None) -> int:
+        """Her gün belirtilen saatte çalışan görev ekle"""
+        first_run = self._next_daily(time_str, datetime.now())
+        return self.add_job(func, first_run, name,
+                            next_run_fn=lambda after: self._next_daily(time_str, after))
+
+    def every_week_at(self, weekday: int, time_str: str, func: Callable, name: str = None) -> int:
+        """Her hafta belirtilen gün ve saatte çalışan görev ekle (0=Pazartesi)"""
+        first_run = self._next_weekly(weekday, time_str, datetime.now())
+        return self.add_job(func, first_run, name,
+                            next_run_fn=lambda after: self._next_weekly(weekday, time_str, after))
+
+    def every(self, seconds: float, func: Callable, name: str = None) -> int:
+        """Belirtilen aralıkla (saniye) tekrarlanan görev ekle"""
+        first_run = datetime.now() + timedelta(seconds=seconds)
+        return self.add_job(func, first_run, name,
+                            next_run_fn=lambda after: after + timedelta(seconds=seconds))
+
+    def cancel(self, job_id: int) -> bool:
+        """Görevi iptal et (heap'ten tembel silme ile)"""
+        with self._cond:
+            job = self._jobs.pop(job_id, None)
+            if not job:
+                return False
+            job.cancelled = True
+            if job.in_heap:
+                self._cancelled_in_heap += 1
+                self._maybe_compact()
+            self._cond.notify_all()
+        self.logger.info(f"Görev iptal edildi: {job.name}")
+        return True
+
+    def clear(self):
+        """Tüm görevleri temizle"""
+        with self._cond:
+            for job in self._jobs.values():
+                job.cancelled = True
+            self._heap = []
+            self._jobs.clear()
+            self._cancelled_in_heap = 0
+            self._cond.notify_all()
+
+    def _maybe_compact(self):
+        """İptal edilen kayıtlar heap'in yarısını geçerse heap'i yeniden kur"""
+        if self._cancelled_in_heap > 32 and self._cancelled_in_heap * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled_in_heap = 0
+
+    # ------------------------------------------------------------------
+    # Çalıştırma
+    # ------------------------------------------------------------------
+    def _pop_due(self, now_ts: float) -> Optional[ScheduledJob]:
+        """Zamanı gelmiş ilk görevi heap'ten al"""
+        while self._heap:
+            due_ts, _, job = self._heap[0]
+            if job.cancelled:
+                heapq.heappop(self._heap)
+                self._cancelled_in_heap -= 1
+                continue
+            if due_ts <= now_ts:
+                heapq.heappop(self._heap)
+                job.in_heap = False
+                return job
+            return None
+        return None
+
+    def _seconds_until_next(self, now_ts: float) -> Optional[float]:
+        """Bir sonraki göreve kalan süre"""
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled_in_heap -= 1
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - now_ts)
+
+    def _record_drift(self, job: ScheduledJob, drift: float):
+        """Hedef zamandan sapmayı kaydet"""
+        job.last_drift = drift
+        stats = self.drift_stats
+        stats['count'] += 1
+        stats['last'] = drift
+        stats['total'] += drift
+        stats['max'] = max(stats['max'], drift)
+
+    def _execute(self, job: ScheduledJob):
+        """Görevi çalıştır ve tekrarlıyorsa yeniden planla"""
+        due = job.next_run
+        drift = time.time() - due.timestamp()
+        self._record_drift(job, drift)
+        self.logger.info(f"⏰ Görev çalışıyor: {job.name} (sapma: {drift * 1000:.0f} ms)")
+
+        try:
+            job.func()
+        except Exception as e:
+            self.logger.error(f"Görev hatası ({job.name}): {e}")
+        finally:
+            job.run_count += 1
+
+        with self._cond:
+            if job.cancelled:
+                return
+            if job.next_run_fn:
+                # Sonraki zamanı hedef zamandan hesapla, sapma birikmesin
+                job.next_run = job.next_run_fn(max(due, datetime.now()))
+                self._push(job)
+            else:
+                self._jobs.pop(job.job_id, None)
+
+    def run_pending(self):
+        """Zamanı gelmiş tüm görevleri çalıştır"""
+        while True:
+            with self._cond:
+                job = self._pop_due(time.time())
+            if not job:
+                return
+            self._execute(job)
+
+    def run_forever(self):
+        """Görevleri zamanı geldikçe çalıştır (stop() çağrılana kadar)"""
+        self.is_running = True
+        self.logger.info("⏰ Heap zamanlayıcı döngüsü başladı")
+
+        while self.is_running:
+            self.run_pending()
+
+            with self._cond:
+                if not self.is_running:
+                    break
+                delay = self._seconds_until_next(time.time())
+                timeout = self.max_sleep if delay is None else min(delay, self.max_sleep)
+                if timeout > 0:
+                    # Yeni görev eklenirse / iptal edilirse notify ile erken uyanır
+                    self._cond.wait(timeout=timeout)
+
+    def stop(self):
+        """Döngüyü durdur"""
+        with self._cond:
+            self.is_running = False
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Durum bilgisi
+    # ------------------------------------------------------------------
+    def get_jobs(self) -> List[Dict[str, Any]]:
+        """Aktif görevleri çalışma sırasına göre listele"""
+        with self._cond:
+            jobs = sorted(self._jobs.values(), key=lambda j: j.next_run)
+            return [{
+                'id': job.job_id,
+                'job': job.name,
+                'next_run': job.next_run.strftime('%Y-%m-%d %H:%M:%S'),
+                'recurring': job.next_run_fn is not None,
+                'run_count': job.run_count,
+                'last_drift': job.last_drift
+            } for job in jobs]
+
+    def get_drift_stats(self) -> Dict[str, Any]:
+        """Sapma istatistiklerini al (saniye)"""
+        stats = dict(self.drift_stats)
+        stats['avg'] = stats['total'] / stats['count'] if stats['count'] else None
+        return stats
@@ -0,0 +1,379 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from datetime import datetime, date
+from typing import Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.bot.hair_bot import hair_bot
+from src.bot.account_registry import account_registry
+from src.api.rate_limiter import RateLimitDeferred
+
+
+class TweetOutbox:
+    """
+    Kalıcı gönderim kuyruğu (SQLite, WAL modu)
+
+    Hazırlanan her tweet gönderilmeden önce diske yazılır ve
+    pending -> uploading -> posted/failed durumlarından geçer. Her kaydın
+    bir idempotency anahtarı vardır (hesap + gün + zaman dilimi), aynı tweet
+    iki kez kuyruğa girmez. Başarısız gönderimler artan beklemeyle tekrar
+    denenir. Sonucu bilinmeyen bir denemeden sonra (zaman aşımı, süreç
+    çökmesi) tweet tekrar gönderilmeden önce hesabın son tweet'lerinde aranır.
+    Önceden hazırlanan zaman dilimi tweet'leri hiç denenmeden eskime
+    zamanını (stale_at) geçerse gönderilmez, kuyruktan çıkarılır.
+    """
+
+    STATES = ('pending', 'uploading', 'posted', 'failed')
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            idempotency_key TEXT NOT NULL UNIQUE,
+            account TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',
+            payload TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            tweet_id TEXT,
+            last_error TEXT,
+            stale_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (state, next_attempt_at);
+    """
+
+    # Hiç gönderim denenmemiş kayıt (ertelenenler denenmiş sayılır)
+    NEVER_ATTEMPTED = "state = 'pending' AND attempts = 0 AND last_error IS NULL"
+
+    def __init__(self, db_path: str = None, max_attempts: int = None,
+                 retry_base_seconds: int = None, max_age_hours: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.db_path = db_path or settings.OUTBOX_FILE
+        self.max_attempts = max_attempts or settings.OUTBOX_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds or settings.OUTBOX_RETRY_BASE_SECONDS
+        self.max_age_seconds = (max_age_hours or settings.OUTBOX_MAX_AGE_HOURS) * 3600
+        self._lock = threading.Lock()
+        # Aynı anda tek kuyruk taraması çalışsın
+        self._poll_lock = threading.Lock()
+        self.stats = {
+            'enqueued': 0,
+            'duplicates': 0,
+            'posted': 0,
+            'retried': 0,
+            'deferred': 0,
+            'failed': 0,
+            'reconciled': 0,
+            'discarded': 0
+        }
+
+        settings.create_directories()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=5)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+        # Eski kuyruk dosyalarına eskime sütununu ekle
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(outbox)')}
+        if 'stale_at' not in columns:
+            self.conn.execute('ALTER TABLE outbox ADD COLUMN stale_at REAL')
+
+    # ------------------------------------------------------------------
+    # Kuyruğa ekleme
+    # ------------------------------------------------------------------
+    @staticmethod
+    def slot_key(slot_time: str, account: str = 'default', day: Optional[date] = None) -> str:
+        """Zaman dilimi tweet'inin idempotency anahtarı"""
+        return f"{account}:{(day or date.today()).isoformat()}:{slot_time}"
+
+    @staticmethod
+    def text_key(text: str, account: str = 'default') -> str:
+        """Zaman dilimine bağlı olmayan (manuel) tweet'in idempotency anahtarı"""
+        return f"{account}:text:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+
+    def exists(self, key: str) -> bool:
+        """Anahtar kuyrukta var mı (durumu ne olursa olsun)"""
+        with self._lock:
+            row = self.conn.execute('SELECT 1 FROM outbox WHERE idempotency_key = ?', (key,)).fetchone()
+        return row is not None
+
+    def enqueue(self, prepared: Dict[str, Any], account: str = 'default', slot_time: str = None,
+                not_before: Optional[datetime] = None, stale_after: Optional[float] = None) -> str:
+        """
+        Hazırlanmış tweet'i kuyruğa ekle
+
+        Anahtar zaten varsa kayıt değiştirilmez, ilk hazırlanan tweet gönderilir.
+
+        Args:
+            prepared: prepare_hair_tweet çıktısı
+            account: Hesap adı
+            slot_time: Zaman dilimi ('HH:MM'); verilmezse anahtar metinden üretilir
+            not_before: Bu zamandan önce gönderilmez (varsayılan: hemen)
+            stale_after: Verilirse bu süreden (saniye) sonra hiç denenmemiş kayıt gönderilmez
+
+        Returns:
+            str: idempotency anahtarı
+        """
+        day = not_before.date() if not_before else None
+        key = (self.slot_key(slot_time, account, day) if slot_time
+               else self.text_key(prepared['text'], account))
+        now = time.time()
+        payload = json.dumps(prepared, ensure_ascii=False, default=str)
+        stale_at = now + stale_after if stale_after is not None else None
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                'INSERT OR IGNORE INTO outbox (idempotency_key, account, payload, next_attempt_at, '
+                'created_at, updated_at, stale_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, account, payload, not_before.timestamp() if not_before else now, now, now, stale_at)
+            )
+
+        if cursor.rowcount:
+            self.stats['enqueued'] += 1
+            self.logger.info(f"📥 Tweet kuyruğa eklendi: {key}")
+        else:
+            self.stats['duplicates'] += 1
+            self.logger.info(f"Tweet zaten kuyrukta: {key}")
+        return key
+
+    # ------------------------------------------------------------------
+    # Durum geçişleri
+    # ------------------------------------------------------------------
+    def _claim(self, key: str) -> Optional[sqlite3.Row]:
+        """Zamanı gelmiş bekleyen kaydı gönderim için ayır (pending -> uploading)"""
+        now = time.time()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET state = 'uploading', attempts = attempts + 1, updated_at = ? "
+                "WHERE idempotency_key = ? AND state = 'pending' AND next_attempt_at <= ?",
+                (now, key, now)
+            )
+            if not cursor.rowcount:
+                return None
+            return self.conn.execute('SELECT * FROM outbox WHERE idempotency_key = ?', (key,)).fetchone()
+
+    def _update(self, key: str, **fields):
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE outbox SET {assignments} WHERE idempotency_key = ?",
+                              (*fields.values(), key))
+
+    def _mark_posted(self, key: str, tweet_id: Optional[str]):
+        self._update(key, state='posted', tweet_id=tweet_id, last_error=None)
+        self.stats['posted'] += 1
+        self.logger.info(f"✅ Kuyruktaki tweet gönderildi: {key} (ID: {tweet_id})")
+
+    def _mark_failed(self, key: str, error: str):
+        self._update(key, state='failed', last_error=error)
+        self.stats['failed'] += 1
+        self.logger.error(f"❌ Kuyruktaki tweet gönderilemedi, vazgeçildi: {key} ({error})")
+
+    def _retry(self, row: sqlite3.Row, error: str, prepared: Optional[Dict[str, Any]] = None) -> str:
+        """Başarısız denemeyi artan beklemeyle yeniden zamanla (prepared verilirse kayıt güncellenir)"""
+        if row['attempts'] >= self.max_attempts:
+            self._mark_failed(row['idempotency_key'], error)
+            return 'failed'
+        delay = self.retry_base_seconds * 2 ** (row['attempts'] - 1)
+        fields = {'payload': json.dumps(prepared, ensure_ascii=False, default=str)} if prepared else {}
+        self._update(row['idempotency_key'], state='pending', last_error=error,
+                     next_attempt_at=time.time() + delay, **fields)
+        self.stats['retried'] += 1
+        self.logger.warning(f"🔁 {row['idempotency_key']} {delay} sn sonra tekrar denenecek ({error})")
+        return 'pending'
+
+    def _defer(self, row: sqlite3.Row, deferred: RateLimitDeferred) -> str:
+        """İstek sınırı açılınca tekrar dene (deneme hakkından sayılmaz)"""
+        self._update(row['idempotency_key'], state='pending', attempts=row['attempts'] - 1,
+                     last_error=str(deferred), next_attempt_at=time.time() + deferred.retry_after + 1)
+        self.stats['deferred'] += 1
+        self.logger.info(f"⏳ {row['idempotency_key']} {deferred.retry_after + 1:.0f} sn ertelendi")
+        return 'pending'
+
+    # ------------------------------------------------------------------
+    # Gönderim
+    # ------------------------------------------------------------------
+    def deliver(self, key: str) -> str:
+        """
+        Kuyruktaki tweet'i göndermeyi dene
+
+        Hiç denenmemiş kayıt eskime zamanını geçtiyse gönderilmez, silinir.
+
+        Returns:
+            str: Kaydın yeni durumu ('posted', 'pending', 'failed', 'uploading'),
+                eskimiş kayıt silindiyse 'stale', kayıt yoksa 'missing'
+        """
+        if self.discard(key, stale_only=True):
+            return 'stale'
+
+        row = self._claim(key)
+        if row is None:
+            return self.get_state(key) or 'missing'
+
+        if time.time() - row['created_at'] > self.max_age_seconds:
+            self._mark_failed(key, 'süresi doldu')
+            return 'failed'
+
+        prepared = json.loads(row['payload'])
+        client = account_registry.get_client(row['account'])
+        if not client:
+            return self._retry(row, 'hesap istemcisi yok')
+
+        # Önceki denemenin sonucu bilinmiyor: tweet atılmış olabilir
+        if row['attempts'] > 1:
+            try:
+                tweet_id = client.find_recent_tweet(prepared['text'])
+            except Exception as e:
+                return self._retry(row, f"önceki gönderim doğrulanamadı: {e}")
+            if tweet_id:
+                self.stats['reconciled'] += 1
+                self._mark_posted(key, tweet_id)
+                return 'posted'
+
+        try:
+            success = hair_bot.publish_prepared(prepared, settings.RATE_LIMIT_MODE, client=client)
+            error = 'gönderim başarısız'
+        except RateLimitDeferred as e:
+            return self._defer(row, e)
+        except Exception as e:
+            success, error = False, str(e)
+
+        if success:
+            self._mark_posted(key, prepared.get('tweet_id'))
+            return 'posted'
+        return self._retry(row, error, self._without_media_ids(prepared))
+
+    @staticmethod
+    def _without_media_ids(prepared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Başarısız gönderimden sonra kayıttaki media_id'leri bırak
+
+        Twitter media_id'yi reddettiyse (400) medya kaydından silinmiştir; tekrar
+        denemede upload_media medya kaydına bakar, geçerli media_id yeniden
+        kullanılır, geçersizse görsel tekrar yüklenir. Görsel dosyası yoksa
+        kayıt değiştirilmez.
+        """
+        if not prepared.get('media_ids') or not os.path.exists(prepared.get('image_path') or ''):
+            return None
+        return {**prepared, 'media_ids': None}
+
+    def post(self, prepared: Optional[Dict[str, Any]], account: str = 'default',
+             slot_time: str = None) -> str:
+        """
+        Tweet'i kuyruğa ekle ve hemen gönder
+
+        prepared None ise zaman diliminin kuyruktaki tweet'i gönderilir; kayıt
+        eskimişse silinir ve gönderilmez, çağıran yeni tweet hazırlar.
+
+        Returns:
+            str: deliver() sonucu; eski kayıt silindiyse 'stale', kayıt yoksa 'missing'
+        """
+        if prepared:
+            key = self.enqueue(prepared, account, slot_time)
+        elif slot_time:
+            key = self.slot_key(slot_time, account)
+        else:
+            return 'missing'
+        return self.deliver(key)
+
+    def discard(self, key: str, stale_only: bool = False) -> bool:
+        """
+        Hiç denenmemiş bekleyen kaydı sil (yerine yeni tweet hazırlanacak)
+
+        Denenmiş kayıtlar silinmez: önceki gönderimin sonucu bilinmiyor olabilir.
+
+        Args:
+            key: idempotency anahtarı
+            stale_only: True ise yalnızca eskime zamanını geçmiş kayıt silinir
+
+        Returns:
+            bool: Kayıt silindi mi
+        """
+        query = f"DELETE FROM outbox WHERE idempotency_key = ? AND {self.NEVER_ATTEMPTED}"
+        params = [key]
+        if stale_only:
+            query += " AND stale_at IS NOT NULL AND stale_at < ?"
+            params.append(time.time())
+        with self._lock, self.conn:
+            cursor = self.conn.execute(query, params)
+        if cursor.rowcount:
+            self.stats['discarded'] += 1
+            self.logger.warning(f"Eskimiş tweet kuyruktan çıkarıldı: {key}")
+        return bool(cursor.rowcount)
+
+    def due_keys(self) -> List[str]:
+        """Gönderim zamanı gelmiş bekleyen kayıtlar"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT idempotency_key FROM outbox WHERE state = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at", (time.time(),)
+            ).fetchall()
+        return [row['idempotency_key'] for row in rows]
+
+    def deliver_due(self) -> Dict[str, int]:
+        """Zamanı gelmiş tüm bekleyen tweet'leri gönder (periyodik görev)"""
+        results: Dict[str, int] = {}
+        if not self._poll_lock.acquire(blocking=False):
+            return results
+        try:
+            for key in self.due_keys():
+                state = self.deliver(key)
+                results[state] = results.get(state, 0) + 1
+        finally:
+            self._poll_lock.release()
+        if results:
+            self.logger.info(f"📤 Kuyruk tarandı: {results}")
+        return results
+
+    def recover(self, prune_days: int = 30) -> int:
+        """
+        Yeniden başlatmada yarım kalan gönderimleri kurtar
+
+        'uploading' durumunda kalan kayıtlar bekleyen duruma döner; bir sonraki
+        denemede tweet önce hesabın son tweet'lerinde aranır, bulunursa tekrar
+        gönderilmez. Eski posted/failed kayıtları silinir.
+
+        Returns:
+            int: Kurtarılan kayıt sayısı
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "UPDATE outbox SET state = 'pending', next_attempt_at = ?, updated_at = ? "
+                "WHERE state = 'uploading'", (now, now)
+            )
+            self.conn.execute("DELETE FROM outbox WHERE state IN ('posted', 'failed') AND updated_at < ?",
+                              (now - prune_days * 86400,))
+        if cursor.rowcount:
+            self.logger.warning(f"♻️ Yarım kalan {cursor.rowcount} gönderim kurtarıldı, doğrulanıp tekrar denenecek")
+        return cursor.rowcount
+
+    # ------------------------------------------------------------------
+    # Durum bilgisi
+    # ------------------------------------------------------------------
+    def get_state(self, key: str) -> Optional[str]:
+        """Kaydın durumu (yoksa None)"""
+        with self._lock:
+            row = self.conn.execute('SELECT state FROM outbox WHERE idempotency_key = ?', (key,)).fetchone()
+        return row['state'] if row else None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Durum başına kayıt sayıları ve sayaçlar"""
+        with self._lock:
+            rows = self.conn.execute('SELECT state, COUNT(*) AS count FROM outbox GROUP BY state').fetchall()
+        counts = {state: 0 for state in self.STATES}
+        counts.update({row['state']: row['count'] for row in rows})
+        return {
+            'path': self.db_path,
+            'states': counts,
+            **self.stats
+        }
+
+
+# Global outbox instance
+outbox = LazyProxy(TweetOutbox)
@@ -0,0 +1,186 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.bot.hair_bot import hair_bot
+from src.bot.account_registry import account_registry
+from src.bot.outbox import outbox
+from src.bot.slot_stager import slot_stager
+
+
+class PostingEngine:
+    """
+    Çoklu hesap gönderim motoru
+
+    Her hesabın tweet'i (içerik, fotoğraf, medya yükleme) zaman diliminden
+    önce hazırlık saatinde sınırlı bir iş parçacığı havuzunda paralel
+    hazırlanır ve gönderim kuyruğuna yazılır; zaman geldiğinde yalnızca
+    gönderilir. Hazırlık yoksa veya eskimişse gönderim anında hazırlanır.
+    Toplam süre hesapların gecikmelerinin toplamı değil, en yavaş hesap kadardır. İstek
+    sınırları ve devre kesiciler hesap başınadır; bir hesabın hatası veya
+    ertelenmesi diğerlerini etkilemez. Ertelenen ve başarısız gönderimler
+    gönderim kuyruğunda tekrar denenir.
+    """
+
+    def __init__(self, max_parallel: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_parallel = max_parallel or settings.ACCOUNT_PARALLELISM
+        self.executor = ThreadPoolExecutor(max_workers=self.max_parallel, thread_name_prefix='posting')
+        self._lock = threading.Lock()
+        self.stats = {
+            'slots': 0,
+            'staged': 0,
+            'staging_failed': 0,
+            'posted': 0,
+            'failed': 0,
+            'deferred': 0,
+            'last_slot_seconds': None
+        }
+        self.account_stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, account: str, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+            stats = self.account_stats.setdefault(account, {'posted': 0, 'failed': 0, 'deferred': 0})
+            stats[outcome] += 1
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _prepare_for_account(self, account: str, slot_time: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Hesabın istemcisiyle tweet'i hazırla (medya hesaba özel yüklenir)"""
+        client = account_registry.get_client(account)
+        if not client:
+            return None
+        # media_id başka hesapta kullanılamaz
+        prepared = hair_bot.prepare_hair_tweet(
+            use_ai=True, upload_media=True, client=client,
+            slot_at=slot_stager.slot_datetime(slot_time) if slot_time else None
+        )
+        if not prepared:
+            self.logger.error(f"[{account}] tweet hazırlanamadı")
+        return prepared
+
+    def stage_for_account(self, account: str, slot_time: str) -> bool:
+        """
+        Tek hesabın tweet'ini zaman diliminden önce hazırla ve kuyruğa yaz
+
+        Args:
+            account: Hesap adı
+            slot_time: Zaman dilimi ('HH:MM')
+
+        Returns:
+            bool: Hazırlık başarılı mı
+        """
+        try:
+            prepared = self._prepare_for_account(account, slot_time)
+            if prepared:
+                outbox.enqueue(prepared, account, slot_time, not_before=slot_stager.slot_datetime(slot_time),
+                               stale_after=slot_stager.max_age_seconds)
+                self._count('staged')
+                return True
+        except Exception as e:
+            self.logger.warning(f"[{account}] {slot_time} hazırlık hatası: {e}")
+        self._count('staging_failed')
+        return False
+
+    def stage_slot(self, accounts: Optional[List[str]] = None,
+                   slot_time: Optional[str] = None) -> Dict[str, Future]:
+        """
+        Zaman dilimi için hesapların tweet'lerini hazırlık saatinde paralel hazırla
+
+        Başarısız hazırlıklar gönderim anında tekrar denenir.
+
+        Args:
+            accounts: Hesap adları (None ise tüm kayıtlı hesaplar)
+            slot_time: Zaman dilimi ('HH:MM')
+
+        Returns:
+            Dict: hesap adı -> Future
+        """
+        names = accounts if accounts is not None else account_registry.names()
+        self.logger.info(f"📦 {slot_time} için {len(names)} hesabın tweet'i hazırlanıyor...")
+        return {name: self.executor.submit(self.stage_for_account, name, slot_time) for name in names}
+
+    def post_for_account(self, account: str, slot_time: Optional[str] = None) -> str:
+        """
+        Tek hesabın tweet'ini gönderim kuyruğu üzerinden gönder
+
+        Dilim için hazırlanmış tweet kuyrukta yoksa veya eskimişse anında hazırlanır.
+
+        Args:
+            account: Hesap adı
+            slot_time: Zaman dilimi ('HH:MM'); kuyruktaki aynı dilim tweet'i varsa yeniden üretilmez
+
+        Returns:
+            str: 'posted', 'failed' veya 'deferred' (kuyrukta tekrar denenecek)
+        """
+        try:
+            # Kuyrukta bu dilimin tweet'i varsa (ve eskimemişse) onu gönder
+            state = outbox.post(None, account, slot_time) if slot_time else 'missing'
+            if state in ('missing', 'stale'):
+                prepared = self._prepare_for_account(account, slot_time)
+                if not prepared:
+                    self._record(account, 'failed')
+                    return 'failed'
+                state = outbox.post(prepared, account, slot_time)
+
+            outcome = {'posted': 'posted', 'pending': 'deferred'}.get(state, 'failed')
+
+        except Exception as e:
+            self.logger.error(f"[{account}] gönderim hatası: {e}")
+            outcome = 'failed'
+
+        self._record(account, outcome)
+        return outcome
+
+    def submit_slot(self, accounts: Optional[List[str]] = None,
+                    slot_time: Optional[str] = None) -> Dict[str, Future]:
+        """
+        Zaman dilimi için hesapların gönderimlerini başlat (beklemeden döner)
+
+        Args:
+            accounts: Hesap adları (None ise tüm kayıtlı hesaplar)
+            slot_time: Zaman dilimi ('HH:MM'), kuyruk anahtarı için
+
+        Returns:
+            Dict: hesap adı -> Future
+        """
+        names = accounts if accounts is not None else account_registry.names()
+        self._count('slots')
+        started = time.perf_counter()
+        futures = {name: self.executor.submit(self.post_for_account, name, slot_time) for name in names}
+
+        def on_done(_):
+            if all(future.done() for future in futures.values()):
+                with self._lock:
+                    self.stats['last_slot_seconds'] = round(time.perf_counter() - started, 2)
+
+        for future in futures.values():
+            future.add_done_callback(on_done)
+
+        self.logger.info(f"🚀 {len(names)} hesap için gönderim başladı (paralellik: {self.max_parallel})")
+        return futures
+
+    def run_slot(self, accounts: Optional[List[str]] = None,
+                 slot_time: Optional[str] = None) -> Dict[str, str]:
+        """Zaman dilimindeki tüm hesapların gönderimini çalıştır ve sonuçları bekle"""
+        futures = self.submit_slot(accounts, slot_time)
+        return {name: future.result() for name, future in futures.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Motor ve hesap başına gönderim istatistikleri"""
+        with self._lock:
+            return {
+                'max_parallel': self.max_parallel,
+                **self.stats,
+                'accounts': {name: dict(stats) for name, stats in self.account_stats.items()}
+            }
+
+
+# Global posting engine instance
+posting_engine = LazyProxy(PostingEngine)
@@ -0,0 +1,124 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Any
+from src.bot.hair_bot import hair_bot
+from src.bot.outbox import outbox
+from src.config.settings import settings
+
+
+class SlotStager:
+    """
+    Tweet zamanlarından önce içerik, görsel ve media_id hazırlayan ara katman
+
+    Gemini, Unsplash ve medya yükleme gecikmeleri zaman diliminden önce ödenir;
+    zaman geldiğinde sadece create_tweet çağrılır. Hazırlanan tweet gönderim
+    kuyruğuna da yazılır, süreç zaman diliminden önce yeniden başlarsa kaybolmaz.
+    """
+
+    def __init__(self, lead_minutes: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.lead_minutes = lead_minutes if lead_minutes is not None else settings.STAGING_LEAD_MINUTES
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'staged': 0,
+            'staging_failed': 0,
+            'used': 0,
+            'missed': 0
+        }
+
+    @property
+    def max_age_seconds(self) -> float:
+        """Hazırlanmış tweet'in kullanılabileceği en uzun süre (ön hazırlık süresinin iki katı + 1 dk)"""
+        return (self.lead_minutes * 2 + 1) * 60
+
+    def staging_time(self, slot_time: str) -> str:
+        """Zaman dilimi için hazırlık saatini hesapla ('HH:MM' -> 'HH:MM:SS')"""
+        slot = datetime.strptime(slot_time, '%H:%M')
+        return (slot - timedelta(minutes=self.lead_minutes)).strftime('%H:%M:%S')
+
+    def slot_datetime(self, slot_time: str) -> datetime:
+        """
+        Zaman diliminin anı
+
+        Hazırlıkta bir sonraki gerçekleşme (gece yarısını geçen hazırlıklar
+        için); dilim max_age_seconds içinde geçtiyse gönderim anındaki
+        çağrılar için bugünkü an döner.
+        """
+        now = datetime.now()
+        slot = datetime.strptime(slot_time, '%H:%M')
+        moment = now.replace(hour=slot.hour, minute=slot.minute, second=0, microsecond=0)
+        if moment >= now - timedelta(seconds=self.max_age_seconds):
+            return moment
+        return moment + timedelta(days=1)
+
+    def stage(self, slot_time: str, use_ai: bool = True) -> bool:
+        """
+        Zaman dilimi için tweet'i hazırla
+
+        Args:
+            slot_time: Tweet zamanı ('HH:MM')
+            use_ai: AI ile içerik üret
+
+        Returns:
+            bool: Hazırlık başarılı mı
+        """
+        self.logger.info(f"📦 {slot_time} için tweet hazırlanıyor...")
+        prepared = hair_bot.prepare_hair_tweet(use_ai=use_ai, upload_media=True,
+                                               slot_at=self.slot_datetime(slot_time))
+
+        if not prepared:
+            self.stats['staging_failed'] += 1
+            self.logger.warning(f"⚠️ {slot_time} hazırlığı başarısız, gönderimde anlık üretilecek")
+            return False
+
+        prepared['staged_at'] = datetime.now()
+        with self._lock:
+            self._staged[slot_time] = prepared
+        try:
+            outbox.enqueue(prepared, slot_time=slot_time, not_before=self.slot_datetime(slot_time),
+                           stale_after=self.max_age_seconds)
+        except Exception as e:
+            self.logger.warning(f"{slot_time} hazırlığı kuyruğa yazılamadı: {e}")
+        self.stats['staged'] += 1
+        self.logger.info(f"✅ {slot_time} hazır (media_ids: {prepared.get('media_ids')})")
+        return True
+
+    def take(self, slot_time: str) -> Optional[Dict[str, Any]]:
+        """
+        Hazırlanmış tweet'i al (bir kez kullanılır)
+
+        Hazırlık, ön hazırlık süresinin iki katından eskiyse kullanılmaz ve
+        gönderim kuyruğundan da çıkarılır.
+        """
+        with self._lock:
+            prepared = self._staged.pop(slot_time, None)
+
+        if not prepared:
+            self.stats['missed'] += 1
+            return None
+
+        if (datetime.now() - prepared['staged_at']).total_seconds() > self.max_age_seconds:
+            self.logger.warning(f"⚠️ {slot_time} hazırlığı eskimiş, kullanılmıyor")
+            # Kuyruktaki kopyası da gönderilmesin, yerine yeni tweet hazırlanır
+            outbox.discard(outbox.slot_key(slot_time))
+            self.stats['missed'] += 1
+            return None
+
+        self.stats['used'] += 1
+        return prepared
+
+    def get_status(self) -> Dict[str, Any]:
+        """Hazırlık durumunu al"""
+        with self._lock:
+            pending = sorted(self._staged.keys())
+        return {
+            'lead_minutes': self.lead_minutes,
+            'pending_slots': pending,
+            **self.stats
+        }
+
+
+# Global stager instance
+slot_stager = SlotStager()
@@ -1,11 +1,18 @@
-import schedule
-import time
 import logging
-from datetime import datetime, timedelta
 from typing import Dict, List
 from src.bot.hair_bot import hair_bot
+from src.bot.heap_scheduler import HeapScheduler
+from src.bot.slot_stager import slot_stager
+from src.bot.connection_warmer import connection_warmer
+from src.bot.account_registry import account_registry
+from src.bot.posting_engine import posting_engine
+from src.bot.outbox import outbox
+from src.api.trends_client import trends_client
+from src.content_creator.content_buffer import content_buffer
 from src.content_creator.weekly_planner import weekly_planner
 from src.config.settings import settings
+from src.image_generator.photo_cache import photo_cache
+from src.utils.lazy import LazyProxy, is_initialized
 
 class WeeklyScheduler:
     """Haftalık tweet zamanlayıcısı"""
@@ -13,6 +20,7 @@ class WeeklyScheduler:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.is_running = False
+        self.scheduler = HeapScheduler()
         self.tweet_times = [
             "09:00",  # Sabah
             "13:00",  # Öğle
@@ -24,26 +32,66 @@ class WeeklyScheduler:
         """Günlük tweet programını ayarla"""
         try:
             # Mevcut programı temizle
-            schedule.clear()
+            self.scheduler.clear()
             
             # Her gün için tweet zamanlarını ayarla
             daily_tweet_count = min(settings.TWEETS_PER_DAY, len(self.tweet_times))
             selected_times = self.tweet_times[:daily_tweet_count]
             
+            # Ek hesaplar gönderim motorunda paralel çalışır
+            extra_accounts = account_registry.names(include_default=False)
+            
             for tweet_time in selected_times:
-                schedule.every().day.at(tweet_time).do(self.send_scheduled_tweet)
+                # Hazırlık ve gönderimden önce bağlantıları ısıt
+                staging_time = slot_stager.staging_time(tweet_time)
+                self.scheduler.every_day_at(connection_warmer.warmup_time(staging_time),
+                                            connection_warmer.warm_up,
+                                            name=f"warmup_stage@{tweet_time}")
+                self.scheduler.every_day_at(connection_warmer.warmup_time(tweet_time),
+                                            connection_warmer.warm_up_for_publish,
+                                            name=f"warmup_tweet@{tweet_time}")
+                
+                # İçerik ve görseli zaman diliminden önce hazırla
+                self.scheduler.every_day_at(staging_time,
+                                            lambda t=tweet_time: slot_stager.stage(t),
+                                            name=f"stage@{tweet_time}")
+                if extra_accounts:
+                    self.scheduler.every_day_at(staging_time,
+                                                lambda t=tweet_time: posting_engine.stage_slot(extra_accounts, t),
+                                                name=f"stage_accounts@{tweet_time}")
+                    self.scheduler.every_day_at(tweet_time,
+                                                lambda t=tweet_time: posting_engine.submit_slot(extra_accounts, t),
+                                                name=f"accounts@{tweet_time}")
+                self.scheduler.every_day_at(tweet_time,
+                                            lambda t=tweet_time: self.send_scheduled_tweet(t),
+                                            name=f"tweet@{tweet_time}")
                 self.logger.info(f"Tweet zamanlandı: Her gün {tweet_time}")
             
+            # Başarısız veya ertelenen gönderimleri kuyruktan tekrar dene
+            self.scheduler.every(settings.OUTBOX_POLL_SECONDS, outbox.deliver_due, name="outbox")
+            
+            # Haftanın içeriklerini toplu üret (Pazartesi 06:00)
+            self.scheduler.every_week_at(0, "06:00", hair_bot.batch_generate_content, name="batch_content")
+            
             # Haftalık rapor (Pazartesi 08:00)
-            schedule.every().monday.at("08:00").do(self.send_weekly_report)
+            self.scheduler.every_week_at(0, "08:00", self.send_weekly_report, name="weekly_report")
             
-            self.logger.info(f"Günlük {daily_tweet_count} tweet zamanlandı")
+            self.logger.info(f"Günlük {daily_tweet_count} tweet zamanlandı"
+                             + (f" (+{len(extra_accounts)} ek hesap)" if extra_accounts else ""))
             
         except Exception as e:
             self.logger.error(f"Zamanlama ayarlama hatası: {e}")
     
-    def send_scheduled_tweet(self):
-        """Zamanlanmış tweet gönder"""
+    def send_scheduled_tweet(self, slot_time: str = None):
+        """
+        Zamanlanmış tweet gönder
+        
+        Tweet gönderim kuyruğu üzerinden atılır; başarısız veya ertelenen
+        gönderimler kuyruk taramasında tekrar denenir.
+        
+        Args:
+            slot_time: Tweet zamanı ('HH:MM'); verilirse önceden hazırlanan tweet kullanılır
+        """
         try:
             self.logger.info("Zamanlanmış tweet gönderiliyor...")
             
@@ -51,13 +99,26 @@ class WeeklyScheduler:
             today_theme = weekly_planner.get_today_theme()
             self.logger.info(f"Bugünün teması: {today_theme['name']} {today_theme['emoji']}")
             
-            # Tweet gönder (AI ile, gerçek fotoğraflarla)
-            success = hair_bot.post_hair_tweet(use_ai=True)
-            
-            if success:
+            # Önceden hazırlanmış tweet varsa sadece gönder (kuyruktaki kopyası, eskimemişse)
+            prepared = slot_stager.take(slot_time) if slot_time else None
+            state = outbox.post(prepared, slot_time=slot_time) if prepared or slot_time else 'missing'
+            
+            if state in ('missing', 'stale'):
+                # Hazırlık yoksa anlık üret (AI ile, gerçek fotoğraflarla)
+                prepared = hair_bot.prepare_hair_tweet(
+                    use_ai=True, slot_at=slot_stager.slot_datetime(slot_time) if slot_time else None
+                )
+                if not prepared:
+                    self.logger.error("❌ Zamanlanmış tweet hazırlanamadı!")
+                    return
+                state = outbox.post(prepared, slot_time=slot_time)
+            
+            if state == 'posted':
                 self.logger.info("✅ Zamanlanmış tweet başarıyla gönderildi!")
+            elif state == 'pending':
+                self.logger.warning("⏳ Zamanlanmış tweet kuyrukta, tekrar denenecek")
             else:
-                self.logger.error("❌ Zamanlanmış tweet gönderilemedi!")
+                self.logger.error(f"❌ Zamanlanmış tweet gönderilemedi! ({state})")
                 
         except Exception as e:
             self.logger.error(f"Zamanlanmış tweet hatası: {e}")
@@ -98,12 +159,21 @@ class WeeklyScheduler:
                 self.logger.error("❌ Twitter kimlik doğrulama başarısız!")
                 return False
             
+            # Önceki çalışmada yarım kalan gönderimleri kurtar
+            outbox.recover()
+            
+            # Trend hashtag'leri arka planda yenile, üretim sadece önbelleği okur
+            trends_client.start_background_refresh()
+            
+            # Bugünün teması için hazır içerik azsa arka planda doldur
+            content_buffer.refill_low([weekly_planner.get_today_theme()['name']])
+            
             self.is_running = True
             self.logger.info("✅ Zamanlayıcı aktif! Bekleyen görevler:")
             
             # Bekleyen görevleri listele
-            for job in schedule.jobs:
-                self.logger.info(f"   - {job}")
+            for job in self.scheduler.get_jobs():
+                self.logger.info(f"   - {job['job']}: {job['next_run']}")
             
             return True
             
@@ -119,9 +189,8 @@ class WeeklyScheduler:
         self.logger.info("⏰ Zamanlayıcı döngüsü başladı...")
         
         try:
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(60)  # Her dakika kontrol et
+            # Bir sonraki göreve kadar uyur, sabit aralıklı kontrol yok
+            self.scheduler.run_forever()
                 
         except KeyboardInterrupt:
             self.logger.info("⏹️ Zamanlayıcı kullanıcı tarafından durduruldu")
@@ -133,20 +202,33 @@ class WeeklyScheduler:
     def stop_scheduler(self):
         """Zamanlayıcıyı durdur"""
         self.is_running = False
-        schedule.clear()
+        trends_client.stop_background_refresh()
+        content_buffer.flush()
+        if is_initialized(photo_cache):
+            photo_cache.flush()
+        self.scheduler.stop()
+        self.scheduler.clear()
         self.logger.info("🛑 Zamanlayıcı durduruldu")
     
     def get_next_jobs(self) -> List[Dict]:
         """Sonraki görevleri al"""
-        jobs = []
-        for job in schedule.jobs:
-            jobs.append({
-                'job': str(job.job_func.__name__),
-                'next_run': job.next_run.strftime('%Y-%m-%d %H:%M:%S') if job.next_run else 'N/A',
-                'interval': str(job.interval),
-                'unit': job.unit
-            })
-        return jobs
+        return self.scheduler.get_jobs()
+    
+    def get_drift_stats(self) -> Dict:
+        """Görevlerin hedef zamandan sapma istatistikleri"""
+        return self.scheduler.get_drift_stats()
+    
+    def get_account_stats(self) -> Dict:
+        """Hesaplar ve hesap başına gönderim istatistikleri"""
+        return {**account_registry.get_status(), 'engine': posting_engine.get_stats()}
+    
+    def get_outbox_stats(self) -> Dict:
+        """Gönderim kuyruğu durumları ve sayaçları"""
+        return outbox.get_stats()
+    
+    def get_warmup_stats(self) -> Dict:
+        """Bağlantı ısıtma gecikmeleri (soğuk/sıcak)"""
+        return connection_warmer.get_stats()
     
     def manual_tweet_now(self):
         """Manuel tweet gönder"""
@@ -154,4 +236,4 @@ class WeeklyScheduler:
         return self.send_scheduled_tweet()
 
 # Global scheduler instance
-weekly_scheduler = WeeklyScheduler()
\ No newline at end of file
+weekly_scheduler = LazyProxy(WeeklyScheduler)
\ No newline at end of file
@@ -1,5 +1,5 @@
 import os
-from decouple import config
+from decouple import config, Csv
 
 class Settings:
     """Uygulama ayarları"""
@@ -23,14 +23,104 @@ class Settings:
     TWEETS_PER_DAY = config('TWEETS_PER_DAY', default=4, cast=int)
     BOT_NAME = config('BOT_NAME', default='HairStyleHub')
     
+    # Zamanlayıcı ayarları
+    # Her tweet zamanından kaç dakika önce içerik/görsel hazırlanacağı
+    STAGING_LEAD_MINUTES = config('STAGING_LEAD_MINUTES', default=5, cast=int)
+    # Hazırlıktan ve gönderimden kaç saniye önce bağlantıların ısıtılacağı
+    WARMUP_ENABLED = config('WARMUP_ENABLED', default=True, cast=bool)
+    WARMUP_LEAD_SECONDS = config('WARMUP_LEAD_SECONDS', default=60, cast=int)
+    
     # Dosya yolları
     BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     DATA_DIR = os.path.join(BASE_DIR, 'data')
     IMAGES_DIR = os.path.join(DATA_DIR, 'images')
     LOGS_DIR = os.path.join(BASE_DIR, 'logs')
+    PHOTO_CACHE_DIR = os.path.join(IMAGES_DIR, 'cache')
+    
+    # Ek hesaplar: JSON dosyası (ad, kullanıcı adı ve anahtarlar); varsayılan hesap .env'den gelir
+    ACCOUNTS_FILE = config('ACCOUNTS_FILE', default=os.path.join(DATA_DIR, 'accounts.json'))
+    # Aynı anda tweet hazırlayıp gönderen en fazla hesap sayısı
+    ACCOUNT_PARALLELISM = config('ACCOUNT_PARALLELISM', default=4, cast=int)
+    
+    # Gönderim kuyruğu (SQLite): hazırlanan tweet'ler gönderilene kadar diskte tutulur
+    OUTBOX_FILE = config('OUTBOX_FILE', default=os.path.join(DATA_DIR, 'outbox.db'))
+    # Başarısız gönderimde deneme sayısı ve ilk bekleme (saniye, her denemede iki katına çıkar)
+    OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+    OUTBOX_RETRY_BASE_SECONDS = config('OUTBOX_RETRY_BASE_SECONDS', default=60, cast=int)
+    # Bekleyen gönderimlerin kontrol aralığı (saniye) ve bu süreden eski tweet'ler gönderilmez (saat)
+    OUTBOX_POLL_SECONDS = config('OUTBOX_POLL_SECONDS', default=60, cast=int)
+    OUTBOX_MAX_AGE_HOURS = config('OUTBOX_MAX_AGE_HOURS', default=6, cast=int)
+    
+    # Fotoğraf önbelleği üst sınırı (MB), aşılınca en eski kullanılanlar silinir
+    PHOTO_CACHE_MAX_MB = config('PHOTO_CACHE_MAX_MB', default=500, cast=int)
+    
+    # Unsplash arama sonuçları önbelleği (dakika)
+    # TTL içinde taze kabul edilir, sonrasındaki pencerede eski sonuç döner ve arka planda yenilenir
+    SEARCH_CACHE_TTL_MINUTES = config('SEARCH_CACHE_TTL_MINUTES', default=360, cast=int)
+    SEARCH_CACHE_STALE_MINUTES = config('SEARCH_CACHE_STALE_MINUTES', default=1440, cast=int)
+    
+    # Görsel indirme ayarları
+    MAX_DOWNLOAD_MB = config('MAX_DOWNLOAD_MB', default=25, cast=int)
+    DOWNLOAD_CHUNK_KB = config('DOWNLOAD_CHUNK_KB', default=64, cast=int)
+    
+    # Ortak HTTP oturumu: host başına bağlantı havuzu boyutu ve varsayılan zaman aşımı (saniye)
+    HTTP_POOL_SIZE = config('HTTP_POOL_SIZE', default=10, cast=int)
+    HTTP_CONNECT_TIMEOUT = config('HTTP_CONNECT_TIMEOUT', default=5, cast=float)
+    HTTP_READ_TIMEOUT = config('HTTP_READ_TIMEOUT', default=30, cast=float)
+    
+    # Yüklenen görselin media_id'si bu süre (dakika) içinde aynı hesapta yeniden kullanılır (Twitter: 24 saat)
+    MEDIA_REUSE_TTL_MINUTES = config('MEDIA_REUSE_TTL_MINUTES', default=1380, cast=int)
+    
+    # Parça boyutundan büyük görseller INIT/APPEND/FINALIZE ile parça parça yüklenir (parça başına tekrar deneme)
+    MEDIA_CHUNKED_UPLOAD = config('MEDIA_CHUNKED_UPLOAD', default=True, cast=bool)
+    MEDIA_CHUNK_SIZE_KB = config('MEDIA_CHUNK_SIZE_KB', default=1024, cast=int)
+    MEDIA_CHUNK_RETRIES = config('MEDIA_CHUNK_RETRIES', default=3, cast=int)
+    
+    # Twitter görsel sınırları: Unsplash'tan bu boyuta göre küçültülmüş varyant istenir
+    IMAGE_TARGET_LONG_EDGE = config('IMAGE_TARGET_LONG_EDGE', default=2048, cast=int)
+    IMAGE_VARIANT_QUALITY = config('IMAGE_VARIANT_QUALITY', default=80, cast=int)
+    TWITTER_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+    
+    # Görsel normalizasyonu: yükleme öncesi yeniden boyutlandırma/sıkıştırma
+    IMAGE_BYTE_BUDGET_KB = config('IMAGE_BYTE_BUDGET_KB', default=2048, cast=int)
+    NORMALIZE_WORKERS = config('NORMALIZE_WORKERS', default=1, cast=int)
+    
+    # Paylaşılan görsellere bu Hamming mesafesinde (64 bit dHash) yakın adaylar atlanır
+    PHASH_THRESHOLD = config('PHASH_THRESHOLD', default=8, cast=int)
     
     # Tweet ayarları
     MAX_TWEET_LENGTH = 280
+    # Geçmiş tweet'lere bu SimHash mesafesinde (64 bit) yakın içerik yeniden üretilir
+    TEXT_SIMHASH_THRESHOLD = config('TEXT_SIMHASH_THRESHOLD', default=3, cast=int)
+    CONTENT_DEDUP_ATTEMPTS = config('CONTENT_DEDUP_ATTEMPTS', default=3, cast=int)
+    
+    # Trendler bu WOEID'ler için arka planda yenilenir (dakika, 0 kapatır); daha eski önbellek kullanılmaz
+    TREND_WOEIDS = config('TREND_WOEIDS', default='1,23424977', cast=Csv(int))
+    TREND_REFRESH_MINUTES = config('TREND_REFRESH_MINUTES', default=30, cast=int)
+    TREND_MAX_AGE_MINUTES = config('TREND_MAX_AGE_MINUTES', default=180, cast=int)
+    
+    # Profil ve metrikler bu süre (saniye) bellekten sunulur, sonra arka planda yenilenir
+    PROFILE_CACHE_TTL_SECONDS = config('PROFILE_CACHE_TTL_SECONDS', default=900, cast=int)
+    
+    # Twitter istek sınırı: zamanlanmış gönderimlerde hak dolunca davranış (wait/defer/reject)
+    RATE_LIMIT_MODE = config('RATE_LIMIT_MODE', default='defer')
+    # wait modunda en fazla beklenecek süre (saniye); daha uzunsa istek reddedilir
+    RATE_LIMIT_MAX_WAIT_SECONDS = config('RATE_LIMIT_MAX_WAIT_SECONDS', default=30, cast=float)
+    
+    # Dış servis devre kesicileri: ardışık hata eşiği ve açık kalma süresi (saniye)
+    CIRCUIT_FAILURE_THRESHOLD = config('CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int)
+    CIRCUIT_RESET_SECONDS = config('CIRCUIT_RESET_SECONDS', default=120, cast=int)
+    
+    # Gemini çağrı süresi üst sınırı (saniye); aşılırsa yedek içerik kullanılır
+    GEMINI_DEADLINE_SECONDS = config('GEMINI_DEADLINE_SECONDS', default=20, cast=float)
+    # Bu süre dolunca depodaki hazır aday paralel olarak hazırlanır, önce hazır olan kullanılır
+    GEMINI_HEDGE_AFTER_SECONDS = config('GEMINI_HEDGE_AFTER_SECONDS', default=5, cast=float)
+    GEMINI_HEDGE_ENABLED = config('GEMINI_HEDGE_ENABLED', default=True, cast=bool)
+    
+    # Hazır tweet deposu: tema başına aday sayısı bu sınırın altına inince arka planda doldurulur
+    CONTENT_BUFFER_LOW_WATERMARK = config('CONTENT_BUFFER_LOW_WATERMARK', default=2, cast=int)
+    CONTENT_BUFFER_TARGET = config('CONTENT_BUFFER_TARGET', default=8, cast=int)
+    CONTENT_BUFFER_MAX_AGE_HOURS = config('CONTENT_BUFFER_MAX_AGE_HOURS', default=336, cast=int)
     # Trending Hashtags (English only)
     HASHTAGS = [
         '#hairstyle', '#haircut', '#haircolor', '#hairgoals',
@@ -46,13 +136,18 @@ class Settings:
         '#aesthetic', '#vibes', '#goals', '#slay', '#iconic'
     ]
     
+    _directories_created = False
+    
     @classmethod
     def create_directories(cls):
-        """Gerekli klasörleri oluştur"""
+        """Gerekli klasörleri oluştur (ilk dosya erişiminde bir kez çağrılır)"""
+        if cls._directories_created:
+            return
         os.makedirs(cls.DATA_DIR, exist_ok=True)
         os.makedirs(cls.IMAGES_DIR, exist_ok=True)
+        os.makedirs(cls.PHOTO_CACHE_DIR, exist_ok=True)
         os.makedirs(cls.LOGS_DIR, exist_ok=True)
+        cls._directories_created = True
 
 # Ayarları başlat
-settings = Settings()
-settings.create_directories()
\ No newline at end of file
+settings = Settings()
\ No newline at end of file
@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+
+
+class ContentBuffer:
+    """
+    Önceden üretilmiş tweet adayları deposu
+
+    Adaylar (tema, stil) anahtarıyla kuyruklarda tutulur ve
+    data/content_buffer.json dosyasında saklanır. Gönderim anında
+    Gemini'ye gitmeden buradan O(1) alınır. Bir temanın aday sayısı alt
+    sınırın (low watermark) altına düşünce arka planda yeniden doldurulur,
+    böylece Gemini gönderim yolunun dışında kalır. Alımlar diske hemen
+    yazılmaz; dosya gecikmeli olarak, doldurmada ve kapanışta kaydedilir.
+    """
+
+    # Alımdan sonra dosyanın yazılması için beklenen süre (saniye)
+    SAVE_DELAY_SECONDS = 30
+
+    def __init__(self, buffer_path: str = None, low_watermark: int = None,
+                 target: int = None, max_age_hours: int = None):
+        self.logger = logging.getLogger(__name__)
+        settings.create_directories()
+        self.buffer_path = buffer_path or os.path.join(settings.DATA_DIR, 'content_buffer.json')
+        self.low_watermark = low_watermark if low_watermark is not None else settings.CONTENT_BUFFER_LOW_WATERMARK
+        self.target = target if target is not None else settings.CONTENT_BUFFER_TARGET
+        self.max_age_seconds = (max_age_hours if max_age_hours is not None
+                                else settings.CONTENT_BUFFER_MAX_AGE_HOURS) * 3600
+        self._queues: Dict[str, deque] = {}
+        self._theme_levels: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+
+        # Doldurma fonksiyonu: (tema adı, adet) -> aday listesi
+        self._refill_fn: Optional[Callable[[str, int], List[Dict[str, Any]]]] = None
+        self._refilling = set()
+        self.stats = {
+            'takes': 0,
+            'empty_takes': 0,
+            'expired': 0,
+            'refills': 0,
+            'refill_errors': 0
+        }
+        self._load()
+
+    @staticmethod
+    def make_key(theme_name: str, style: Optional[str]) -> str:
+        return f"{theme_name}|{style or ''}"
+
+    def _load(self):
+        """Depoyu diskten yükle"""
+        try:
+            if not os.path.exists(self.buffer_path):
+                return
+            with open(self.buffer_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._queues = {key: deque(items) for key, items in data.items()}
+            for key, queue in self._queues.items():
+                theme_name = key.split('|', 1)[0]
+                self._theme_levels[theme_name] = self._theme_levels.get(theme_name, 0) + len(queue)
+            self.logger.info(f"İçerik deposu yüklendi: {self.total()} aday")
+        except Exception as e:
+            self.logger.error(f"İçerik deposu yükleme hatası: {e}")
+            self._queues, self._theme_levels = {}, {}
+
+    def _save(self):
+        """Depoyu atomik olarak diske yaz (kilit altında çağrılır)"""
+        self._dirty = False
+        if self._save_timer:
+            self._save_timer.cancel()
+            self._save_timer = None
+        try:
+            tmp_path = self.buffer_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({key: list(items) for key, items in self._queues.items() if items},
+                          f, ensure_ascii=False)
+            os.replace(tmp_path, self.buffer_path)
+        except Exception as e:
+            self.logger.error(f"İçerik deposu kaydetme hatası: {e}")
+
+    def _save_later(self):
+        """Değişikliği kaydetmeyi SAVE_DELAY_SECONDS sonrasına ertele (kilit altında çağrılır)"""
+        self._dirty = True
+        if self._save_timer is None:
+            self._save_timer = threading.Timer(self.SAVE_DELAY_SECONDS, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Kaydedilmemiş alımları diske yaz (kapanışta çağrılır)"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    @staticmethod
+    def _age(candidate: Dict[str, Any], now: float) -> float:
+        try:
+            return now - datetime.fromisoformat(candidate['created_at']).timestamp()
+        except (KeyError, ValueError):
+            return 0.0
+
+    def add(self, candidates: List[Dict[str, Any]]) -> int:
+        """
+        Adayları depoya ekle
+
+        Returns:
+            int: Eklenen aday sayısı
+        """
+        with self._lock:
+            for candidate in candidates:
+                candidate.setdefault('created_at', datetime.now().isoformat())
+                key = self.make_key(candidate['theme'], candidate.get('style'))
+                self._queues.setdefault(key, deque()).append(candidate)
+                self._theme_levels[candidate['theme']] = self._theme_levels.get(candidate['theme'], 0) + 1
+            self._save()
+        return len(candidates)
+
+    def take(self, theme_name: str, style: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Tema (ve stil) için en eski adayı al
+
+        Süresi geçmiş adaylar atlanır. Alımdan sonra tema alt sınırın
+        altındaysa arka planda doldurma başlatılır. Dosya hemen yazılmaz,
+        SAVE_DELAY_SECONDS içindeki alımlar tek yazımda kaydedilir.
+
+        Returns:
+            Dict: Aday içerik (yoksa None)
+        """
+        candidate = None
+        now = time.time()
+        with self._lock:
+            self.stats['takes'] += 1
+            queue = self._queues.get(self.make_key(theme_name, style))
+            if queue:
+                self._save_later()
+            while queue:
+                item = queue.popleft()
+                self._theme_levels[theme_name] -= 1
+                if self._age(item, now) <= self.max_age_seconds:
+                    candidate = item
+                    break
+                self.stats['expired'] += 1
+            if candidate is None:
+                self.stats['empty_takes'] += 1
+
+        self.refill_low([theme_name])
+        return candidate
+
+    def take_any(self, theme_name: str) -> Optional[Dict[str, Any]]:
+        """Tema için herhangi bir stildeki en eski adayı al"""
+        for style in self.styles_with_content(theme_name):
+            candidate = self.take(theme_name, style or None)
+            if candidate:
+                return candidate
+        return None
+    
+    def level(self, theme_name: str, style: Optional[str] = None) -> int:
+        """Tema/stil için bekleyen aday sayısı"""
+        with self._lock:
+            return len(self._queues.get(self.make_key(theme_name, style), ()))
+
+    def theme_level(self, theme_name: str) -> int:
+        """Tema için tüm stillerdeki toplam aday sayısı (O(1))"""
+        with self._lock:
+            return self._theme_levels.get(theme_name, 0)
+
+    def styles_with_content(self, theme_name: str) -> List[str]:
+        """Tema için adayı olan stiller"""
+        prefix = f"{theme_name}|"
+        with self._lock:
+            return [key[len(prefix):] for key, queue in self._queues.items()
+                    if key.startswith(prefix) and queue]
+
+    def total(self) -> int:
+        """Toplam aday sayısı"""
+        with self._lock:
+            return sum(self._theme_levels.values())
+
+    # ------------------------------------------------------------------
+    # Arka planda doldurma
+    # ------------------------------------------------------------------
+    def configure_refill(self, refill_fn: Callable[[str, int], List[Dict[str, Any]]]):
+        """Doldurma fonksiyonunu ayarla: (tema adı, adet) -> aday listesi"""
+        self._refill_fn = refill_fn
+
+    def refill_low(self, theme_names: List[str]):
+        """Alt sınırın altındaki temaları arka planda doldur (tema başına tek iş)"""
+        if not self._refill_fn:
+            return
+
+        for theme_name in theme_names:
+            with self._lock:
+                level = self._theme_levels.get(theme_name, 0)
+                if level >= self.low_watermark or theme_name in self._refilling:
+                    continue
+                self._refilling.add(theme_name)
+
+            threading.Thread(target=self._refill, args=(theme_name, self.target - level),
+                             name="content-refill", daemon=True).start()
+
+    def _refill(self, theme_name: str, count: int):
+        try:
+            self.logger.info(f"📦 İçerik deposu dolduruluyor: {theme_name} (+{count})")
+            candidates = self._refill_fn(theme_name, count)
+            self.add(candidates)
+            self.stats['refills'] += 1
+        except Exception as e:
+            self.stats['refill_errors'] += 1
+            self.logger.error(f"İçerik deposu doldurma hatası: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard(theme_name)
+
+    # ------------------------------------------------------------------
+    # Metrikler
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, Any]:
+        """Tema bazında doluluk ve yaş metrikleri"""
+        now = time.time()
+        themes = {}
+        with self._lock:
+            for key, queue in self._queues.items():
+                if not queue:
+                    continue
+                theme_name = key.split('|', 1)[0]
+                ages = [self._age(item, now) for item in queue]
+                entry = themes.setdefault(theme_name, {'level': 0, 'oldest_age_seconds': 0.0, '_age_total': 0.0})
+                entry['level'] += len(queue)
+                entry['oldest_age_seconds'] = max(entry['oldest_age_seconds'], max(ages))
+                entry['_age_total'] += sum(ages)
+            refilling = sorted(self._refilling)
+
+        for entry in themes.values():
+            entry['avg_age_seconds'] = entry.pop('_age_total') / entry['level']
+            entry['fill_ratio'] = entry['level'] / self.target if self.target else None
+
+        return {
+            'total': sum(entry['level'] for entry in themes.values()),
+            'low_watermark': self.low_watermark,
+            'target': self.target,
+            'themes': themes,
+            'refilling': refilling,
+            **self.stats
+        }
+
+
+# Global content buffer instance
+content_buffer = LazyProxy(ContentBuffer)
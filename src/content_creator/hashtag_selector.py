@@ -0,0 +1,145 @@
+import random
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.api.trends_client import trends_client
+
+
+class HashtagSelector:
+    """
+    Zaman dilimi başına hashtag seçimi
+
+    Her tema için settings.HASHTAGS bir kez sıralanır (temanın adı, stilleri
+    ve hashtag'leriyle eşleşenler öne alınır) ve havuz önbellekte tutulur.
+    Bir zaman dilimi için seçilen set (sabit + trend) bellekte saklanır;
+    prompt, yedek içerik ve toplu üretim aynı dilimde aynı seti kullanır.
+    Tweet zaman dilimine göre anahtarlanır: dilimden önce yapılan hazırlık
+    ile dilim anında yapılan yeniden üretim aynı seti alır.
+    """
+
+    # Sıralı havuzun seçim yapılan üst kısmı (istenen sayının katı)
+    POOL_FACTOR = 2
+    MAX_SLOTS = 64
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._pools: Dict[str, List[str]] = {}
+        self._slots: 'OrderedDict[tuple, List[str]]' = OrderedDict()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'pools_built': 0
+        }
+
+    @staticmethod
+    def slot_key(slot_at: Optional[datetime] = None) -> str:
+        """
+        Zaman dilimi anahtarı
+
+        Args:
+            slot_at: Tweet zaman diliminin anı; verilmezse içinde bulunulan saat
+        """
+        if slot_at:
+            return slot_at.strftime('%Y-%m-%d %H:%M')
+        return datetime.now().strftime('%Y-%m-%d %H')
+
+    @staticmethod
+    def _theme_keywords(theme: Dict[str, Any]) -> List[str]:
+        """Temanın adı, stilleri, hashtag'leri ve içerik türlerinden anahtar kelimeler"""
+        words = [theme.get('name', '')] + theme.get('styles', []) + theme.get('content_types', [])
+        words += [tag.lstrip('#') for tag in theme.get('hashtags', [])]
+        tokens = set()
+        for word in words:
+            for token in word.lower().replace('_', ' ').split():
+                if len(token) >= 4:
+                    tokens.add(token)
+        return sorted(tokens)
+
+    def ranked_pool(self, theme: Optional[Dict[str, Any]] = None) -> List[str]:
+        """
+        Tema için sıralanmış hashtag havuzu (önbellekli)
+
+        Sıralama: temayla eşleşen anahtar kelime sayısı, eşitlikte
+        settings.HASHTAGS'teki sıra.
+        """
+        name = theme['name'] if theme else ''
+        with self._lock:
+            pool = self._pools.get(name)
+        if pool is not None:
+            return pool
+
+        keywords = self._theme_keywords(theme) if theme else []
+        order = {tag: index for index, tag in enumerate(settings.HASHTAGS)}
+
+        def score(tag: str) -> int:
+            text = tag.lstrip('#').lower()
+            return sum(1 for keyword in keywords if keyword in text or text in keyword)
+
+        pool = sorted(settings.HASHTAGS, key=lambda tag: (-score(tag), order[tag]))
+        with self._lock:
+            self._pools[name] = pool
+            self.stats['pools_built'] += 1
+        return pool
+
+    def select(self, theme: Optional[Dict[str, Any]] = None, base_count: int = 3,
+               trend_count: int = 2, slot_key: Optional[str] = None) -> List[str]:
+        """
+        Zaman dilimi için hashtag seti (aynı dilimde aynı sonuç)
+
+        Args:
+            theme: Haftalık tema (None ise genel havuz)
+            base_count: Sabit hashtag sayısı
+            trend_count: Trend hashtag sayısı
+            slot_key: Zaman dilimi anahtarı (verilmezse içinde bulunulan saat)
+
+        Returns:
+            List[str]: Sıralı sabit hashtag'ler + trend hashtag'ler
+        """
+        key = (slot_key or self.slot_key(), theme['name'] if theme else '', base_count, trend_count)
+        with self._lock:
+            cached = self._slots.get(key)
+            if cached is not None:
+                self._slots.move_to_end(key)
+                self.stats['hits'] += 1
+                return list(cached)
+            self.stats['misses'] += 1
+
+        pool = self.ranked_pool(theme)
+        # Dilimler arası çeşitlilik: sıralı havuzun üst kısmından dilime özgü seçim
+        top = pool[:max(base_count * self.POOL_FACTOR, base_count)]
+        picked = set(random.Random('|'.join(map(str, key))).sample(top, min(base_count, len(top))))
+        base_hashtags = [tag for tag in pool if tag in picked]
+
+        try:
+            trend_hashtags = trends_client.get_trending_hashtags(count=trend_count) if trend_count else []
+        except Exception as e:
+            self.logger.warning(f"Trend hashtag'ler alınamadı: {e}")
+            trend_hashtags = []
+
+        selected = base_hashtags + [tag for tag in trend_hashtags if tag not in picked]
+        with self._lock:
+            self._slots[key] = selected
+            while len(self._slots) > self.MAX_SLOTS:
+                self._slots.popitem(last=False)
+
+        self.logger.info(f"Hashtag seti ({key[1] or 'genel'}): {len(base_hashtags)} sabit + "
+                         f"{len(selected) - len(base_hashtags)} trend")
+        return list(selected)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Önbellek sayaçları"""
+        with self._lock:
+            return {
+                'pools': len(self._pools),
+                'slots': len(self._slots),
+                **self.stats
+            }
+
+
+# Global hashtag selector instance
+hashtag_selector = LazyProxy(HashtagSelector)
@@ -0,0 +1,210 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from typing import Optional, Dict, Any
+from src.config.settings import settings
+from src.api.http_session import http_pool
+from src.utils.lazy import LazyProxy
+from src.image_generator.photo_cache import photo_cache
+from src.utils.resilience import resilience, http_failure
+
+
+class ImageDownloader:
+    """
+    Akışlı (streaming) görsel indirici
+
+    Yanıt belleğe alınmadan parça parça geçici dosyaya yazılır, indirme
+    sırasında sha256 hesaplanır ve boyut sınırı aşılırsa indirme kesilir.
+    Yarım kalan indirmeler Range isteği ile kaldığı yerden devam eder;
+    sunucu devamı reddederse (416 vb.) parça silinip bir kez baştan indirilir.
+    Tamamlanan dosya atomik olarak fotoğraf önbelleğine taşınır. Aynı URL'i
+    indiren iş parçacıkları sıraya girer; sonraki çağrı önbellekteki dosyayı alır.
+    """
+
+    # Yarım parça kullanılamıyor, baştan indirilmeli
+    _RESTART = object()
+
+    def __init__(self, max_bytes: int = None, chunk_size: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.MAX_DOWNLOAD_MB * 1024 * 1024
+        self.chunk_size = chunk_size or settings.DOWNLOAD_CHUNK_KB * 1024
+        self.tmp_dir = os.path.join(photo_cache.cache_dir, 'tmp')
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        # URL -> [kilit, bekleyen sayısı]; yarım parça dosyaları aynı anda yazılmasın
+        self._url_locks: Dict[str, list] = {}
+        self._locks_lock = threading.Lock()
+        self.stats = {
+            'downloads': 0,
+            'resumed': 0,
+            'restarted': 0,
+            'shared': 0,
+            'aborted_too_large': 0,
+            'bytes_downloaded': 0
+        }
+
+    def _part_paths(self, url: str):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        part_path = os.path.join(self.tmp_dir, f"{name}.part")
+        return part_path, part_path + '.json'
+
+    def _acquire_url(self, url: str) -> bool:
+        """URL kilidini al; başka bir indirmeyi beklediyse True döner"""
+        with self._locks_lock:
+            entry = self._url_locks.setdefault(url, [threading.Lock(), 0])
+            entry[1] += 1
+        if entry[0].acquire(blocking=False):
+            return False
+        entry[0].acquire()
+        return True
+
+    def _release_url(self, url: str):
+        with self._locks_lock:
+            entry = self._url_locks[url]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._url_locks[url]
+        entry[0].release()
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> Dict[str, Any]:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _discard(*paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def download(self, url: str, cache_key: str, timeout: int = 30,
+                 max_bytes: int = None, session=None) -> Optional[str]:
+        """
+        Görseli akışlı indir ve önbelleğe kaydet
+
+        Args:
+            url: Görsel URL'i
+            cache_key: Fotoğraf önbelleği anahtarı
+            timeout: Bağlantı/okuma zaman aşımı (saniye)
+            max_bytes: Boyut sınırı (verilmezse ayarlardaki değer)
+            session: HTTP oturumu (opsiyonel, varsayılan ortak bağlantı havuzu)
+
+        Returns:
+            str: Önbellekteki dosya yolu (hata durumunda None)
+        """
+        max_bytes = max_bytes or self.max_bytes
+        http = session or http_pool.session
+
+        waited = self._acquire_url(url)
+        try:
+            # Beklenen indirme aynı dosyayı önbelleğe koymuş olabilir
+            cached_path = photo_cache.get(cache_key) if waited else None
+            if cached_path:
+                self.stats['shared'] += 1
+                return cached_path
+
+            result = self._fetch(url, cache_key, timeout, max_bytes, http)
+            if result is self._RESTART:
+                self.stats['restarted'] += 1
+                self.logger.warning("Yarım indirme devam ettirilemedi, baştan indiriliyor")
+                self._discard(*self._part_paths(url))
+                result = self._fetch(url, cache_key, timeout, max_bytes, http)
+            return None if result is self._RESTART else result
+        finally:
+            self._release_url(url)
+
+    def _fetch(self, url: str, cache_key: str, timeout: int, max_bytes: int, http):
+        """Tek indirme denemesi (yarım parça kullanılamıyorsa _RESTART döner)"""
+        part_path, meta_path = self._part_paths(url)
+
+        # Yarım kalmış indirme varsa kaldığı yerden devam et
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        meta = self._read_meta(meta_path) if offset else {}
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+            validator = meta.get('etag') or meta.get('last_modified')
+            if validator:
+                headers['If-Range'] = validator
+
+        try:
+            with resilience.call('unsplash:download', http.get, url, headers=headers, stream=True,
+                                 timeout=timeout, failure_if=http_failure) as response:
+                if response.status_code == 206 and offset:
+                    mode = 'ab'
+                    self.stats['resumed'] += 1
+                    self.logger.info(f"İndirme kaldığı yerden devam ediyor: {offset} bayt")
+                elif response.status_code == 200:
+                    # Sunucu Range desteklemiyor veya dosya değişmiş, baştan başla
+                    mode, offset = 'wb', 0
+                elif offset:
+                    # 416 veya beklenmeyen yanıt: parça geçersiz
+                    self.logger.warning(f"Range isteği reddedildi: {response.status_code}")
+                    return self._RESTART
+                else:
+                    self.logger.error(f"Görsel indirme hatası: {response.status_code}")
+                    return None
+
+                content_length = response.headers.get('Content-Length')
+                if content_length and offset + int(content_length) > max_bytes:
+                    self.stats['aborted_too_large'] += 1
+                    self.logger.error(f"Görsel boyut sınırını aşıyor: {offset + int(content_length)} bayt")
+                    self._discard(part_path, meta_path)
+                    return None
+
+                with open(meta_path, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'url': url,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified')
+                    }, f)
+
+                # Devam eden indirmede özet mevcut parçadan başlatılır
+                digest = hashlib.sha256()
+                if mode == 'ab':
+                    with open(part_path, 'rb') as f:
+                        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                            digest.update(chunk)
+
+                written = offset
+                with open(part_path, mode) as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if not chunk:
+                            continue
+                        written += len(chunk)
+                        if written > max_bytes:
+                            self.stats['aborted_too_large'] += 1
+                            self.logger.error(f"Görsel boyut sınırını aşıyor: >{max_bytes} bayt")
+                            break
+                        f.write(chunk)
+                        digest.update(chunk)
+                        self.stats['bytes_downloaded'] += len(chunk)
+
+            if written > max_bytes:
+                self._discard(part_path, meta_path)
+                return None
+
+            # Tamamlanan dosyayı atomik olarak önbelleğe taşı
+            file_path = photo_cache.put_file(cache_key, part_path, sha=digest.hexdigest())
+            self._discard(meta_path)
+            self.stats['downloads'] += 1
+            return file_path
+
+        except Exception as e:
+            # Parça dosyası bir sonraki denemede devam etmek için bırakılır
+            self.logger.error(f"Görsel indirme hatası: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """İndirme istatistiklerini al"""
+        return dict(self.stats)
+
+
+# Global downloader instance
+image_downloader = LazyProxy(ImageDownloader)
@@ -0,0 +1,160 @@
+import io
+import os
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.image_generator.photo_cache import photo_cache
+
+
+def normalize_image_file(src_path: str, dest_path: str, max_long_edge: int,
+                         max_bytes: int, min_quality: int = 50) -> Dict[str, Any]:
+    """
+    Görseli Twitter sınırlarına göre yeniden boyutlandır ve sıkıştır
+
+    Süreç havuzunda çalışır, bu yüzden modül seviyesinde tanımlıdır.
+    - JPEG'lerde draft modu ile doğrudan küçültülmüş ölçekte decode edilir
+    - EXIF yönü uygulanır, EXIF ve diğer metadata kaydedilmez
+    - Uzun kenar max_long_edge'e indirilir
+    - Kalite, dosya bayt bütçesine sığana kadar düşürülür
+
+    Returns:
+        Dict: width, height, bytes, quality
+    """
+    from PIL import Image, ImageOps
+    
+    with Image.open(src_path) as img:
+        if img.format == 'JPEG':
+            # Tam çözünürlükte decode etmeden 1/2, 1/4, 1/8 ölçekte oku
+            img.draft('RGB', (max_long_edge, max_long_edge))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('RGB')
+
+    long_edge = max_long_edge
+    while True:
+        if max(img.size) > long_edge:
+            img.thumbnail((long_edge, long_edge), Image.LANCZOS)
+
+        for quality in range(85, min_quality - 1, -5):
+            buffer = io.BytesIO()
+            img.save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+            if buffer.tell() <= max_bytes:
+                with open(dest_path, 'wb') as f:
+                    f.write(buffer.getvalue())
+                return {
+                    'width': img.size[0],
+                    'height': img.size[1],
+                    'bytes': buffer.tell(),
+                    'quality': quality
+                }
+
+        # En düşük kalitede de sığmadı, boyutu küçültüp tekrar dene
+        long_edge = int(max(img.size) * 0.85)
+        if long_edge < 320:
+            raise ValueError("Görsel bayt bütçesine sığdırılamadı")
+
+
+class ImageNormalizer:
+    """
+    Yükleme öncesi görsel normalizasyon aşaması
+
+    Kodlama işi süreç havuzunda çalışır, zamanlayıcı iş parçacığı bloklanmaz.
+    Çıktılar fotoğraf önbelleğinde kaynak hash'i ve parametrelerle saklanır.
+    """
+
+    def __init__(self, max_long_edge: int = None, max_bytes: int = None, workers: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.max_long_edge = max_long_edge or settings.IMAGE_TARGET_LONG_EDGE
+        self.max_bytes = max_bytes or min(settings.IMAGE_BYTE_BUDGET_KB * 1024, settings.TWITTER_IMAGE_MAX_BYTES)
+        self.workers = workers or settings.NORMALIZE_WORKERS
+        self.tmp_dir = os.path.join(photo_cache.cache_dir, 'tmp')
+        self._executor = None
+        self._lock = threading.Lock()
+        self.stats = {
+            'normalized': 0,
+            'cache_hits': 0,
+            'errors': 0,
+            'bytes_in': 0,
+            'bytes_out': 0
+        }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Süreç havuzunu ilk kullanımda oluştur"""
+        with self._lock:
+            if self._executor is None:
+                # fork, zamanlayıcı ve HTTP thread'leri çalışırken kilitleri kopyalayabilir
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+    def normalize(self, image_path: str, timeout: float = 60) -> str:
+        """
+        Görseli normalize et
+
+        Args:
+            image_path: Kaynak görsel yolu
+            timeout: Kodlama için en uzun bekleme (saniye)
+
+        Returns:
+            str: Normalize edilmiş görsel yolu (hata durumunda kaynak yol)
+        """
+        tmp_path = None
+        try:
+            src_sha = photo_cache.file_sha256(image_path)
+            cache_key = f"normalized:{src_sha}:{self.max_long_edge}:{self.max_bytes}"
+
+            cached_path = photo_cache.get(cache_key)
+            if cached_path:
+                self.stats['cache_hits'] += 1
+                return cached_path
+
+            os.makedirs(self.tmp_dir, exist_ok=True)
+            # Aynı kaynağın eşzamanlı normalizasyonları birbirinin dosyasını ezmesin
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{src_sha}.", suffix='.norm', dir=self.tmp_dir)
+            os.close(fd)
+            future = self._get_executor().submit(
+                normalize_image_file, image_path, tmp_path, self.max_long_edge, self.max_bytes
+            )
+            result = future.result(timeout=timeout)
+
+            file_path = photo_cache.put_file(cache_key, tmp_path)
+            tmp_path = None
+
+            bytes_in = os.path.getsize(image_path)
+            self.stats['normalized'] += 1
+            self.stats['bytes_in'] += bytes_in
+            self.stats['bytes_out'] += result['bytes']
+            self.logger.info(f"Görsel normalize edildi: {result['width']}x{result['height']}, "
+                             f"q={result['quality']}, {bytes_in} -> {result['bytes']} bayt")
+            return file_path
+
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.logger.error(f"Görsel normalizasyon hatası, orijinal kullanılacak: {e}")
+            return image_path
+
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Normalizasyon istatistiklerini al"""
+        return dict(self.stats)
+
+    def shutdown(self):
+        """Süreç havuzunu kapat"""
+        with self._lock:
+            if self._executor:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+# Global normalizer instance
+image_normalizer = LazyProxy(ImageNormalizer)
@@ -0,0 +1,133 @@
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+from src.utils.hamming_index import HammingIndex
+
+
+def dhash(image_source, hash_size: int = 8) -> int:
+    """
+    Görselin fark hash'ini (dHash) hesapla
+
+    Görsel (hash_size+1) x hash_size gri tonlamaya küçültülür ve yan yana
+    piksellerin parlaklık farkından 64 bitlik bir parmak izi çıkarılır.
+    Yeniden boyutlandırma ve sıkıştırmaya dayanıklıdır.
+
+    Args:
+        image_source: Dosya yolu veya dosya benzeri nesne
+
+    Returns:
+        int: 64 bitlik hash
+    """
+    from PIL import Image
+    
+    with Image.open(image_source) as img:
+        if img.format == 'JPEG':
+            img.draft('L', (hash_size * 8, hash_size * 8))
+        small = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class PerceptualHashIndex:
+    """
+    Paylaşılan görsellerin kalıcı algısal hash indeksi
+
+    Kayıtlar data/phash_index.jsonl dosyasına eklenerek yazılır, açılışta
+    çoklu indeks hash'leme yapısına yüklenir. Aynı veya çok benzer bir
+    görseli tekrar paylaşmamak için seçici bu indeksi sorgular.
+    """
+
+    def __init__(self, index_path: str = None, threshold: int = None):
+        self.logger = logging.getLogger(__name__)
+        settings.create_directories()
+        self.index_path = index_path or os.path.join(settings.DATA_DIR, 'phash_index.jsonl')
+        self.threshold = threshold if threshold is not None else settings.PHASH_THRESHOLD
+        self._index = HammingIndex(bits=64, chunks=4, max_distance=max(self.threshold, 3))
+        self._photo_ids = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Kayıtları diskten yükle"""
+        try:
+            if not os.path.exists(self.index_path):
+                return
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    self._index.add(int(record['hash'], 16), record)
+                    if record.get('photo_id'):
+                        self._photo_ids.add(record['photo_id'])
+            self.logger.info(f"Algısal hash indeksi yüklendi: {len(self._index)} görsel")
+        except Exception as e:
+            self.logger.error(f"Algısal hash indeksi yükleme hatası: {e}")
+
+    def has_photo(self, photo_id: str) -> bool:
+        """Bu Unsplash fotoğrafı daha önce paylaşıldı mı"""
+        return photo_id in self._photo_ids
+
+    def find_similar(self, image_hash: int, threshold: int = None) -> Optional[Dict[str, Any]]:
+        """
+        Eşik içindeki en benzer paylaşılmış görseli bul
+
+        Returns:
+            Dict: Kayıt ve mesafe (benzer yoksa None)
+        """
+        match = self._index.nearest(image_hash, threshold if threshold is not None else self.threshold)
+        if not match:
+            return None
+        record, distance = match
+        return {**record, 'distance': distance}
+
+    def add(self, image_hash: int, photo_id: str = None, image_path: str = None):
+        """Paylaşılan görseli indekse ekle"""
+        record = {
+            'hash': f"{image_hash:016x}",
+            'photo_id': photo_id,
+            'file': os.path.basename(image_path) if image_path else None,
+            'posted_at': datetime.now().isoformat()
+        }
+        try:
+            with self._lock:
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+                self._index.add(image_hash, record)
+                if photo_id:
+                    self._photo_ids.add(photo_id)
+        except Exception as e:
+            self.logger.error(f"Algısal hash kaydetme hatası: {e}")
+
+    def add_image(self, image_path: str, photo_id: str = None) -> Optional[int]:
+        """Görsel dosyasının hash'ini hesapla ve indekse ekle"""
+        try:
+            image_hash = dhash(image_path)
+            self.add(image_hash, photo_id, image_path)
+            return image_hash
+        except Exception as e:
+            self.logger.error(f"Algısal hash hesaplama hatası: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """İndeks istatistiklerini al"""
+        return {
+            'images': len(self._index),
+            'photo_ids': len(self._photo_ids),
+            'threshold': self.threshold
+        }
+
+
+# Global perceptual hash index instance
+phash_index = LazyProxy(PerceptualHashIndex)
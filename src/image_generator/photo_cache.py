@@ -0,0 +1,221 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+
+
+class PhotoCache:
+    """
+    İçerik adresli disk fotoğraf önbelleği
+
+    Dosyalar içerik hash'i (sha256) ile saklanır; aynı içerik farklı anahtarlarla
+    gelse de diskte tek kopya tutulur. Anahtarlar (örn. 'unsplash:<id>:full')
+    hash'e eşlenir. Toplam boyut bütçeyi aşınca en uzun süredir kullanılmayan
+    dosyalar silinir (LRU). Erişim sırası bellekte tutulur; indeks ekleme,
+    silme ve kapanışta diske yazılır.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = cache_dir or settings.PHOTO_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else settings.PHOTO_CACHE_MAX_MB * 1024 * 1024
+        self.index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        self._lock = threading.RLock()
+
+        # anahtar -> içerik hash'i
+        self._keys: Dict[str, str] = {}
+        # içerik hash'i -> dosya bilgisi, en eski kullanılandan en yeniye sıralı
+        self._blobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.total_bytes = 0
+        # Diske yazılmamış erişim zamanı var mı
+        self._dirty = False
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'evicted_bytes': 0
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    # ------------------------------------------------------------------
+    # İndeks kalıcılığı
+    # ------------------------------------------------------------------
+    def _load_index(self):
+        """Diskteki indeksi yükle, kaybolan dosyaları at"""
+        try:
+            if not os.path.exists(self.index_path):
+                return
+
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            blobs = sorted(data.get('blobs', {}).items(), key=lambda item: item[1].get('last_access', 0))
+            for sha, info in blobs:
+                if os.path.exists(os.path.join(self.cache_dir, info['file'])):
+                    self._blobs[sha] = info
+                    self.total_bytes += info['size']
+
+            self._keys = {key: sha for key, sha in data.get('keys', {}).items() if sha in self._blobs}
+            self.logger.info(f"Fotoğraf önbelleği yüklendi: {len(self._blobs)} dosya, "
+                             f"{self.total_bytes / (1024 * 1024):.1f} MB")
+
+        except Exception as e:
+            self.logger.error(f"Önbellek indeksi yükleme hatası: {e}")
+            self._keys, self._blobs, self.total_bytes = {}, OrderedDict(), 0
+
+    def _save_index(self):
+        """İndeksi atomik olarak diske yaz"""
+        self._dirty = False
+        try:
+            tmp_path = self.index_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'keys': self._keys, 'blobs': self._blobs}, f)
+            os.replace(tmp_path, self.index_path)
+        except Exception as e:
+            self.logger.error(f"Önbellek indeksi kaydetme hatası: {e}")
+
+    def flush(self):
+        """Bellekteki erişim sırasını diske yaz (kapanışta çağrılır)"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    # ------------------------------------------------------------------
+    # Okuma / yazma
+    # ------------------------------------------------------------------
+    def _path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, self._blobs[sha]['file'])
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Anahtar için önbellekteki dosya yolunu al
+
+        Returns:
+            str: Dosya yolu (yoksa None)
+        """
+        with self._lock:
+            sha = self._keys.get(key)
+            if sha and sha in self._blobs and os.path.exists(self._path(sha)):
+                self._blobs[sha]['last_access'] = time.time()
+                self._blobs.move_to_end(sha)
+                self.stats['hits'] += 1
+                self._dirty = True
+                return self._path(sha)
+
+            if sha:
+                # Dosya dışarıdan silinmiş, kaydı temizle
+                self._drop_blob(sha)
+                self._save_index()
+            self.stats['misses'] += 1
+            return None
+
+    def put_bytes(self, key: str, data: bytes, ext: str = '.jpg') -> str:
+        """Bellekteki içeriği önbelleğe yaz ve dosya yolunu döndür"""
+        sha = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if sha not in self._blobs:
+                tmp_path = os.path.join(self.cache_dir, f".{sha}.tmp")
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                self._add_blob(sha, tmp_path, ext)
+            return self._link(key, sha)
+
+    def put_file(self, key: str, src_path: str, ext: str = '.jpg', sha: str = None) -> str:
+        """
+        Diskteki dosyayı önbelleğe taşı ve yeni yolunu döndür
+
+        Args:
+            key: Önbellek anahtarı
+            src_path: Taşınacak dosya (aynı dosya sisteminde olmalı)
+            ext: Dosya uzantısı
+            sha: Bilinen sha256 (verilmezse hesaplanır)
+        """
+        if not sha:
+            sha = self.file_sha256(src_path)
+        with self._lock:
+            if sha in self._blobs:
+                os.remove(src_path)
+            else:
+                self._add_blob(sha, src_path, ext)
+            return self._link(key, sha)
+
+    def _add_blob(self, sha: str, src_path: str, ext: str):
+        filename = f"{sha}{ext}"
+        os.replace(src_path, os.path.join(self.cache_dir, filename))
+        size = os.path.getsize(os.path.join(self.cache_dir, filename))
+        now = time.time()
+        self._blobs[sha] = {'file': filename, 'size': size, 'created': now, 'last_access': now}
+        self.total_bytes += size
+
+    def _link(self, key: str, sha: str) -> str:
+        self._keys[key] = sha
+        self._blobs[sha]['last_access'] = time.time()
+        self._blobs.move_to_end(sha)
+        self._evict(keep=sha)
+        self._save_index()
+        return self._path(sha)
+
+    def _drop_blob(self, sha: str):
+        info = self._blobs.pop(sha, None)
+        if not info:
+            return
+        self.total_bytes -= info['size']
+        try:
+            os.remove(os.path.join(self.cache_dir, info['file']))
+        except FileNotFoundError:
+            pass
+        self._keys = {key: value for key, value in self._keys.items() if value != sha}
+
+    def _evict(self, keep: str = None):
+        """Bütçe aşıldıysa en eski kullanılan dosyaları sil"""
+        while self.total_bytes > self.max_bytes and self._blobs:
+            sha, info = next(iter(self._blobs.items()))
+            if sha == keep:
+                # Yeni eklenen dosya tek başına bütçeden büyükse yine de tut
+                if len(self._blobs) == 1:
+                    break
+                self._blobs.move_to_end(sha)
+                continue
+            self._drop_blob(sha)
+            self.stats['evictions'] += 1
+            self.stats['evicted_bytes'] += info['size']
+            self.logger.info(f"Önbellekten silindi: {info['file']} ({info['size']} bayt)")
+
+    # ------------------------------------------------------------------
+    # Yardımcılar
+    # ------------------------------------------------------------------
+    @staticmethod
+    def file_sha256(path: str) -> str:
+        """Dosyanın sha256 özetini hesapla"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Önbellek istatistiklerini al"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'files': len(self._blobs),
+                'keys': len(self._keys),
+                'total_bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_ratio': self.stats['hits'] / lookups if lookups else None,
+                **self.stats
+            }
+
+
+# Global photo cache instance
+photo_cache = LazyProxy(PhotoCache)
@@ -1,13 +1,24 @@
-import requests
 import os
+import io
 import logging
 import random
 from typing import Optional, Dict, List
 from src.config.settings import settings
+from src.api.http_session import http_pool
+from src.utils.lazy import LazyProxy
+from src.image_generator.photo_cache import photo_cache
+from src.image_generator.search_cache import search_cache
+from src.image_generator.downloader import image_downloader
+from src.image_generator.variant_policy import variant_policy
+from src.image_generator.phash_index import phash_index, dhash
+from src.utils.resilience import resilience, http_failure
 
 class RealPhotoClient:
     """Gerçek saç fotoğrafları için Unsplash API istemcisi"""
     
+    # Benzersiz fotoğraf bulunamazsa denenecek en fazla arama sayfası
+    MAX_SEARCH_PAGES = 3
+    
     def __init__(self):
         self.access_key = settings.UNSPLASH_ACCESS_KEY
         self.base_url = "https://api.unsplash.com"
@@ -27,7 +38,7 @@ class RealPhotoClient:
             'trendy': ['trendy hair', 'modern hairstyle', 'fashion hair', 'stylish hair']
         }
     
-    def search_hair_photos(self, style_focus: str, theme: str, count: int = 10) -> List[Dict]:
+    def search_hair_photos(self, style_focus: str, theme: str, count: int = 10, page: int = 1) -> List[Dict]:
         """
         Saç stili fotoğrafları ara
         
@@ -35,6 +46,7 @@ class RealPhotoClient:
             style_focus: Odaklanılacak stil
             theme: Haftalık tema
             count: Kaç fotoğraf getirileceği
+            page: Sonuç sayfası
             
         Returns:
             List[Dict]: Fotoğraf bilgileri listesi
@@ -47,7 +59,45 @@ class RealPhotoClient:
             # Arama terimini belirle
             search_term = self._get_search_term(style_focus, theme)
             
-            # Unsplash API'den ara
+            # Aynı sorgu yakın zamanda yapıldıysa önbellekten al
+            results = search_cache.get_or_fetch(
+                search_term, 'portrait', count,
+                lambda: self._fetch_search_results(search_term, count, page),
+                page=page
+            )
+            
+            photos = []
+            for photo in results:
+                photos.append({
+                    'id': photo['id'],
+                    'url': photo['urls']['regular'],
+                    'download_url': photo['urls']['full'],
+                    'raw_url': photo['urls'].get('raw'),
+                    'thumb_url': photo['urls'].get('thumb'),
+                    'width': photo.get('width'),
+                    'height': photo.get('height'),
+                    'description': photo.get('description', ''),
+                    'alt_description': photo.get('alt_description', ''),
+                    'photographer': photo['user']['name'],
+                    'photographer_url': photo['user']['links']['html'],
+                    'unsplash_url': photo['links']['html']
+                })
+            
+            self.logger.info(f"Unsplash'dan {len(photos)} fotoğraf bulundu: {search_term}")
+            return photos
+                
+        except Exception as e:
+            self.logger.error(f"Fotoğraf arama hatası: {e}")
+            return []
+    
+    def _fetch_search_results(self, search_term: str, count: int, page: int = 1) -> Optional[List[Dict]]:
+        """
+        Unsplash /search/photos isteği at
+        
+        Returns:
+            List[Dict]: Sadeleştirilmiş sonuçlar (hata durumunda None)
+        """
+        try:
             headers = {
                 'Authorization': f'Client-ID {self.access_key}'
             }
@@ -55,43 +105,32 @@ class RealPhotoClient:
             params = {
                 'query': search_term,
                 'per_page': count,
+                'page': page,
                 'orientation': 'portrait',
                 'content_filter': 'high',
                 'order_by': 'relevant'
             }
             
-            response = requests.get(
+            response = resilience.call(
+                'unsplash:search',
+                http_pool.get,
                 f"{self.base_url}/search/photos",
                 headers=headers,
                 params=params,
-                timeout=10
+                timeout=10,
+                failure_if=http_failure
             )
             
             if response.status_code == 200:
                 data = response.json()
-                photos = []
-                
-                for photo in data.get('results', []):
-                    photos.append({
-                        'id': photo['id'],
-                        'url': photo['urls']['regular'],
-                        'download_url': photo['urls']['full'],
-                        'description': photo.get('description', ''),
-                        'alt_description': photo.get('alt_description', ''),
-                        'photographer': photo['user']['name'],
-                        'photographer_url': photo['user']['links']['html'],
-                        'unsplash_url': photo['links']['html']
-                    })
-                
-                self.logger.info(f"Unsplash'dan {len(photos)} fotoğraf bulundu: {search_term}")
-                return photos
+                return [search_cache.slim_photo(photo) for photo in data.get('results', [])]
             else:
                 self.logger.error(f"Unsplash API hatası: {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             self.logger.error(f"Fotoğraf arama hatası: {e}")
-            return []
+            return None
     
     def download_photo(self, photo_info: Dict, filename: str = None) -> Optional[str]:
         """
@@ -104,24 +143,56 @@ class RealPhotoClient:
         Returns:
             str: İndirilen dosya yolu
         """
+        result = self.download_photo_variant(photo_info, filename)
+        return result['file_path'] if result else None
+    
+    def download_photo_variant(self, photo_info: Dict, filename: str = None) -> Optional[Dict]:
+        """
+        Fotoğrafın Twitter'a uygun boyuttaki varyantını indir
+        
+        urls.full yerine urls.raw üzerinden küçültülmüş varyant istenir; varyant
+        bayt sınırını aşarsa bir alt basamak denenir. raw URL yoksa urls.full indirilir.
+        
+        Args:
+            photo_info: Fotoğraf bilgileri
+            filename: Dosya adı (opsiyonel, log için)
+            
+        Returns:
+            Dict: file_path, variant, bytes, estimated_full_bytes, bytes_saved
+        """
         try:
             if not filename:
                 filename = f"hair_photo_{photo_info['id']}.jpg"
             
-            file_path = os.path.join(settings.IMAGES_DIR, filename)
+            candidates = []
+            for variant in variant_policy.get_ladder():
+                url = variant_policy.build_url(photo_info, variant)
+                if url:
+                    candidates.append((variant_policy.variant_name(variant), url, variant_policy.max_bytes))
+            if not candidates:
+                candidates.append(('full', photo_info['download_url'], None))
             
-            # Fotoğrafı indir
-            response = requests.get(photo_info['download_url'], timeout=30)
-            
-            if response.status_code == 200:
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
+            for variant_name, url, max_bytes in candidates:
+                # Aynı varyant daha önce indirildiyse önbellekten kullan
+                cache_key = f"unsplash:{photo_info['id']}:{variant_name}"
+                file_path = photo_cache.get(cache_key)
+                downloaded = not file_path
+                if file_path:
+                    self.logger.info(f"Fotoğraf önbellekten alındı: {filename} ({variant_name})")
+                else:
+                    # Fotoğrafı parça parça indir (tamamı belleğe alınmaz)
+                    file_path = image_downloader.download(url, cache_key, timeout=30, max_bytes=max_bytes)
+                    if not file_path:
+                        continue
+                    self.logger.info(f"Fotoğraf indirildi: {filename} ({variant_name})")
                 
-                self.logger.info(f"Fotoğraf indirildi: {filename}")
-                return file_path
-            else:
-                self.logger.error(f"Fotoğraf indirme hatası: {response.status_code}")
-                return None
+                stats = variant_policy.record(photo_info, os.path.getsize(file_path), downloaded=downloaded)
+                if downloaded and stats['bytes_saved']:
+                    self.logger.info(f"Varyant ile ~{stats['bytes_saved'] / (1024 * 1024):.1f} MB tasarruf")
+                return {'file_path': file_path, 'variant': variant_name, **stats}
+            
+            self.logger.error(f"Fotoğraf indirilemedi: {filename}")
+            return None
                 
         except Exception as e:
             self.logger.error(f"Fotoğraf indirme hatası: {e}")
@@ -138,24 +209,45 @@ class RealPhotoClient:
         Returns:
             str: İndirilen fotoğraf yolu
         """
+        result = self.get_random_hair_photo_info(style_focus, theme)
+        return result['file_path'] if result else None
+    
+    def get_random_hair_photo_info(self, style_focus: str = None, theme: str = None) -> Optional[Dict]:
+        """
+        Rastgele saç fotoğrafı al, indir ve indirme bilgilerini döndür
+        
+        Args:
+            style_focus: Stil odağı
+            theme: Tema
+            
+        Returns:
+            Dict: file_path, photo, variant ve bayt istatistikleri
+        """
         try:
-            # Fotoğrafları ara
-            photos = self.search_hair_photos(style_focus or 'hairstyle', theme or 'general', count=20)
+            selected_photo = photo_hash = None
+            for page in range(1, self.MAX_SEARCH_PAGES + 1):
+                # Fotoğrafları ara (her sayfada arama terimi yeniden seçilir)
+                photos = self.search_hair_photos(style_focus or 'hairstyle', theme or 'general',
+                                                 count=20, page=page)
+                if not photos:
+                    continue
+                
+                # Daha önce paylaşılmamış ve benzeri olmayan bir fotoğraf seç
+                selected_photo, photo_hash = self._select_unique_photo(photos)
+                if selected_photo:
+                    break
             
-            if not photos:
-                self.logger.warning("Unsplash'dan fotoğraf bulunamadı")
+            if not selected_photo:
+                self.logger.warning("Paylaşılmamış benzersiz fotoğraf bulunamadı")
                 return None
             
-            # Rastgele bir fotoğraf seç
-            selected_photo = random.choice(photos)
-            
             # Fotoğrafı indir
             filename = f"real_hair_{selected_photo['id']}.jpg"
-            file_path = self.download_photo(selected_photo, filename)
+            result = self.download_photo_variant(selected_photo, filename)
             
-            if file_path:
+            if result:
                 self.logger.info(f"Gerçek saç fotoğrafı hazır: {filename}")
-                return file_path
+                return {'photo': selected_photo, 'phash': photo_hash, **result}
             else:
                 return None
                 
@@ -163,6 +255,50 @@ class RealPhotoClient:
             self.logger.error(f"Rastgele fotoğraf alma hatası: {e}")
             return None
     
+    def _thumbnail_hash(self, photo: Dict) -> Optional[int]:
+        """Küçük önizleme görselinden dHash hesapla"""
+        if not photo.get('thumb_url'):
+            return None
+        try:
+            response = resilience.call('unsplash:download', http_pool.get, photo['thumb_url'],
+                                       timeout=10, retries=0, failure_if=http_failure)
+            if response.status_code != 200:
+                return None
+            return dhash(io.BytesIO(response.content))
+        except Exception as e:
+            self.logger.warning(f"Önizleme hash hatası: {e}")
+            return None
+    
+    def _select_unique_photo(self, photos: List[Dict]):
+        """
+        Rastgele sırayla adayları dene, paylaşılmış görsellere benzeyenleri atla
+        
+        Returns:
+            Tuple: (seçilen fotoğraf, önizleme hash'i); uygun aday yoksa (None, None)
+        """
+        candidates = random.sample(photos, len(photos))
+        
+        # Aynı Unsplash fotoğrafı zaten paylaşıldıysa hash hesaplamaya gerek yok
+        fresh = [photo for photo in candidates if not phash_index.has_photo(photo['id'])]
+        if not fresh:
+            self.logger.info("Tüm adaylar daha önce paylaşılmış")
+            return None, None
+        
+        for photo in fresh:
+            photo_hash = self._thumbnail_hash(photo)
+            if photo_hash is None:
+                return photo, None
+            
+            similar = phash_index.find_similar(photo_hash)
+            if not similar:
+                return photo, photo_hash
+            
+            self.logger.info(f"Benzer görsel atlandı: {photo['id']} "
+                             f"(mesafe {similar['distance']}, {similar.get('photo_id')})")
+        
+        self.logger.info("Adayların hepsi paylaşılmış görsellere benziyor")
+        return None, None
+    
     def _get_search_term(self, style_focus: str, theme: str) -> str:
         """Arama terimi oluştur"""
         
@@ -200,4 +336,4 @@ class RealPhotoClient:
         return random.choice(default_terms)
 
 # Global instance
-real_photo_client = RealPhotoClient()
\ No newline at end of file
+real_photo_client = LazyProxy(RealPhotoClient)
\ No newline at end of file
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Any
+from src.config.settings import settings
+from src.utils.lazy import LazyProxy
+
+
+class SearchCache:
+    """
+    Unsplash arama sonuçları için kalıcı TTL önbelleği
+
+    Sonuçlar (sorgu, yön, sayfa boyutu) anahtarıyla saklanır:
+    - TTL içinde: doğrudan önbellekten döner
+    - TTL sonrası, eskime penceresi içinde: eski sonuç hemen döner, arka planda yenilenir
+    - Pencere dışında: senkron istek atılır; istek başarısız olursa eski sonuç kullanılır
+    """
+
+    def __init__(self, cache_path: str = None, ttl_seconds: int = None, stale_seconds: int = None):
+        self.logger = logging.getLogger(__name__)
+        settings.create_directories()
+        self.cache_path = cache_path or os.path.join(settings.DATA_DIR, 'search_cache.json')
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.SEARCH_CACHE_TTL_MINUTES * 60
+        self.stale_seconds = stale_seconds if stale_seconds is not None else settings.SEARCH_CACHE_STALE_MINUTES * 60
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._refreshing = set()
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'errors_served_stale': 0
+        }
+        self._load()
+
+    @staticmethod
+    def make_key(query: str, orientation: str, per_page: int, page: int = 1) -> str:
+        """Önbellek anahtarı oluştur"""
+        key = f"{query.lower().strip()}|{orientation}|{per_page}"
+        return f"{key}|{page}" if page > 1 else key
+
+    @staticmethod
+    def slim_photo(photo: Dict[str, Any]) -> Dict[str, Any]:
+        """API sonucundan sadece istemcilerin kullandığı alanları tut"""
+        return {
+            'id': photo['id'],
+            'urls': photo.get('urls', {}),
+            'width': photo.get('width'),
+            'height': photo.get('height'),
+            'description': photo.get('description', ''),
+            'alt_description': photo.get('alt_description', ''),
+            'user': {
+                'name': photo['user']['name'],
+                'links': {'html': photo['user']['links']['html']}
+            },
+            'links': {'html': photo.get('links', {}).get('html', '')}
+        }
+
+    def _load(self):
+        """Önbelleği diskten yükle"""
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+                self.logger.info(f"Arama önbelleği yüklendi: {len(self._entries)} sorgu")
+        except Exception as e:
+            self.logger.error(f"Arama önbelleği yükleme hatası: {e}")
+            self._entries = {}
+
+    def _save(self):
+        """Önbelleği atomik olarak diske yaz (kilit altında çağrılır)"""
+        try:
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            self.logger.error(f"Arama önbelleği kaydetme hatası: {e}")
+
+    def _store(self, key: str, results: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = {'fetched_at': time.time(), 'results': results}
+            self._save()
+
+    def _refresh_in_background(self, key: str, fetch_fn: Callable[[], Optional[List[Dict]]]):
+        """Eski kaydı arka planda yenile (anahtar başına tek istek)"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                results = fetch_fn()
+                if results is not None:
+                    self._store(key, results)
+                    self.stats['refreshes'] += 1
+            except Exception as e:
+                self.logger.error(f"Arama önbelleği yenileme hatası: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name="search-refresh", daemon=True).start()
+
+    def get_or_fetch(self, query: str, orientation: str, per_page: int,
+                     fetch_fn: Callable[[], Optional[List[Dict]]], page: int = 1) -> List[Dict[str, Any]]:
+        """
+        Önbellekten al veya API'den getir
+
+        Args:
+            query: Arama terimi
+            orientation: Fotoğraf yönü
+            per_page: Sonuç sayısı
+            fetch_fn: API isteği; başarıda sonuç listesi, hatada None döndürür
+            page: Sonuç sayfası
+
+        Returns:
+            List[Dict]: Sadeleştirilmiş fotoğraf sonuçları
+        """
+        key = self.make_key(query, orientation, per_page, page)
+        with self._lock:
+            entry = self._entries.get(key)
+
+        age = time.time() - entry['fetched_at'] if entry else None
+
+        if entry and age < self.ttl_seconds:
+            self.stats['hits'] += 1
+            return entry['results']
+
+        if entry and age < self.ttl_seconds + self.stale_seconds:
+            self.stats['stale_hits'] += 1
+            self._refresh_in_background(key, fetch_fn)
+            return entry['results']
+
+        self.stats['misses'] += 1
+        results = fetch_fn()
+        if results is not None:
+            self._store(key, results)
+            return results
+
+        if entry:
+            # İstek başarısız, çok eski de olsa elimizdeki sonucu kullan
+            self.stats['errors_served_stale'] += 1
+            self.logger.warning(f"Unsplash isteği başarısız, eski sonuç kullanılıyor: {query}")
+            return entry['results']
+
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Önbellek istatistiklerini al"""
+        return {'queries': len(self._entries), **self.stats}
+
+
+# Global search cache instance
+search_cache = LazyProxy(SearchCache)
@@ -1,10 +1,15 @@
-import requests
 import os
 import logging
 from typing import Optional, Dict, List
-from PIL import Image
 import io
+import hashlib
 from src.config.settings import settings
+from src.api.http_session import http_pool
+from src.utils.lazy import LazyProxy
+from src.image_generator.photo_cache import photo_cache
+from src.image_generator.search_cache import search_cache
+from src.image_generator.downloader import image_downloader
+from src.utils.resilience import resilience, http_failure
 
 class UnsplashClient:
     """Unsplash API istemcisi - Ücretsiz saç stili görselleri"""
@@ -32,11 +37,43 @@ class UnsplashClient:
             if theme:
                 search_query += f" {theme}"
             
-            # API isteği
+            # Aynı sorgu yakın zamanda yapıldıysa önbellekten al
+            results = search_cache.get_or_fetch(
+                search_query, 'portrait', 10,
+                lambda: self._fetch_search_results(search_query, 10)
+            )
+            
+            images = []
+            for photo in results:
+                images.append({
+                    'id': photo['id'],
+                    'url': photo['urls']['regular'],
+                    'thumb_url': photo['urls']['thumb'],
+                    'description': photo.get('description', ''),
+                    'alt_description': photo.get('alt_description', ''),
+                    'photographer': photo['user']['name'],
+                    'photographer_url': photo['user']['links']['html']
+                })
+            
+            self.logger.info(f"Unsplash'dan {len(images)} görsel bulundu: {search_query}")
+            return images
+                
+        except Exception as e:
+            self.logger.error(f"Unsplash arama hatası: {e}")
+            return []
+    
+    def _fetch_search_results(self, search_query: str, per_page: int) -> Optional[List[Dict]]:
+        """
+        Unsplash /search/photos isteği at
+        
+        Returns:
+            List[Dict]: Sadeleştirilmiş sonuçlar (hata durumunda None)
+        """
+        try:
             url = f"{self.base_url}/search/photos"
             params = {
                 'query': search_query,
-                'per_page': 10,
+                'per_page': per_page,
                 'orientation': 'portrait',
                 'content_filter': 'high',
                 'order_by': 'relevant'
@@ -46,61 +83,52 @@ class UnsplashClient:
                 'Authorization': f'Client-ID {self.access_key}'
             }
             
-            response = requests.get(url, params=params, headers=headers)
+            response = resilience.call('unsplash:search', http_pool.get, url, params=params, headers=headers,
+                                       timeout=10, failure_if=http_failure)
             
             if response.status_code == 200:
                 data = response.json()
-                images = []
-                
-                for photo in data.get('results', []):
-                    images.append({
-                        'id': photo['id'],
-                        'url': photo['urls']['regular'],
-                        'thumb_url': photo['urls']['thumb'],
-                        'description': photo.get('description', ''),
-                        'alt_description': photo.get('alt_description', ''),
-                        'photographer': photo['user']['name'],
-                        'photographer_url': photo['user']['links']['html']
-                    })
-                
-                self.logger.info(f"Unsplash'dan {len(images)} görsel bulundu: {search_query}")
-                return images
-                
+                return [search_cache.slim_photo(photo) for photo in data.get('results', [])]
             else:
                 self.logger.error(f"Unsplash API hatası: {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             self.logger.error(f"Unsplash arama hatası: {e}")
-            return []
+            return None
     
-    def download_image(self, image_url: str, filename: str) -> Optional[str]:
+    def download_image(self, image_url: str, filename: str, photo_id: str = None) -> Optional[str]:
         """
         Görseli indir ve kaydet
         
         Args:
             image_url: Görsel URL'i
             filename: Kaydedilecek dosya adı
+            photo_id: Unsplash fotoğraf kimliği (opsiyonel, önbellek anahtarı için)
             
         Returns:
             str: Kaydedilen dosya yolu
         """
         try:
-            # Görseli indir
-            response = requests.get(image_url)
+            # Önbellek anahtarı: Unsplash kimliği, yoksa URL özeti
+            if photo_id:
+                cache_key = f"unsplash:{photo_id}:regular"
+            else:
+                cache_key = f"url:{hashlib.sha1(image_url.encode('utf-8')).hexdigest()}"
             
-            if response.status_code == 200:
-                # Dosya yolunu oluştur
-                file_path = os.path.join(settings.IMAGES_DIR, filename)
-                
-                # Görseli kaydet
-                with open(file_path, 'wb') as f:
-                    f.write(response.content)
-                
+            cached_path = photo_cache.get(cache_key)
+            if cached_path:
+                self.logger.info(f"Görsel önbellekten alındı: {filename}")
+                return cached_path
+            
+            # Görseli parça parça indir ve önbelleğe kaydet
+            file_path = image_downloader.download(image_url, cache_key)
+            
+            if file_path:
                 self.logger.info(f"Görsel kaydedildi: {file_path}")
                 return file_path
             else:
-                self.logger.error(f"Görsel indirme hatası: {response.status_code}")
+                self.logger.error(f"Görsel indirilemedi: {filename}")
                 return None
                 
         except Exception as e:
@@ -159,7 +187,7 @@ class UnsplashClient:
                 filename = f"hair_{style}_{theme_name.replace(' ', '_').lower()}_{selected_image['id']}.jpg"
                 
                 # Görseli indir
-                file_path = self.download_image(selected_image['url'], filename)
+                file_path = self.download_image(selected_image['url'], filename, selected_image['id'])
                 
                 if file_path:
                     return {
@@ -243,6 +271,7 @@ class FallbackImageGenerator:
             
             # Dosya yolunu oluştur
             filename = f"fallback_{style}_{theme.replace(' ', '_').lower()}.png"
+            settings.create_directories()
             file_path = os.path.join(settings.IMAGES_DIR, filename)
             
             # Görseli kaydet
@@ -256,5 +285,5 @@ class FallbackImageGenerator:
             return None
 
 # Global instances
-unsplash_client = UnsplashClient()
-fallback_generator = FallbackImageGenerator()
\ No newline at end of file
+unsplash_client = LazyProxy(UnsplashClient)
+fallback_generator = LazyProxy(FallbackImageGenerator)
\ No newline at end of file
@@ -0,0 +1,112 @@
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+from urllib.parse import urlencode
+from src.config.settings import settings
+
+
+class ImageVariantPolicy:
+    """
+    Unsplash görsel varyantı seçimi
+
+    Orijinal yükleme (urls.full) çoğu zaman 5-20 MB olur. Bunun yerine
+    urls.raw üzerinden Twitter'ın gösterim boyutuna ve bayt sınırına uygun
+    (uzun kenar, kalite, format parametreli) bir varyant istenir. İlk varyant
+    sınırı aşarsa daha küçük basamaklara inilir.
+    """
+
+    # Tam boyutlu JPEG için piksel başına ortalama bayt (q≈85 fotoğraf)
+    FULL_BYTES_PER_PIXEL = 0.4
+
+    def __init__(self, long_edge: int = None, quality: int = None, max_bytes: int = None):
+        self.logger = logging.getLogger(__name__)
+        self.long_edge = long_edge or settings.IMAGE_TARGET_LONG_EDGE
+        self.quality = quality or settings.IMAGE_VARIANT_QUALITY
+        self.max_bytes = max_bytes or settings.TWITTER_IMAGE_MAX_BYTES
+        self._lock = threading.Lock()
+        self.stats = {
+            'downloads': 0,
+            'cache_hits': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0
+        }
+
+    def get_ladder(self) -> List[Dict[str, int]]:
+        """Denenecek varyant basamakları (büyükten küçüğe)"""
+        return [
+            {'long_edge': self.long_edge, 'quality': self.quality},
+            {'long_edge': int(self.long_edge * 0.75), 'quality': max(self.quality - 10, 50)},
+            {'long_edge': int(self.long_edge * 0.5), 'quality': max(self.quality - 15, 50)}
+        ]
+
+    @staticmethod
+    def variant_name(variant: Dict[str, int]) -> str:
+        return f"w{variant['long_edge']}q{variant['quality']}"
+
+    def build_url(self, photo: Dict[str, Any], variant: Dict[str, int]) -> Optional[str]:
+        """
+        urls.raw için boyut/kalite parametreli URL oluştur
+
+        Returns:
+            str: Varyant URL'i (raw URL yoksa None)
+        """
+        raw_url = photo.get('raw_url')
+        if not raw_url:
+            return None
+
+        params = {
+            'w': variant['long_edge'],
+            'h': variant['long_edge'],
+            'fit': 'max',
+            'q': variant['quality'],
+            'fm': 'jpg',
+            'cs': 'srgb'
+        }
+        separator = '&' if '?' in raw_url else '?'
+        return f"{raw_url}{separator}{urlencode(params)}"
+
+    def estimate_full_bytes(self, photo: Dict[str, Any]) -> Optional[int]:
+        """Orijinal (urls.full) dosyanın tahmini boyutu"""
+        width, height = photo.get('width'), photo.get('height')
+        if not width or not height:
+            return None
+        return int(width * height * self.FULL_BYTES_PER_PIXEL)
+
+    def record(self, photo: Dict[str, Any], variant_bytes: int, downloaded: bool = True) -> Dict[str, Any]:
+        """
+        Kullanılan varyantın tasarrufunu kaydet
+
+        Args:
+            photo: Fotoğraf bilgileri
+            variant_bytes: Varyant dosyasının boyutu
+            downloaded: Varyant indirildi mi (False ise önbellekten alındı,
+                indirme ve tasarruf sayaçlarına eklenmez)
+
+        Returns:
+            Dict: Bu varyant için bayt istatistikleri
+        """
+        estimated_full = self.estimate_full_bytes(photo)
+        saved = max(estimated_full - variant_bytes, 0) if estimated_full else 0
+
+        with self._lock:
+            if not downloaded:
+                self.stats['cache_hits'] += 1
+            else:
+                self.stats['downloads'] += 1
+                self.stats['bytes_downloaded'] += variant_bytes
+                self.stats['bytes_saved'] += saved
+
+        return {
+            'bytes': variant_bytes,
+            'estimated_full_bytes': estimated_full,
+            'bytes_saved': saved
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Toplam tasarruf istatistiklerini al"""
+        with self._lock:
+            return dict(self.stats)
+
+
+# Global variant policy instance
+variant_policy = ImageVariantPolicy()
@@ -0,0 +1,100 @@
+import threading
+from itertools import combinations
+from typing import Dict, List, Tuple, Any
+
+if hasattr(int, 'bit_count'):
+    def popcount(value: int) -> int:
+        return value.bit_count()
+else:
+    def popcount(value: int) -> int:
+        return bin(value).count('1')
+
+
+class HammingIndex:
+    """
+    Hamming mesafesi için çoklu indeks hash'leme (multi-index hashing)
+
+    b bitlik hash m parçaya bölünür ve her parça ayrı bir sözlükte tutulur.
+    İki hash arasındaki mesafe <= t ise güvercin yuvası ilkesine göre en az
+    bir parçadaki mesafe <= t // m olur. Sorguda her parça için bu yarıçaptaki
+    komşu değerlere bakılır, sadece aday kümesi tam olarak karşılaştırılır.
+    Böylece sorgu süresi indeks boyutuyla doğrusal büyümez.
+    """
+
+    def __init__(self, bits: int = 64, chunks: int = 4, max_distance: int = 8):
+        if bits % chunks:
+            raise ValueError("bits, chunks sayısına tam bölünmeli")
+        self.bits = bits
+        self.chunks = chunks
+        self.chunk_bits = bits // chunks
+        self.chunk_mask = (1 << self.chunk_bits) - 1
+        self.max_distance = max_distance
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(chunks)]
+        self._hashes: List[int] = []
+        self._items: List[Any] = []
+        self._lock = threading.Lock()
+        self._neighbor_masks = self._build_masks(max_distance // chunks)
+
+    def _build_masks(self, radius: int) -> List[int]:
+        """Parça içinde en fazla radius bit farklı tüm XOR maskeleri"""
+        masks = []
+        for r in range(radius + 1):
+            for positions in combinations(range(self.chunk_bits), r):
+                mask = 0
+                for position in positions:
+                    mask |= 1 << position
+                masks.append(mask)
+        return masks
+
+    def _split(self, value: int):
+        for i in range(self.chunks):
+            yield i, (value >> (i * self.chunk_bits)) & self.chunk_mask
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def add(self, value: int, item: Any = None):
+        """Hash ekle"""
+        with self._lock:
+            idx = len(self._hashes)
+            self._hashes.append(value)
+            self._items.append(item)
+            for i, part in self._split(value):
+                self._tables[i].setdefault(part, []).append(idx)
+
+    def query(self, value: int, max_distance: int = None) -> List[Tuple[Any, int]]:
+        """
+        Verilen mesafe içindeki kayıtları bul
+
+        Args:
+            value: Aranan hash
+            max_distance: En fazla Hamming mesafesi (indeksin sınırını aşamaz)
+
+        Returns:
+            List[Tuple]: (kayıt, mesafe) listesi, mesafeye göre sıralı
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        with self._lock:
+            candidates = set()
+            for i, part in self._split(value):
+                table = self._tables[i]
+                for mask in self._neighbor_masks:
+                    bucket = table.get(part ^ mask)
+                    if bucket:
+                        candidates.update(bucket)
+
+            matches = []
+            for idx in candidates:
+                distance = popcount(self._hashes[idx] ^ value)
+                if distance <= max_distance:
+                    matches.append((self._items[idx], distance))
+
+        matches.sort(key=lambda match: match[1])
+        return matches
+
+    def nearest(self, value: int, max_distance: int = None):
+        """Verilen mesafe içindeki en yakın kaydı bul (yoksa None)"""
+        matches = self.query(value, max_distance)
+        return matches[0] if matches else None
@@ -0,0 +1,59 @@
+import threading
+from typing import Any, Callable
+
+
+class LazyProxy:
+    """
+    İlk kullanımda oluşturulan global örnek vekili
+
+    Modül içe aktarılırken istemci (ve SDK'sı) kurulmaz; ilk öznitelik
+    erişiminde factory bir kez çağrılır ve sonraki erişimler doğrudan
+    oluşturulan nesneye yönlendirilir.
+    """
+
+    __slots__ = ('_lazy_factory', '_lazy_instance', '_lazy_lock', '__weakref__')
+
+    def __init__(self, factory: Callable[[], Any]):
+        object.__setattr__(self, '_lazy_factory', factory)
+        object.__setattr__(self, '_lazy_instance', None)
+        object.__setattr__(self, '_lazy_lock', threading.Lock())
+
+    def _lazy_resolve(self) -> Any:
+        instance = object.__getattribute__(self, '_lazy_instance')
+        if instance is None:
+            with object.__getattribute__(self, '_lazy_lock'):
+                instance = object.__getattribute__(self, '_lazy_instance')
+                if instance is None:
+                    instance = object.__getattribute__(self, '_lazy_factory')()
+                    object.__setattr__(self, '_lazy_instance', instance)
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._lazy_resolve(), name)
+
+    def __setattr__(self, name: str, value: Any):
+        setattr(self._lazy_resolve(), name, value)
+
+    def __delattr__(self, name: str):
+        delattr(self._lazy_resolve(), name)
+
+    def __repr__(self) -> str:
+        instance = object.__getattribute__(self, '_lazy_instance')
+        if instance is None:
+            factory = object.__getattribute__(self, '_lazy_factory')
+            return f"<LazyProxy {getattr(factory, '__name__', 'factory')} (oluşturulmadı)>"
+        return repr(instance)
+
+
+def resolve(obj: Any) -> Any:
+    """Vekilse asıl nesneyi oluşturup döndür, değilse nesnenin kendisini döndür"""
+    if isinstance(obj, LazyProxy):
+        return obj._lazy_resolve()
+    return obj
+
+
+def is_initialized(obj: Any) -> bool:
+    """Vekilin arkasındaki nesne oluşturuldu mu"""
+    if isinstance(obj, LazyProxy):
+        return object.__getattribute__(obj, '_lazy_instance') is not None
+    return True
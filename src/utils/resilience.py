@@ -0,0 +1,225 @@
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from src.config.settings import settings
+
+
+class CircuitOpenError(Exception):
+    """Devre açıkken yapılan çağrılar için hata (hemen yedek yola düşmek için)"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"{endpoint} devresi açık, {retry_in:.0f} sn sonra tekrar denenecek")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Uç nokta başına devre kesici
+
+    closed: çağrılar geçer, ardışık hata sayılır
+    open: eşik aşıldı, reset_timeout boyunca çağrılar hemen reddedilir
+    half_open: süre doldu, tek deneme çağrısına izin verilir
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.stats = {
+            'calls': 0,
+            'failures': 0,
+            'rejected': 0,
+            'opened': 0
+        }
+
+    def allow(self):
+        """Çağrıya izin ver veya CircuitOpenError fırlat"""
+        with self._lock:
+            if self.state == self.OPEN:
+                elapsed = time.monotonic() - self.opened_at
+                if elapsed < self.reset_timeout:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.stats['rejected'] += 1
+                    raise CircuitOpenError(self.name, 0)
+                self._trial_in_flight = True
+
+            self.stats['calls'] += 1
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.stats['failures'] += 1
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.stats['opened'] += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Devre durumunu al"""
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = max(self.reset_timeout - (time.monotonic() - self.opened_at), 0)
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'retry_in_seconds': retry_in,
+                **self.stats
+            }
+
+
+class RetryBudget:
+    """
+    Tekrar deneme bütçesi
+
+    Her çağrı bütçeye `ratio` kadar jeton ekler, her tekrar deneme bir jeton
+    harcar. Kesinti sırasında tekrar denemelerin yükü katlamasını önler.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class Resilience:
+    """
+    Tüm dış istemciler için ortak dayanıklılık katmanı
+
+    Uç nokta başına devre kesici, jitter'lı üstel geri çekilme ve tekrar
+    deneme bütçesi sağlar. Devre açıkken çağrılar CircuitOpenError ile hemen
+    başarısız olur, böylece çağıran kendi yedek yoluna düşer.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0,
+                 base_delay: float = 0.5, max_delay: float = 8.0):
+        self.logger = logging.getLogger(__name__)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._budgets: Dict[str, RetryBudget] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        """Uç nokta için devre kesiciyi al (yoksa oluştur)"""
+        with self._lock:
+            if endpoint not in self._breakers:
+                self._breakers[endpoint] = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+                self._budgets[endpoint] = RetryBudget()
+            return self._breakers[endpoint]
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Tam jitter'lı üstel bekleme süresi"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, endpoint: str, func: Callable, *args,
+             retries: int = 2,
+             transient: Tuple[Type[BaseException], ...] = (Exception,),
+             is_transient: Optional[Callable[[BaseException], bool]] = None,
+             failure_if: Optional[Callable[[Any], bool]] = None,
+             **kwargs) -> Any:
+        """
+        Dış çağrıyı devre kesici ve tekrar deneme ile çalıştır
+
+        Args:
+            endpoint: Uç nokta adı (örn. 'twitter:create_tweet')
+            func: Çağrılacak fonksiyon
+            retries: En fazla tekrar deneme sayısı (idempotent olmayanlar için 0)
+            transient: Geçici sayılıp devreye hata yazılan istisnalar
+            is_transient: İstisnanın geçici olup olmadığını belirleyen koşul (transient yerine)
+            failure_if: Dönüş değerini hata sayan koşul (örn. HTTP 5xx)
+
+        Returns:
+            Any: Fonksiyonun dönüş değeri
+        """
+        breaker = self.breaker(endpoint)
+        budget = self._budgets[endpoint]
+        budget.deposit()
+        attempt = 0
+
+        while True:
+            breaker.allow()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                if not (is_transient(e) if is_transient else isinstance(e, transient)):
+                    # Kalıcı hata (örn. 4xx): servis yanıt veriyor, devreye hata yazılmaz
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt >= retries or not budget.withdraw():
+                    raise
+                self.logger.warning(f"{endpoint} geçici hata ({e}), tekrar denenecek")
+            else:
+                if failure_if and failure_if(result):
+                    breaker.record_failure()
+                    if attempt >= retries or not budget.withdraw():
+                        return result
+                    self.logger.warning(f"{endpoint} başarısız yanıt, tekrar denenecek")
+                    # Akış halindeki yanıtın bağlantısını havuza geri ver
+                    if hasattr(result, 'close'):
+                        result.close()
+                else:
+                    breaker.record_success()
+                    return result
+
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Tüm devrelerin durumunu al"""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {endpoint: breaker.snapshot() for endpoint, breaker in breakers}
+
+
+def http_failure(response) -> bool:
+    """HTTP yanıtı geçici hata mı (5xx veya 429)"""
+    return response.status_code >= 500 or response.status_code == 429
+
+
+# Global resilience instance
+resilience = Resilience(
+    failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_RESET_SECONDS
+)